@@ -0,0 +1,75 @@
+
+
+import numpy as np
+
+
+class ContactThresholds:
+
+    __slots__ = ("vertical_speed", "horizontal_speed", "height", "min_frames")
+
+    def __init__(self, vertical_speed=0.5, horizontal_speed=None, height=None,
+                 min_frames=3):
+
+        # Speeds are in scene units per frame; height is measured above the
+        # lowest point the foot reaches in the clip. None disables a criterion.
+        self.vertical_speed = vertical_speed
+        self.horizontal_speed = horizontal_speed
+        self.height = height
+        self.min_frames = int(min_frames)
+
+    def __repr__(self):
+
+        return f"ContactThresholds({self.as_dict()})"
+
+    def as_dict(self):
+
+        return {name: getattr(self, name) for name in ContactThresholds.__slots__}
+
+    @staticmethod
+    def from_dict(data):
+
+        return ContactThresholds(**{name: value for name, value in data.items()
+                                    if name in ContactThresholds.__slots__})
+
+
+def run_lengths(mask):
+
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2] - 1
+
+
+class ContactDetector:
+
+    @staticmethod
+    def contact_steps(positions, thresholds):
+
+        steps = np.diff(positions, axis=0)
+        contact = np.abs(steps[..., 1]) < thresholds.vertical_speed
+
+        if thresholds.horizontal_speed is not None:
+            contact &= np.hypot(steps[..., 0], steps[..., 2]) < thresholds.horizontal_speed
+
+        if thresholds.height is not None:
+            heights = positions[..., 1] - positions[..., 1].min(axis=0)
+            contact &= np.maximum(heights[1:], heights[:-1]) <= thresholds.height
+
+        return contact
+
+    @staticmethod
+    def detect(positions, start_frame=0, thresholds=None):
+
+        thresholds = thresholds or ContactThresholds()
+        positions = np.asarray(positions, dtype=float)
+        if len(positions) < 2:
+            return [[] for _ in range(positions.shape[1] if positions.ndim > 1 else 0)]
+
+        ranges = []
+        for contact in ContactDetector.contact_steps(positions, thresholds).T:
+            # A run of contact steps i..j holds the foot from frame i to j + 1.
+            starts, ends = run_lengths(contact)
+            keep = ends - starts + 2 >= thresholds.min_frames
+            ranges.append([(start_frame + start, start_frame + end + 1) for start, end
+                           in zip(starts[keep].tolist(), ends[keep].tolist())])
+
+        return ranges
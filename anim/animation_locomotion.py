@@ -1,24 +1,28 @@
 
 
+import numpy as np
 import maya.cmds as cmds
 
 from rig import rig_builders_runtime
 
 from anim import animation_runtime
+from anim import animation_sampler
+from anim import animation_contacts
 
 
 class AnimationLocomotion:
 
-    def __init__(self):
+    def __init__(self, rig_ctx=None, anim_ctx=None):
 
-        self.rig_ctx = RIG_CTX
-        self.anim_ctx = ANIM_CTX
+        self.rig_ctx = rig_ctx or RIG_CTX
+        self.anim_ctx = anim_ctx or ANIM_CTX
 
     def create_pose_reference(self):
 
         locator_group = self.anim_ctx.path_registry["current_root_motion_group"]
 
-        node = cmds.ls("SKM_Manny_Simple_LOD2", long=True)[0]
+        node = cmds.ls(
+            self.rig_ctx.node_index.qualify("SKM_Manny_Simple_LOD2"), long=True)[0]
         node = cmds.duplicate(node, name=f"{locator_group}_pose_reference")[0]
         cmds.parent(node, locator_group)
         cmds.delete(node, constructionHistory=True)
@@ -34,152 +38,106 @@ class AnimationLocomotion:
 
     def locomotion_base_distance(self, file_name):
 
-        schema = UE5_SCHEMA.get("limb", {})
-        motion_distance_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "locomotionsystem", "MotionDistance_GRP")
         ik_ctrls = self.rig_ctx.control_registry.get("ik", {})
 
         retarget_joints = self.anim_ctx.retarget_joint_registry.get(
             f"{file_name}", {})
 
-        foot_distances = {}
         start_frame, end_frame = self.anim_ctx.retarget_time_registry.get(
             f"{file_name}")
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
-                if limb_name == "upperarm":
-                    continue
-                ik_ctrl = ik_ctrls.get(chain[2])
-                retarget_joint = retarget_joints.get(chain[2])
-
-                follow_group = cmds.group(
-                    empty=True, name=f"{chain[2]}_DistFollow_GRP",
-                    parent=motion_distance_group)
-                cmds.matchTransform(follow_group, ik_ctrl, position=True)
-                cmds.parentConstraint(retarget_joint, follow_group,
-                                      maintainOffset=True, skipRotate=("x", "y", "z"))
-
-                start_loc = cmds.spaceLocator(
-                    name=f"{chain[2]}_DistStart_LOC")[0]
-                cmds.parent(start_loc, motion_distance_group)
-                cmds.matchTransform(start_loc, ik_ctrl,
-                                    positionX=True, positionY=True)
-                cmds.move(0, 0, -80, start_loc,
-                          relative=True, objectSpace=True)
-                cmds.parentConstraint(follow_group, start_loc,
-                                      maintainOffset=True,
-                                      skipRotate=("x", "y", "z"),
-                                      skipTranslate=("z"))
-
-                end_loc = cmds.spaceLocator(
-                    name=f"{chain[2]}_DistEnd_LOC")[0]
-                cmds.parent(end_loc, follow_group)
-                cmds.matchTransform(end_loc, ik_ctrl, position=True)
-
-                dist_node = cmds.createNode(
-                    "distanceBetween", name=f"{chain[2]}_DistanceBetween")
-                cmds.connectAttr(
-                    f"{start_loc}.worldPosition[0]",
-                    f"{dist_node}.point1")
-                cmds.connectAttr(
-                    f"{end_loc}.worldPosition[0]",
-                    f"{dist_node}.point2")
-
-                frame_distances = []
-                for frame in range(int(start_frame), int(end_frame) + 1):
-                    cmds.currentTime(frame, edit=True)
-                    dist = cmds.getAttr(f"{dist_node}.distance")
-                    frame_distances.append(dist)
-                motion_distance = max(frame_distances) - min(frame_distances)
-
-                foot_distances[side] = motion_distance
-
-        left_distance = foot_distances.get("l", [])
-        right_distance = foot_distances.get("r", [])
-        per_frame_distance = (left_distance + right_distance) / end_frame
+
+        feet = [chain for chain in SCHEMA.chains("limb") if not chain.clavicle]
+        matrices = SAMPLER.sample_matrices(
+            [retarget_joints.get(chain.end) for chain in feet], start_frame, end_frame)
+
+        # Each foot is tracked at its ik ctrl, moved by the retarget joint's
+        # translation since the first frame like the old translate-only
+        # follow constraint, so foot roll does not swing it. The stride is
+        # its forward (Z) range.
+        anchors = np.array(
+            [RigHelpers.world_position(self.rig_ctx, ik_ctrls.get(chain.end))
+             for chain in feet])
+        forward = (anchors[:, 2]
+                   + matrices[:, :, 3, 2] - matrices[0, :, 3, 2])
+        strides = forward.max(axis=0) - forward.min(axis=0)
+
+        foot_strides = dict(zip((chain.side for chain in feet), strides.tolist()))
+        total_travel = foot_strides.get("l", 0.0) + foot_strides.get("r", 0.0)
+        frames = end_frame - start_frame
+        per_frame_distance = total_travel / frames if frames > 0 else 0.0
         self.anim_ctx.locomotion_registry["per_frame_distance"] = per_frame_distance
-        meta_node = cmds.ls(f"{file_name}_group_animMeta", type="network")[0]
-        cmds.addAttr(meta_node, ln="perFrameDistance", at="double")
-        cmds.setAttr(f"{meta_node}.perFrameDistance", per_frame_distance)
 
-        cmds.delete(motion_distance_group)
+        meta_node = cmds.ls(
+            self.anim_ctx.node_index.qualify(f"{file_name}_group_animMeta"),
+            type="network")[0]
+        values = {f"stride{side.upper()}": stride for side, stride in foot_strides.items()}
+        values.update(totalTravel=total_travel, perFrameDistance=per_frame_distance)
+        for attr, value in values.items():
+            if not cmds.objExists(f"{meta_node}.{attr}"):
+                cmds.addAttr(meta_node, ln=attr, at="double")
+            cmds.setAttr(f"{meta_node}.{attr}", value)
 
     def locomotion_setup_foot_lock_reference(self):
 
-        schema = UE5_SCHEMA.get("limb", {})
         group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "locomotionsystem", "footlock_GRP")
+            self.rig_ctx, "retarget_group", "locomotionsystem", "footlock_GRP")
         ik_ctrls = self.rig_ctx.control_registry.get("ik", {})
 
         cmds.currentTime(-1)
         all_locs = []
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
-                if limb_name == "upperarm":
-                    continue
+        for chain in SCHEMA.chains("limb"):
+            if chain.clavicle:
+                continue
 
-                ik_ctrl = ik_ctrls.get(chain[2])
+            ik_ctrl = ik_ctrls.get(chain.end)
 
-                offset_loc = cmds.spaceLocator(
-                    name=f"{chain[2]}_footlock_offset_LOC")[0]
-                cmds.parent(offset_loc, ik_ctrl)
-                cmds.matchTransform(offset_loc, ik_ctrl, position=True)
+            offset_loc = cmds.spaceLocator(
+                name=f"{chain.end}_footlock_offset_LOC")[0]
+            cmds.parent(offset_loc, ik_ctrl)
+            cmds.matchTransform(offset_loc, ik_ctrl, position=True)
 
-                loc = cmds.spaceLocator(
-                    name=f"{chain[2]}_footlock_LOC")[0]
-                cmds.matchTransform(loc, ik_ctrl, position=True)
-                cmds.parentConstraint(offset_loc, loc,
-                                      maintainOffset=False, skipRotate=("x", "z"))
-                cmds.parent(loc, group)
+            loc = cmds.spaceLocator(
+                name=f"{chain.end}_footlock_LOC")[0]
+            cmds.matchTransform(loc, ik_ctrl, position=True)
+            cmds.parentConstraint(offset_loc, loc,
+                                  maintainOffset=False, skipRotate=("x", "z"))
+            cmds.parent(loc, group)
 
-                all_locs.append(loc)
+            all_locs.append(loc)
 
         self.anim_ctx.locomotion_registry["foot_lock"] = all_locs
 
-    def locomotion_get_foot_lock_ranges(self):
+    def contact_thresholds(self, file_name=None):
+
+        clips = self.anim_ctx.locomotion_registry.get("contact_thresholds", {})
+        return ContactThresholds.from_dict(clips.get(file_name, {}))
+
+    def set_contact_thresholds(self, file_name, **thresholds):
+
+        clips = self.anim_ctx.locomotion_registry.setdefault("contact_thresholds", {})
+        current = self.contact_thresholds(file_name).as_dict()
+        current.update(thresholds)
+        clips[file_name] = ContactThresholds.from_dict(current).as_dict()
+
+    def locomotion_get_foot_lock_ranges(self, file_name=None):
 
         locs = self.anim_ctx.locomotion_registry.get("foot_lock", [])
 
         start_time = int(cmds.playbackOptions(query=True, minTime=True))
         end_time = int(cmds.playbackOptions(query=True, maxTime=True))
 
-        threshold = 0.5
-        min_frames = 3
-
-        result = {loc: [] for loc in locs}
-        current_ranges = {loc: None for loc in locs}
-        prev_y = {loc: None for loc in locs}
-
-        for frame in range(start_time, end_time + 1):
-            for loc in locs:
-                y = cmds.getAttr(f"{loc}.translateY", time=frame)
-                if prev_y[loc] is None:
-                    prev_y[loc] = y
-                    continue
-
-                delta = abs(y - prev_y[loc])
-                if delta < threshold:
-                    if current_ranges[loc] is None:
-                        current_ranges[loc] = [frame - 1, frame]
-                    else:
-                        current_ranges[loc][1] = frame
-                else:
-                    if current_ranges[loc]:
-                        length = current_ranges[loc][1] - \
-                            current_ranges[loc][0] + 1
-                        if length >= min_frames:
-                            result[loc].append(tuple(current_ranges[loc]))
-                        current_ranges[loc] = None
-
-                prev_y[loc] = y
-
-        for loc in locs:
-            if current_ranges[loc]:
-                length = current_ranges[loc][1] - current_ranges[loc][0] + 1
-                if length >= min_frames:
-                    result[loc].append(tuple(current_ranges[loc]))
-
-        self.anim_ctx.locomotion_registry["foot_lock_ranges"] = result
+        thresholds = self.contact_thresholds(file_name)
+
+        # Horizontal motion is only sampled when a clip asks for it.
+        axes = "XYZ" if thresholds.horizontal_speed is not None else "Y"
+        samples = SAMPLER.sample(
+            [f"{loc}.translate{axis}" for loc in locs for axis in axes],
+            start_time, end_time).reshape(end_time - start_time + 1, len(locs), len(axes))
+        positions = np.zeros(samples.shape[:2] + (3,))
+        positions[..., ["XYZ".index(axis) for axis in axes]] = samples
+
+        ranges = ContactDetector.detect(positions, start_time, thresholds)
+        self.anim_ctx.locomotion_registry["foot_lock_ranges"] = dict(zip(locs, ranges))
 
     def foot_ik_lock(self):
 
@@ -237,8 +195,15 @@ class AnimationLocomotion:
                 range_frames.update(range(start, end + 1))
             leg["range_frames"] = range_frames
 
+        # Frames outside every range, start and release do nothing, so the
+        # timeline only visits the frames that key or lock something.
+        active_frames = set()
+        for leg in legs_data:
+            active_frames.update(leg["start_frames"], leg["range_frames"],
+                                 leg["release_frames"])
+
         cmds.refresh(suspend=True)
-        for frame in range(start_time, end_time + 1):
+        for frame in sorted(f for f in active_frames if start_time <= f <= end_time):
 
             cmds.currentTime(frame)
 
@@ -273,4 +238,7 @@ class AnimationLocomotion:
 RigHelpers = rig_builders_runtime.RigHelpers
 RIG_CTX = rig_builders_runtime.RIG_CTX
 ANIM_CTX = animation_runtime.ANIM_CTX
-UE5_SCHEMA = rig_builders_runtime.UE5_SCHEMA
+SAMPLER = animation_sampler.SAMPLER
+ContactThresholds = animation_contacts.ContactThresholds
+ContactDetector = animation_contacts.ContactDetector
+SCHEMA = rig_builders_runtime.SCHEMA
@@ -0,0 +1,64 @@
+
+
+from rig import rig_builders_profiler
+
+from anim import animation_transfer
+from anim import animation_locomotion
+
+
+class AnimBuilder:
+
+    def __init__(self, rig_ctx=None, anim_ctx=None):
+
+        self.animtransfer = AnimTransfer(rig_ctx, anim_ctx)
+        self.animpath = AnimPath(rig_ctx, anim_ctx)
+        self.locomotion = AnimLocomotion(rig_ctx, anim_ctx)
+        self.rig_ctx = self.animtransfer.rig_ctx
+
+    def build_retarget_fk_ik_ctrl(self, file_path, file_name):
+
+        with self.rig_ctx.scope():
+            self.animtransfer.import_retarget_skeleton(file_path)
+            self.animtransfer.build_retarget_bind_pose()
+            self.animtransfer.build_retarget_fk_constraints()
+            self.animtransfer.build_limb_retarget_ik_constraints()
+            self.animtransfer.build_spine_retarget_ik_constraints()
+            self.locomotion.locomotion_setup_foot_lock_reference()
+            self.animpath.setup_root_motion_curve_locator()
+            self.animtransfer.remove_retarget_bind_pose()
+            self.locomotion.locomotion_base_distance(file_name)
+
+    def setup_root_motion_edit(self, file_name):
+
+        with self.rig_ctx.scope():
+            self.animpath.setup_root_motion_edit(file_name)
+
+    def build_root_motion(self, file_name):
+
+        with self.rig_ctx.scope():
+            self.locomotion.create_pose_reference()
+            self.animpath.get_root_motion_positions(file_name)
+            self.animpath.cache_root_motion_positions(file_name)
+            self.animpath.build_root_motion_curve()
+
+    def preview_root_motion(self, file_name):
+
+        with self.rig_ctx.scope():
+            self.animpath.build_root_motion_curve()
+            # self.animpath.apply_root_motion_pathsssss()
+            self.animpath.setup_root_motion_path()
+            self.animpath.apply_root_motion_path(file_name)
+
+    def finalize_root_motion(self, file_name=None):
+
+        with self.rig_ctx.scope():
+            self.locomotion.locomotion_get_foot_lock_ranges(file_name)
+            self.locomotion.foot_ik_lock()
+
+
+AnimTransfer = animation_transfer.AnimationTransfer
+AnimPath = animation_transfer.AnimationPath
+AnimLocomotion = animation_locomotion.AnimationLocomotion
+
+PROFILER = rig_builders_profiler.PROFILER
+PROFILER.add_targets(AnimBuilder, AnimTransfer, AnimPath, AnimLocomotion)
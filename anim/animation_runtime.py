@@ -2,28 +2,82 @@
 
 import maya.cmds as cmds
 
+from rig import rig_builders_registry
+from rig import rig_builders_runtime
+
 
 class AnimContext:
 
-    def __init__(self):
+    def __init__(self, namespace=""):
 
-        self.retarget_joint_registry = {}
+        self.namespace = namespace
+        self.retarget_joint_registry = NodeRegistry(PATH_CACHE)
+        self.retarget_profile_registry = {}
         self.retarget_time_registry = {}
         self.path_registry = {}
         self.locomotion_registry = {}
 
-        self.animhelper = Animhelpers()
+        self.node_index = NodeIndex(PATH_CACHE, namespace)
+        SCENE_WATCHER.add_listener(self.node_index)
+
+        self.animhelper = Animhelpers(self)
+
+    def scope(self):
+
+        return ContextRegistry.scope(self.namespace)
+
+    def detach(self):
+
+        SCENE_WATCHER.remove_listener(self.node_index)
 
     def clear(self):
 
-        self.retarget_joint_registry = {}
+        self.retarget_joint_registry = NodeRegistry(PATH_CACHE)
+        self.retarget_profile_registry = {}
         self.retarget_time_registry = {}
         self.path_registry = {}
         self.locomotion_registry = {}
 
+        self.node_index.clear()
+
+    def to_manifest(self):
+
+        return {
+            "handles": {
+                "retarget_joint_registry": self.retarget_joint_registry.to_handles(),
+                "node_index": dict(self.node_index.handles),
+            },
+            "data": {
+                "retarget_profile_registry": self.retarget_profile_registry,
+                "retarget_time_registry": self.retarget_time_registry,
+                "path_registry": self.path_registry,
+                "locomotion_registry": self.locomotion_registry,
+            },
+        }
+
+    def load_manifest(self, manifest):
+
+        handles = manifest["handles"]
+        data = manifest["data"]
+
+        self.clear()
+        self.retarget_joint_registry.load_handles(
+            handles["retarget_joint_registry"])
+        self.node_index.load_handles(handles["node_index"])
+
+        self.retarget_profile_registry = data.get("retarget_profile_registry", {})
+        self.retarget_time_registry = data["retarget_time_registry"]
+        self.path_registry = data["path_registry"]
+        self.locomotion_registry = data["locomotion_registry"]
+
+        refs = self.path_registry.get("root_motion_refs")
+        if refs is not None:
+            self.path_registry["root_motion_refs"] = tuple(refs)
+
     def rebuild(self):
 
-        self.retarget_joint_registry = {}
+        self.retarget_joint_registry = NodeRegistry(PATH_CACHE)
+        self.retarget_profile_registry = {}
         self.retarget_time_registry = {}
         self.path_registry = {}
         self.locomotion_registry = {}
@@ -35,17 +89,24 @@ class AnimContext:
 
     def _rebuild_retarget_data(self):
 
-        animation_group = cmds.ls("animation_group", long=True)
+        animation_group = cmds.ls(
+            self.node_index.qualify("animation_group"), long=True)
         joints = cmds.listRelatives(
             animation_group, allDescendents=True, type="joint", fullPath=True)
+        file_joints = {}
         for joint in joints:
-            joint_name = joint.split("|")[-1].split(":")[-1]
-            namespace = joint.split("|")[-1].split(":")[0]
-            file_name = namespace[:-6]
-            self.retarget_joint_registry.setdefault(
-                file_name, {})[joint_name] = joint
-
-        meta = cmds.ls(f"{file_name}_group_animMeta", type="network")[0]
+            namespace = ContextRegistry.namespace_of(joint).split(":")[-1]
+            file_joints.setdefault(namespace[:-6], []).append(joint)
+
+        for file_name, source_joints in file_joints.items():
+            profile, mapped = PROFILES.map_joints(source_joints)
+            self.retarget_profile_registry[file_name] = profile.name
+            for joint_name, joint in mapped.items():
+                self.retarget_joint_registry.setdefault(
+                    file_name, {})[joint_name] = joint
+
+        meta = cmds.ls(self.node_index.qualify(f"{file_name}_group_animMeta"),
+                       type="network")[0]
         end_time = cmds.getAttr(f"{meta}.animEnd")
         self.retarget_time_registry[file_name] = [0, end_time]
 
@@ -54,9 +115,10 @@ class AnimContext:
 
     def _rebuild_root_motion_refs(self):
 
-        back_loc = cmds.ls("root_motion_back_loc", long=True) or []
-        mid_loc = cmds.ls("root_motion_mid_loc", long=True) or []
-        front_loc = cmds.ls("root_motion_front_loc", long=True) or []
+        qualify = self.node_index.qualify
+        back_loc = cmds.ls(qualify("root_motion_back_loc"), long=True) or []
+        mid_loc = cmds.ls(qualify("root_motion_mid_loc"), long=True) or []
+        front_loc = cmds.ls(qualify("root_motion_front_loc"), long=True) or []
 
         back_loc = back_loc[0] if back_loc else None
         mid_loc = mid_loc[0] if mid_loc else None
@@ -66,7 +128,8 @@ class AnimContext:
 
     def _rebuild_root_motion_groups(self):
 
-        cache_groups = cmds.ls("root_motion_position_cache", long=True)
+        cache_groups = cmds.ls(
+            self.node_index.qualify("root_motion_position_cache"), long=True)
         motion_groups = cmds.listRelatives(
             cache_groups, children=True, type="transform") or []
         motion_groups = self.animhelper.get_ordered_groups(motion_groups)
@@ -74,24 +137,31 @@ class AnimContext:
 
         if motion_groups:
             for group in motion_groups:
-                meta_node = cmds.ls(f"{group}_animMeta", type="network")[0]
+                meta_node = cmds.ls(
+                    self.node_index.qualify(f"{group}_animMeta"), type="network")[0]
                 frame = cmds.getAttr(f"{meta_node}.sampleFrame")
                 self.path_registry.setdefault(
                     "root_motion_sample_frames", {})[group] = frame
 
     def _rebuild_foot_lock(self):
 
-        foot_lock_locs = cmds.ls("*_footlock_LOC", long=False)
+        foot_lock_locs = cmds.ls(
+            self.node_index.qualify("*_footlock_LOC"), long=False)
         self.locomotion_registry["foot_lock"] = foot_lock_locs
 
 
 class Animhelpers:
 
+    def __init__(self, anim_ctx=None):
+
+        self.anim_ctx = anim_ctx or ANIM_CTX
+
     def get_ordered_groups(self, groups):
 
         ordered = []
         for group in groups:
-            meta = cmds.ls(f"{group}_animMeta", type="network")[0]
+            meta = self.anim_ctx.node_index.lookup(
+                f"{group}_animMeta", type="network")
             order = cmds.getAttr(f"{meta}.order")
             ordered.append((group, order))
         ordered.sort(key=lambda x: x[1])
@@ -102,4 +172,12 @@ class Animhelpers:
         return result
 
 
-ANIM_CTX = AnimContext()
+NodeRegistry = rig_builders_registry.NodeRegistry
+NodeIndex = rig_builders_registry.NodeIndex
+ContextRegistry = rig_builders_registry.ContextRegistry
+SCENE_WATCHER = rig_builders_registry.SCENE_WATCHER
+PATH_CACHE = rig_builders_registry.PATH_CACHE
+PROFILES = rig_builders_runtime.PROFILES
+
+ANIM_CONTEXTS = ContextRegistry(AnimContext)
+ANIM_CTX = ANIM_CONTEXTS.get()
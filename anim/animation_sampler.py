@@ -0,0 +1,200 @@
+
+
+import hashlib
+
+import numpy as np
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+from rig import rig_builders_registry
+
+
+class TimeSampler:
+
+    def __init__(self):
+
+        self.clear()
+
+    def clear(self):
+
+        self.cache = {}
+        self.fingerprints = {}
+        self.hits = 0
+        self.misses = 0
+        self.sweeps = 0
+
+    def on_scene_reset(self):
+
+        self.clear()
+
+    def on_unwatched(self):
+
+        self.cache = {}
+        self.fingerprints = {}
+
+    def on_node_added(self, node):
+
+        self.fingerprints.clear()
+
+    def on_node_renamed(self, node, prev_name):
+
+        self.fingerprints.clear()
+
+    def on_dag_changed(self, node):
+
+        self.fingerprints.clear()
+
+    def on_connection_changed(self, source, destination, made):
+
+        self.fingerprints.clear()
+
+    def on_anim_curve_edited(self, curves):
+
+        self.fingerprints.clear()
+
+    def on_node_removed(self, node):
+
+        self.fingerprints.clear()
+        if not self.cache:
+            return
+
+        # Samples of a deleted node must not be served to a new node that
+        # later takes its name.
+        name = om.MFnDependencyNode(node).name()
+        for key in [key for key in self.cache
+                    if key[0].partition(".")[0].split("|")[-1] == name]:
+            del self.cache[key]
+
+    def sample(self, plugs, start, end):
+
+        return self._sample(plugs, start, end, TimeSampler.read_double, ())
+
+    def sample_matrices(self, nodes, start, end, attr="worldMatrix[0]"):
+
+        return self._sample([f"{node}.{attr}" for node in nodes], start, end,
+                            TimeSampler.read_matrix, (4, 4))
+
+    def sample_positions(self, nodes, start, end):
+
+        return self.sample_matrices(nodes, start, end)[:, :, 3, :3]
+
+    def _sample(self, plugs, start, end, reader, shape):
+
+        # Samples outlive this call only while someone else, such as the UI,
+        # keeps the watcher installed.
+        SCENE_WATCHER.acquire(self)
+        try:
+            start, end = int(start), int(end)
+            frames = end - start + 1
+            fingerprint = self.node_fingerprint(
+                frozenset(plug.partition(".")[0] for plug in plugs))
+
+            keys = [(plug, start, end, reader.__name__, fingerprint) for plug in plugs]
+            missing = [index for index, key in enumerate(keys) if key not in self.cache]
+            self.hits += len(plugs) - len(missing)
+            self.misses += len(missing)
+
+            if missing:
+                values = self.sweep(
+                    [plugs[index] for index in missing], start, end, reader, shape)
+                for column, index in enumerate(missing):
+                    self.cache[keys[index]] = values[:, column]
+
+            if not plugs:
+                return np.zeros((frames, 0) + shape)
+            return np.stack([self.cache[key] for key in keys], axis=1)
+        finally:
+            SCENE_WATCHER.release(self)
+
+    def sweep(self, plugs, start, end, reader, shape):
+
+        sel = om.MSelectionList()
+        for plug in plugs:
+            sel.add(plug)
+        mplugs = [sel.getPlug(index) for index in range(len(plugs))]
+
+        values = np.zeros((end - start + 1, len(plugs)) + shape)
+        unit = om.MTime.uiUnit()
+        for row, frame in enumerate(range(start, end + 1)):
+            # Evaluate in a context at the frame instead of moving the timeline.
+            context = om.MDGContext(om.MTime(frame, unit))
+            previous = context.makeCurrent()
+            try:
+                for column, mplug in enumerate(mplugs):
+                    values[row, column] = reader(mplug)
+            finally:
+                previous.makeCurrent()
+
+        self.sweeps += 1
+        return values
+
+    @staticmethod
+    def read_double(mplug):
+
+        attribute = mplug.attribute()
+        if attribute.hasFn(om.MFn.kUnitAttribute):
+            unit_type = om.MFnUnitAttribute(attribute).unitType()
+            if unit_type == om.MFnUnitAttribute.kAngle:
+                return mplug.asMAngle().asUnits(om.MAngle.uiUnit())
+            if unit_type == om.MFnUnitAttribute.kDistance:
+                return mplug.asMDistance().asUnits(om.MDistance.uiUnit())
+
+        return mplug.asDouble()
+
+    @staticmethod
+    def read_matrix(mplug):
+
+        matrix = om.MFnMatrixData(mplug.asMObject()).matrix()
+        return np.reshape(list(matrix), (4, 4))
+
+    @staticmethod
+    def upstream_curves(nodes):
+
+        # listHistory follows connections only, so the DAG parents of the
+        # history are walked once more to catch animated parents.
+        history = set(cmds.listHistory(list(nodes)) or [])
+        parents = set()
+        for path in cmds.ls(list(history), long=True, dag=True) or []:
+            names = path.split("|")
+            parents.update("|".join(names[:i]) for i in range(2, len(names)))
+        if parents - history:
+            history.update(cmds.listHistory(list(parents - history)) or [])
+
+        return sorted(cmds.ls(list(history), type="animCurve") or [])
+
+    def node_fingerprint(self, nodes):
+
+        # The scene watcher clears these on any change that can reach the
+        # animation upstream of the nodes, so a warm call skips the history
+        # walk and the keyframe queries.
+        fingerprint = self.fingerprints.get(nodes)
+        if fingerprint is None:
+            fingerprint = self.fingerprints[nodes] = TimeSampler.fingerprint(nodes)
+        return fingerprint
+
+    @staticmethod
+    def fingerprint(nodes):
+
+        curves = TimeSampler.upstream_curves(nodes)
+        if not curves:
+            return ""
+
+        times = cmds.keyframe(curves, query=True, timeChange=True) or []
+        values = cmds.keyframe(curves, query=True, valueChange=True) or []
+
+        digest = hashlib.sha1("\n".join(curves).encode("utf-8"))
+        digest.update(np.asarray(times, dtype=float).tobytes())
+        digest.update(np.asarray(values, dtype=float).tobytes())
+        return digest.hexdigest()
+
+    def report(self):
+
+        return {"entries": len(self.cache), "hits": self.hits,
+                "misses": self.misses, "sweeps": self.sweeps}
+
+
+SCENE_WATCHER = rig_builders_registry.SCENE_WATCHER
+
+SAMPLER = TimeSampler()
+SCENE_WATCHER.add_listener(SAMPLER)
@@ -13,10 +13,10 @@ importlib.reload(animation_runtime)
 
 class AnimationTransfer:
 
-    def __init__(self):
+    def __init__(self, rig_ctx=None, anim_ctx=None):
 
-        self.rig_ctx = RIG_CTX
-        self.anim_ctx = ANIM_CTX
+        self.rig_ctx = rig_ctx or RIG_CTX
+        self.anim_ctx = anim_ctx or ANIM_CTX
 
     def import_retarget_skeleton(self, path):
 
@@ -24,7 +24,7 @@ class AnimationTransfer:
         file_name = self.file_name
 
         retarget_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "animation_group", f"{file_name}_group")
+            self.rig_ctx, "retarget_group", "animation_group", f"{file_name}_group")
 
         original_start_time = cmds.playbackOptions(query=True, minTime=True)
         original_end_time = cmds.playbackOptions(query=True, maxTime=True)
@@ -39,8 +39,9 @@ class AnimationTransfer:
 
         retarget_joints = cmds.listRelatives(
             retarget_group, allDescendents=True, type="joint", fullPath=True)
-        for joint in retarget_joints:
-            joint_name = joint.split("|")[-1].split(":")[-1]
+        profile, mapped = PROFILES.map_joints(retarget_joints)
+        self.anim_ctx.retarget_profile_registry[f"{file_name}"] = profile.name
+        for joint_name, joint in mapped.items():
             self.anim_ctx.retarget_joint_registry.setdefault(
                 f"{file_name}", {})[joint_name] = joint
 
@@ -68,9 +69,9 @@ class AnimationTransfer:
         file_name = self.file_name
 
         retarget_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "animation_group")
+            self.rig_ctx, "retarget_group", "animation_group")
         constraint_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "retarget_fk_constraints")
+            self.rig_ctx, "retarget_group", "retarget_fk_constraints")
 
         fk_ctrls = self.rig_ctx.control_registry.get("fk", {})
         retarget_joints = self.anim_ctx.retarget_joint_registry.get(
@@ -83,6 +84,8 @@ class AnimationTransfer:
             if joint_name == "root":
                 continue
             retarget_joint = retarget_joints.get(joint_name)
+            if retarget_joint is None:
+                continue
             constraint = cmds.parentConstraint(retarget_joint, fk_ctrl)[0]
             cmds.parent(constraint, constraint_group)
 
@@ -92,55 +95,50 @@ class AnimationTransfer:
 
     def build_limb_retarget_ik_constraints(self):
 
-        schema = UE5_SCHEMA.get("limb", {})
         constraint_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "retarget_ik_constraints")
+            self.rig_ctx, "retarget_group", "retarget_ik_constraints")
         ik_ctrls = self.rig_ctx.control_registry.get("ik", {})
         file_name = self.file_name
         retarget_joints = self.anim_ctx.retarget_joint_registry.get(
             f"{file_name}", {})
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        for chain in SCHEMA.chains("limb"):
 
-                if limb_name == "upperarm":
-                    mid_name = chain[2]
-                    end_name = chain[3]
-                else:
-                    mid_name = chain[1]
-                    end_name = chain[2]
+            mid_name, end_name = chain.mid, chain.end
 
-                ik_mid_ctrl = ik_ctrls.get(mid_name)
-                ik_end_ctrl = ik_ctrls.get(end_name)
+            ik_mid_ctrl = ik_ctrls.get(mid_name)
+            ik_end_ctrl = ik_ctrls.get(end_name)
 
-                mid_joint = retarget_joints.get(mid_name)
-                end_joint = retarget_joints.get(f"ik_{end_name}")
+            mid_joint = retarget_joints.get(mid_name)
+            end_joint = retarget_joints.get(f"ik_{end_name}")
+            if mid_joint is None or end_joint is None:
+                continue
 
-                cmds.select(ik_mid_ctrl)
+            cmds.select(ik_mid_ctrl)
 
-                mid_offset_group = cmds.group(
-                    empty=True, name=f"retarget_{mid_name}_offset_GRP")
-                cmds.matchTransform(mid_offset_group, ik_mid_ctrl)
-                cmds.parent(mid_offset_group, mid_joint)
-                end_offset_group = cmds.group(
-                    empty=True, name=f"retarget_{end_name}_offset_GRP")
-                cmds.matchTransform(end_offset_group, ik_end_ctrl)
-                cmds.parent(end_offset_group, end_joint)
+            mid_offset_group = cmds.group(
+                empty=True, name=f"retarget_{mid_name}_offset_GRP")
+            cmds.matchTransform(mid_offset_group, ik_mid_ctrl)
+            cmds.parent(mid_offset_group, mid_joint)
+            end_offset_group = cmds.group(
+                empty=True, name=f"retarget_{end_name}_offset_GRP")
+            cmds.matchTransform(end_offset_group, ik_end_ctrl)
+            cmds.parent(end_offset_group, end_joint)
 
-                constraint1 = cmds.parentConstraint(
-                    mid_offset_group, ik_mid_ctrl)
-                constraint2 = cmds.parentConstraint(
-                    end_offset_group, ik_end_ctrl)
+            constraint1 = cmds.parentConstraint(
+                mid_offset_group, ik_mid_ctrl)
+            constraint2 = cmds.parentConstraint(
+                end_offset_group, ik_end_ctrl)
 
-                cmds.parent(constraint1, constraint_group)
-                cmds.parent(constraint2, constraint_group)
+            cmds.parent(constraint1, constraint_group)
+            cmds.parent(constraint2, constraint_group)
 
         cmds.playbackOptions(minTime=0)
 
     def build_spine_retarget_ik_constraints(self):
 
         constraint_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "retarget_ik_constraints")
+            self.rig_ctx, "retarget_group", "retarget_ik_constraints")
         ik_ctrls = self.rig_ctx.control_registry.get("ik", {})
         file_name = self.file_name
         retarget_joints = self.anim_ctx.retarget_joint_registry.get(
@@ -151,6 +149,8 @@ class AnimationTransfer:
         for ik_name, source_name in mapping.items():
             ik_ctrl = ik_ctrls.get(ik_name)
             retarget_joint = retarget_joints.get(source_name)
+            if retarget_joint is None:
+                continue
             offset_group = cmds.group(
                 empty=True, name=f"retarget_{ik_name}_offset_GRP")
             cmds.matchTransform(offset_group, ik_ctrl)
@@ -170,6 +170,8 @@ class AnimationTransfer:
         constraints = []
         for joint_name, deform_joint in deform_joints.items():
             retarget_joint = retarget_joints.get(joint_name)
+            if retarget_joint is None:
+                continue
             constraint = cmds.parentConstraint(deform_joint, retarget_joint)[0]
             constraints.append(constraint)
 
@@ -208,37 +210,35 @@ class AnimationTransfer:
                 cmds.cutKey(anim_curve, time=(-1, -1))
                 cmds.cutKey(anim_curve, time=(end_time + 1, end_time + 1))
 
-    @staticmethod
-    def bake_ik_ctrl():
+    def bake_ik_ctrl(self):
 
-        schema = UE5_SCHEMA.get("limb", {})
-        ik_ctrls = RIG_CTX.control_registry.get("ik", {})
+        ik_ctrls = self.rig_ctx.control_registry.get("ik", {})
         start = cmds.playbackOptions(query=True, minTime=True)
         end = cmds.playbackOptions(query=True, maxTime=True)
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
-                if limb_name == "upperarm":
-                    continue
-                ik_ctrl = ik_ctrls.get(chain[2])
-                cmds.bakeResults(ik_ctrl, time=(start, end))
-                anim_curves = cmds.listConnections(ik_ctrl, type="animCurve")
-                cmds.filterCurve(anim_curves, filter="euler")
+        for chain in SCHEMA.chains("limb"):
+            if chain.clavicle:
+                continue
+            ik_ctrl = ik_ctrls.get(chain.end)
+            cmds.bakeResults(ik_ctrl, time=(start, end))
+            anim_curves = cmds.listConnections(ik_ctrl, type="animCurve")
+            cmds.filterCurve(anim_curves, filter="euler")
 
 
 class AnimationPath:
 
-    def __init__(self):
+    def __init__(self, rig_ctx=None, anim_ctx=None):
 
-        self.rig_ctx = RIG_CTX
-        self.anim_ctx = ANIM_CTX
+        self.rig_ctx = rig_ctx or RIG_CTX
+        self.anim_ctx = anim_ctx or ANIM_CTX
 
-        self.animhelper = Animhelpers()
+        self.animhelper = Animhelpers(self.anim_ctx)
 
     def setup_root_motion_curve_locator(self):
 
         locator_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "root_motion_curve", "root_motion_curve_ref")
+            self.rig_ctx, "retarget_group", "root_motion_curve",
+            "root_motion_curve_ref")
         root_ctrl = self.rig_ctx.control_registry.get("fk", {}).get("root")
 
         back_loc = cmds.spaceLocator(name="root_motion_back_loc")[0]
@@ -268,7 +268,8 @@ class AnimationPath:
             original_start_time, original_end_time]
 
         cache_group = RigHelpers.get_or_create_group_chain(
-            "retarget_group", "root_motion_curve", "root_motion_position_cache")
+            self.rig_ctx, "retarget_group", "root_motion_curve",
+            "root_motion_position_cache")
         locator_group = cmds.group(
             empty=True, name=file_name, parent=cache_group)
         self.anim_ctx.path_registry["current_root_motion_group"] = locator_group
@@ -286,6 +287,7 @@ class AnimationPath:
                      longName="animMeta", attributeType="message")
         cmds.connectAttr(f"{meta_node}.owner",
                          f"{locator_group}.animMeta")
+        self.anim_ctx.node_index.record(meta_node, f"{locator_group}_animMeta")
 
         groups = self.animhelper.get_ordered_groups(groups)
         self.anim_ctx.path_registry["root_motion_groups"] = groups
@@ -338,11 +340,14 @@ class AnimationPath:
         cmds.xform(mid_loc, worldSpace=True, translation=positions[1])
         cmds.xform(front_loc, worldSpace=True, translation=positions[2])
         cmds.parent(back_loc, mesh_node)
-        cmds.parent(mid_loc, mesh_node)
+        mid_loc = cmds.parent(mid_loc, mesh_node)[0]
         cmds.parent(front_loc, mesh_node)
+        self.anim_ctx.node_index.record(
+            mid_loc, f"{locator_group}_root_motion_mid_loc")
 
         current_frame = cmds.currentTime(query=True)
-        meta_node = cmds.ls(f"{locator_group}_animMeta", type="network")[0]
+        meta_node = self.anim_ctx.node_index.lookup(
+            f"{locator_group}_animMeta", type="network")
         cmds.addAttr(meta_node,
                      longName="sampleFrame", attributeType="double")
         cmds.setAttr(f"{meta_node}.sampleFrame", current_frame)
@@ -367,10 +372,12 @@ class AnimationPath:
         curve_points = [[0, 0, 0]] + positions
 
         curve_name = "rootMotionTrajectory_CRV"
-        if cmds.objExists(curve_name):
-            cmds.delete(curve_name)
+        old_curve = self.anim_ctx.node_index.lookup(curve_name)
+        if old_curve:
+            cmds.delete(old_curve)
         self.curve = cmds.curve(
             degree=3, editPoint=curve_points, name=curve_name,)
+        self.anim_ctx.node_index.record(self.curve, curve_name)
         cmds.setAttr(f"{self.curve}.overrideEnabled", 1)
         cmds.setAttr(f"{self.curve}.overrideColor", 21)
 
@@ -491,16 +498,18 @@ class AnimationPath:
         elif final_frame > end_time:
             cmds.playbackOptions(maxTime=final_frame)
 
-        cmds.hide(cmds.ls("positionMarker*"))
+        cmds.hide(cmds.ls(self.anim_ctx.node_index.qualify("positionMarker*")))
 
         cmds.keyTangent(self.mp_node, attribute="uValue",
                         inTangentType="linear", outTangentType="linear")
 
     def _get_root_motion_keypose_ratio(self, group):
 
-        locator = cmds.ls(f"{group}_root_motion_mid_loc")[0]
+        locator = self.anim_ctx.node_index.lookup(
+            f"{group}_root_motion_mid_loc")
         curve_shape = cmds.listRelatives(
-            "rootMotionTrajectory_CRV", shapes=True)[0]
+            self.anim_ctx.node_index.lookup("rootMotionTrajectory_CRV"),
+            shapes=True, fullPath=True)[0]
 
         npc = cmds.createNode("nearestPointOnCurve")
         cmds.connectAttr(f"{curve_shape}.worldSpace[0]",
@@ -548,4 +557,5 @@ RigHelpers = rig_builders_runtime.RigHelpers
 Animhelpers = animation_runtime.Animhelpers
 RIG_CTX = rig_builders_runtime.RIG_CTX
 ANIM_CTX = animation_runtime.ANIM_CTX
-UE5_SCHEMA = rig_builders_runtime.UE5_SCHEMA
+PROFILES = rig_builders_runtime.PROFILES
+SCHEMA = rig_builders_runtime.SCHEMA
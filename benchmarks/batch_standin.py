@@ -0,0 +1,71 @@
+
+
+import io
+import os
+import sys
+import json
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import maya_standin
+
+STANDIN = maya_standin.STANDIN.install()
+
+from rig import rig_builders_batch
+from rig import rig_builders_pipeline
+from benchmarks import synthetic_scene
+
+
+def load_namespaces(source):
+
+    with open(source) as handle:
+        text = handle.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [""]
+
+    return data.get("namespaces", [""])
+
+
+def open_scene(source):
+
+    STANDIN.new_scene()
+    cmds = STANDIN.cmds
+    for namespace in load_namespaces(source):
+        if namespace:
+            cmds.namespace(add=f":{namespace}")
+            cmds.namespace(set=f":{namespace}")
+        synthetic_scene.build_ue5_skeleton(UE5_SCHEMA)
+        cmds.namespace(set=":")
+
+
+def save_scene(target):
+
+    cmds = STANDIN.cmds
+    with open(target, "w") as handle:
+        json.dump(sorted(cmds.ls(long=True)), handle, indent=1)
+        handle.write("\n")
+
+
+def main(argv=None):
+
+    source, target = sys.argv[1:] if argv is None else argv
+
+    open_scene(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = rig_builders_batch.rig_scene_roots()
+    save_scene(target)
+
+    rig_builders_batch.emit_result(result)
+    return 0
+
+
+UE5_SCHEMA = rig_builders_pipeline.rig_builders_runtime.UE5_SCHEMA
+
+
+if __name__ == "__main__":
+    sys.exit(main())
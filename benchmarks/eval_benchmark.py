@@ -0,0 +1,196 @@
+
+
+import io
+import os
+import sys
+import math
+import json
+import time
+import argparse
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+START_FRAME = 0
+END_FRAME = 120
+SWING = 30.0
+
+
+class PlaybackResult:
+
+    def __init__(self, mode, frames, seconds, nodes):
+
+        self.mode = mode
+        self.frames = frames
+        self.seconds = seconds
+        self.nodes = nodes
+
+    @property
+    def fps(self):
+
+        return self.frames / self.seconds if self.seconds else float("inf")
+
+    def format(self, baseline=None):
+
+        line = (f"{self.mode:<24} {self.fps:8.1f} fps  "
+                f"{self.seconds * 1000.0 / self.frames:7.2f} ms/frame  "
+                f"{self.nodes:5d} rig nodes")
+        if baseline is not None and baseline is not self:
+            line += f"  ({self.fps / baseline.fps:.2f}x {baseline.mode})"
+        return line
+
+
+def load_maya(standin):
+
+    if standin:
+        from benchmarks import maya_standin
+        return maya_standin.STANDIN.install()
+
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+    return None
+
+
+def open_character(cmds, scene, standin):
+
+    if scene:
+        cmds.file(scene, open=True, force=True)
+        return cmds.ls("root", type="joint", long=True)[0]
+
+    from benchmarks import synthetic_scene
+    from rig import rig_builders_runtime
+
+    standin.new_scene()
+    return synthetic_scene.build_ue5_skeleton(rig_builders_runtime.UE5_SCHEMA)
+
+
+def build_character(cmds, root, blend_mode, spine_mode):
+
+    from rig import rig_builders_pipeline
+
+    ctx = rig_builders_pipeline.RIG_CTX
+    nodes_before = len(cmds.ls())
+    with contextlib.redirect_stdout(io.StringIO()):
+        with rig_builders_pipeline.DG_BATCH.transaction("build_auto_rig"):
+            rig_builders_pipeline.RigBuilder.build_auto_rig(
+                root, ctx, blend_mode, spine_mode)
+
+    return ctx, len(cmds.ls()) - nodes_before
+
+
+def animate_character(cmds, ctx, start, end):
+
+    for ctrl in ctx.control_registry.get("ikfk", {}).values():
+        cmds.setKeyframe(ctrl, attribute="IKFKBlend", time=start, value=0)
+        cmds.setKeyframe(ctrl, attribute="IKFKBlend", time=end, value=10)
+
+    for category in ("fk", "ik"):
+        for index, ctrl in enumerate(ctx.control_registry.get(category, {}).values()):
+            for frame in range(start, end + 1, 10):
+                value = SWING * math.sin(frame * 0.1 + index)
+                cmds.setKeyframe(ctrl, attribute="rotateZ", time=frame, value=value)
+
+    cmds.playbackOptions(minTime=start, maxTime=end)
+
+
+def measure_playback(cmds, ctx, mode, nodes, start, end, repeat):
+
+    deform_joints = list(ctx.joint_registry.get("deform", {}).values())
+    frames = end - start + 1
+
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        for frame in range(start, end + 1):
+            cmds.currentTime(frame, update=True)
+            for joint in deform_joints:
+                cmds.getAttr(f"{joint}.worldMatrix[0]")
+        elapsed = time.perf_counter() - begin
+        best = elapsed if best is None else min(best, elapsed)
+
+    return PlaybackResult(mode, frames, best, nodes)
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Compare playback speed and node count of the IK/FK blend "
+                    "and spine build modes.")
+    parser.add_argument("scene", nargs="?",
+                        help="skeleton scene to rig, a synthetic UE5 skeleton by default")
+    parser.add_argument("--start", type=int, default=START_FRAME)
+    parser.add_argument("--end", type=int, default=END_FRAME)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--standin", action="store_true",
+                        help="build every variant on the maya.cmds stand-in and report "
+                             "node counts only; the stand-in does not evaluate the DG, "
+                             "so the run exits with status 2 and no fps")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the dgtimer cost of each rig subsystem")
+    parser.add_argument("--budget",
+                        help="json file mapping each variant to its fps and "
+                             "per-subsystem ms/frame budget")
+    args = parser.parse_args(argv)
+
+    if not args.scene and not args.standin:
+        parser.error("a scene is required outside of --standin")
+    if args.standin and (args.profile or args.budget):
+        parser.error("--profile and --budget need Maya, the stand-in has no dgtimer")
+
+    standin = load_maya(args.standin)
+
+    import maya.cmds as cmds
+    from rig import rig_builders_runtime
+    from rig import rig_builders_profiler
+
+    profiler = rig_builders_profiler.EVAL_PROFILER
+    EvaluationProfiler = rig_builders_profiler.EvaluationProfiler
+
+    budgets = {}
+    if args.budget:
+        with open(args.budget) as handle:
+            budgets = json.load(handle)
+
+    results = []
+    profiles = []
+    for blend_mode in rig_builders_runtime.BLEND_MODES:
+        for spine_mode in rig_builders_runtime.SPINE_MODES:
+            root = open_character(cmds, args.scene, standin)
+            ctx, nodes = build_character(cmds, root, blend_mode, spine_mode)
+            animate_character(cmds, ctx, args.start, args.end)
+            mode = f"{blend_mode}/{spine_mode} spine"
+            if standin:
+                print(f"{mode:<24} {nodes:5d} rig nodes")
+                continue
+            results.append(measure_playback(
+                cmds, ctx, mode, nodes, args.start, args.end, args.repeat))
+            if args.profile or args.budget:
+                profiles.append(profiler.run(ctx, args.start, args.end, label=mode))
+
+    if standin:
+        parser.exit(2, "no playback measured: the stand-in does not evaluate the DG, "
+                       "run without --standin in mayapy for fps\n")
+
+    for result in results:
+        print(result.format(results[0]))
+
+    failures = []
+    for report in profiles:
+        if args.profile:
+            print()
+            print(EvaluationProfiler.format_report(report))
+        if report["label"] in budgets:
+            failures.extend(EvaluationProfiler.check_budget(
+                report, budgets[report["label"]]))
+
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
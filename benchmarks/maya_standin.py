@@ -0,0 +1,2125 @@
+
+
+import sys
+import types
+import importlib.util
+import uuid
+import fnmatch
+import itertools
+from collections import Counter
+
+import numpy as np
+
+from rig import rig_builders_matrix
+
+
+TYPE_BASES = {
+    "transform": "dagNode",
+    "shape": "dagNode",
+    "joint": "transform",
+    "ikHandle": "transform",
+    "ikEffector": "transform",
+    "parentConstraint": "transform",
+    "orientConstraint": "transform",
+    "aimConstraint": "transform",
+    "pointConstraint": "transform",
+    "poleVectorConstraint": "transform",
+    "nurbsCurve": "shape",
+    "locator": "shape",
+    "mesh": "shape",
+    "arcLengthDimension": "shape",
+    "animCurveTL": "animCurve",
+    "animCurveTA": "animCurve",
+    "animCurveTU": "animCurve",
+}
+
+SHAPE_TYPES = ("nurbsCurve", "locator", "mesh", "arcLengthDimension")
+
+CHANNELS = {
+    "translate": ("translate", None), "t": ("translate", None),
+    "rotate": ("rotate", None), "r": ("rotate", None),
+    "scale": ("scale", None), "s": ("scale", None),
+    "shear": ("shear", None), "sh": ("shear", None),
+    "jointOrient": ("jointOrient", None), "jo": ("jointOrient", None),
+}
+for _channel, _short in (("translate", "t"), ("rotate", "r"),
+                         ("scale", "s"), ("jointOrient", "jo")):
+    for _index, _axis in enumerate("XYZ"):
+        CHANNELS[f"{_channel}{_axis}"] = (_channel, _index)
+        CHANNELS[f"{_short}{_axis.lower()}"] = (_channel, _index)
+for _index, _axes in enumerate(("XY", "XZ", "YZ")):
+    CHANNELS[f"shear{_axes}"] = ("shear", _index)
+    CHANNELS[f"sh{_axes.lower()}"] = ("shear", _index)
+
+CHANNEL_DEFAULTS = {
+    "translate": (0.0, 0.0, 0.0),
+    "rotate": (0.0, 0.0, 0.0),
+    "scale": (1.0, 1.0, 1.0),
+    "shear": (0.0, 0.0, 0.0),
+    "jointOrient": (0.0, 0.0, 0.0),
+}
+
+ATTR_DEFAULTS = {
+    "visibility": 1, "v": 1,
+    "rotateOrder": 0, "ro": 0,
+    "offsetParentMatrix": [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0,
+                           0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0],
+}
+
+IDENTITY = np.eye(4)
+
+
+def is_type(node_type, base):
+
+    while node_type:
+        if node_type == base:
+            return True
+        node_type = TYPE_BASES.get(node_type)
+
+    return False
+
+
+def flag(kwargs, *names, default=None):
+
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+
+    return default
+
+
+def flatten(args):
+
+    result = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            result.extend(flatten(arg))
+        elif arg is not None:
+            result.append(arg)
+
+    return result
+
+
+class FakeNode:
+
+    def __init__(self, name, node_type, parent=None):
+
+        self.name = name
+        self.type = node_type
+        self.parent = parent
+        self.children = []
+        self.dag = is_type(node_type, "dagNode")
+        self.uuid = str(uuid.uuid4()).upper()
+        self.alive = True
+
+        self.channels = {}
+        self.attrs = {}
+        self.user_attrs = []
+        self.locked = set()
+        self.keys = {}
+        self.points = None
+
+    def full_path(self):
+
+        if not self.dag:
+            return self.name
+
+        parts = []
+        node = self
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+
+        return "|" + "|".join(reversed(parts))
+
+    def channel(self, name):
+
+        return self.channels.get(name, CHANNEL_DEFAULTS[name])
+
+    def local_matrix(self):
+
+        rotate_order = int(self.attrs.get("rotateOrder", 0))
+        m = rig_builders_matrix.compose_matrices(
+            None, self.channel("rotate"), self.channel("scale"),
+            self.channel("shear"), rotate_order)[0]
+        if self.type == "joint":
+            orient = rig_builders_matrix.euler_to_matrices(
+                self.channel("jointOrient"))[0]
+            m[:3, :3] = m[:3, :3] @ orient
+        m[3, :3] = self.channel("translate")
+
+        return m
+
+    def offset_matrix(self):
+
+        return np.asarray(
+            self.attrs.get("offsetParentMatrix", ATTR_DEFAULTS["offsetParentMatrix"]),
+            dtype=float).reshape(4, 4)
+
+    def parent_matrix(self):
+
+        if self.parent is None or not self.parent.dag:
+            return IDENTITY
+
+        return self.parent.world_matrix()
+
+    def world_matrix(self):
+
+        if not is_type(self.type, "transform"):
+            return self.parent_matrix()
+
+        return self.local_matrix() @ self.offset_matrix() @ self.parent_matrix()
+
+    def set_local_matrix(self, m):
+
+        m = np.array(m, dtype=float).reshape(4, 4)
+        if self.type == "joint":
+            orient = rig_builders_matrix.euler_to_matrices(
+                self.channel("jointOrient"))[0]
+            m[:3, :3] = m[:3, :3] @ np.linalg.inv(orient)
+
+        translate, rotate, scale, shear = rig_builders_matrix.decompose_matrices(
+            m, int(self.attrs.get("rotateOrder", 0)))
+        self.channels["translate"] = tuple(translate[0].tolist())
+        self.channels["rotate"] = tuple(rotate[0].tolist())
+        self.channels["scale"] = tuple(scale[0].tolist())
+        self.channels["shear"] = tuple(shear[0].tolist())
+
+    def set_world_matrix(self, m):
+
+        space = self.offset_matrix() @ self.parent_matrix()
+        self.set_local_matrix(np.asarray(m, dtype=float).reshape(4, 4)
+                              @ np.linalg.inv(space))
+
+    def world_points(self):
+
+        owner = self
+        if self.points is None:
+            for child in self.children:
+                if child.points is not None:
+                    owner = child
+                    break
+            else:
+                return np.zeros((0, 3))
+
+        points = np.asarray(owner.points, dtype=float).reshape(-1, 3)
+        m = owner.world_matrix()
+        return points @ m[:3, :3] + m[3, :3]
+
+
+class FakeScene:
+
+    def __init__(self):
+
+        self.nodes = []
+        self.by_name = {}
+        self.by_uuid = {}
+        self.selection = []
+        self.connections = {}
+        self.drivers = {}
+        self.time = 0.0
+        self.min_time = 0.0
+        self.max_time = 120.0
+        self.evaluation_mode = "parallel"
+        self.counters = Counter()
+        self.namespace = ""
+        self.namespaces = {""}
+
+    def live_nodes(self):
+
+        return [node for node in self.nodes if node.alive]
+
+    def find(self, name):
+
+        if name.startswith("|"):
+            short = name.rsplit("|", 1)[-1]
+            return [n for n in self.by_name.get(short, ()) if n.full_path() == name]
+        if "|" in name:
+            short = name.rsplit("|", 1)[-1]
+            suffix = "|" + name
+            return [n for n in self.by_name.get(short, ())
+                    if n.full_path().endswith(suffix)]
+
+        found = list(self.by_name.get(name, ()))
+        if not found:
+            found = list(self.by_uuid.get(name, ()))
+
+        return found
+
+    def node(self, name):
+
+        if isinstance(name, FakeNode):
+            return name
+
+        found = self.find(name)
+        if not found:
+            raise ValueError(f"No object matches name: {name}")
+        if len(found) > 1:
+            raise ValueError(f"More than one object matches name: {name}")
+
+        return found[0]
+
+    def display(self, node):
+
+        if not node.dag:
+            return node.name
+
+        parts = node.full_path()[1:].split("|")
+        for count in range(1, len(parts) + 1):
+            candidate = "|".join(parts[-count:])
+            if len(self.find(candidate)) == 1:
+                return candidate
+
+        return node.full_path()
+
+    def name_of(self, node, long=False):
+
+        return node.full_path() if long else self.display(node)
+
+    def taken(self, name, parent, dag, node=None):
+
+        if not dag:
+            return any(n is not node for n in self.by_name.get(name, ()))
+
+        siblings = parent.children if parent is not None else [
+            n for n in self.by_name.get(name, ()) if n.dag and n.parent is None]
+        return any(n.name == name and n is not node for n in siblings)
+
+    def unique_name(self, name, parent=None, dag=True, node=None):
+
+        if not self.taken(name, parent, dag, node):
+            return name
+
+        base = name.rstrip("0123456789")
+        for index in itertools.count(1):
+            candidate = f"{base}{index}"
+            if not self.taken(candidate, parent, dag, node):
+                return candidate
+
+    def default_name(self, node_type):
+
+        while True:
+            self.counters[node_type] += 1
+            name = f"{node_type}{self.counters[node_type]}"
+            if not self.by_name.get(name):
+                return name
+
+    def qualify(self, name):
+
+        if name.startswith(":"):
+            return name[1:]
+        if self.namespace and ":" not in name:
+            return f"{self.namespace}:{name}"
+        return name
+
+    def create(self, node_type, name=None, parent=None, select=True):
+
+        node = FakeNode(None, node_type)
+        if node.dag:
+            node.parent = parent
+        node.name = self.unique_name(
+            self.qualify(name or self.default_name(node_type)), node.parent, node.dag)
+        if node.parent is not None:
+            node.parent.children.append(node)
+
+        self.nodes.append(node)
+        self.by_name.setdefault(node.name, []).append(node)
+        self.by_uuid.setdefault(node.uuid, []).append(node)
+        if select and node.dag:
+            self.selection = [node]
+
+        STANDIN.fire("added", node)
+        return node
+
+    def remove(self, node):
+
+        if not node.alive:
+            return
+
+        for child in list(node.children):
+            self.remove(child)
+
+        node.alive = False
+        if node.parent is not None and node in node.parent.children:
+            node.parent.children.remove(node)
+        self.by_name[node.name].remove(node)
+        self.by_uuid[node.uuid].remove(node)
+        if node in self.selection:
+            self.selection.remove(node)
+
+        for plug in [p for p in self.connections if p[0] is node]:
+            del self.connections[plug]
+        for plug, source in list(self.connections.items()):
+            if source[0] is node:
+                del self.connections[plug]
+
+        STANDIN.fire("removed", node)
+
+    def rename(self, node, name):
+
+        prev_name = node.name
+        self.by_name[node.name].remove(node)
+        node.name = self.unique_name(
+            self.qualify(name), node.parent, node.dag, node)
+        self.by_name.setdefault(node.name, []).append(node)
+
+        STANDIN.fire("renamed", node, prev_name)
+        return node
+
+    def connect(self, source, destination):
+
+        self.connections[destination] = source
+        STANDIN.fire("connection", None, FakeMPlug(*source),
+                     FakeMPlug(*destination), True)
+
+    def disconnect(self, destination):
+
+        source = self.connections.pop(destination, None)
+        if source is not None:
+            STANDIN.fire("connection", None, FakeMPlug(*source),
+                         FakeMPlug(*destination), False)
+
+    def reparent(self, node, parent):
+
+        world = node.world_matrix() if is_type(node.type, "transform") else None
+
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        if parent is not None:
+            parent.children.append(node)
+
+        name = self.unique_name(node.name, parent, True, node)
+        if name != node.name:
+            self.by_name[node.name].remove(node)
+            node.name = name
+            self.by_name.setdefault(name, []).append(node)
+
+        if world is not None:
+            node.set_world_matrix(world)
+
+        STANDIN.fire("dag", node)
+        return node
+
+    def copy(self, node, parent):
+
+        clone = self.create(node.type, node.name, parent, select=False)
+        clone.channels = dict(node.channels)
+        clone.attrs = dict(node.attrs)
+        clone.user_attrs = list(node.user_attrs)
+        clone.points = node.points
+        for child in node.children:
+            self.copy(child, clone)
+
+        return clone
+
+    def descendants(self, node):
+
+        result = []
+        for child in node.children:
+            result.append(child)
+            result.extend(self.descendants(child))
+
+        return result
+
+    def plug(self, plug):
+
+        node_name, attr = plug.split(".", 1)
+        return self.node(node_name), attr
+
+    def source(self, node, attr):
+
+        source = self.connections.get((node, attr))
+        if source is None:
+            return None
+
+        return source[0]
+
+
+class FakeCommands:
+
+    def __init__(self, standin):
+
+        self.standin = standin
+
+    @property
+    def scene(self):
+
+        return self.standin.scene
+
+    def _nodes(self, args, selection=True):
+
+        names = flatten(args)
+        if not names and selection:
+            return list(self.scene.selection)
+
+        return [self.scene.node(name) for name in names]
+
+    def _names(self, nodes, long=False):
+
+        return [self.scene.name_of(node, long) for node in nodes]
+
+    def _parent_arg(self, kwargs):
+
+        parent = flag(kwargs, "parent", "p")
+        if parent and not flag(kwargs, "world", "w"):
+            return self.scene.node(parent)
+
+        return None
+
+    def createNode(self, node_type, name=None, n=None, parent=None, p=None,
+                   skipSelect=False, ss=False, **kwargs):
+
+        name = name or n
+        parent = parent or p
+        parent_node = self.scene.node(parent) if parent else None
+
+        if node_type in SHAPE_TYPES:
+            transform = self.scene.create(
+                "transform", self.scene.default_name("transform")
+                if node_type != "arcLengthDimension"
+                else self.scene.default_name("arcLengthDimension"),
+                parent_node)
+            node = self.scene.create(node_type, name, transform)
+        else:
+            node = self.scene.create(node_type, name, parent_node)
+
+        return self.scene.name_of(node)
+
+    def group(self, *args, empty=False, em=False, name=None, n=None,
+              parent=None, p=None, world=False, w=False, **kwargs):
+
+        parent = parent or p
+        parent_node = self.scene.node(parent) if parent and not (world or w) else None
+        node = self.scene.create("transform", name or n or "group", parent_node)
+
+        if not (empty or em):
+            for child in self._nodes(args, selection=False):
+                self.scene.reparent(child, node)
+
+        return self.scene.name_of(node)
+
+    def joint(self, *args, name=None, n=None, position=None, p=None, **kwargs):
+
+        parent = None
+        if self.scene.selection and is_type(self.scene.selection[0].type, "transform"):
+            parent = self.scene.selection[0]
+
+        node = self.scene.create("joint", name or n or "joint", parent)
+        position = position or p
+        if position:
+            world = node.world_matrix().copy()
+            world[3, :3] = position
+            node.set_world_matrix(world)
+
+        return self.scene.name_of(node)
+
+    def spaceLocator(self, name=None, n=None, position=None, p=None, **kwargs):
+
+        transform = self.scene.create("transform", name or n or "locator")
+        self.scene.create("locator", f"{transform.name}Shape", transform, select=False)
+        self.scene.selection = [transform]
+
+        return [self.scene.name_of(transform)]
+
+    def curve(self, *args, name=None, n=None, point=None, p=None,
+              editPoint=None, ep=None, degree=None, d=None, **kwargs):
+
+        points = point or p or editPoint or ep or []
+        transform = self.scene.create("transform", name or n or "curve")
+        shape = self.scene.create(
+            "nurbsCurve", f"{transform.name}Shape", transform, select=False)
+        shape.points = [tuple(float(v) for v in pt) for pt in points]
+        self.scene.selection = [transform]
+
+        return self.scene.name_of(transform)
+
+    def circle(self, name=None, n=None, radius=None, r=None, normal=None,
+               nr=None, constructionHistory=None, ch=None, **kwargs):
+
+        radius = radius or r or 1.0
+        transform = self.scene.create("transform", name or n or "nurbsCircle")
+        shape = self.scene.create(
+            "nurbsCurve", f"{transform.name}Shape", transform, select=False)
+        angles = np.linspace(0.0, 2.0 * np.pi, 9)
+        shape.points = [(radius * np.cos(a), 0.0, radius * np.sin(a)) for a in angles]
+        self.scene.selection = [transform]
+
+        return [self.scene.name_of(transform)]
+
+    def duplicate(self, *args, returnRootsOnly=False, rr=False, name=None,
+                  n=None, **kwargs):
+
+        result = []
+        for node in self._nodes(args):
+            clone = self.scene.copy(node, node.parent)
+            if name or n:
+                self.scene.rename(clone, name or n)
+            result.append(clone)
+
+        self.scene.selection = list(result)
+        return self._names(result)
+
+    def parent(self, *args, world=False, w=False, add=False, shape=False,
+               s=False, relative=False, r=False, absolute=False, a=False,
+               **kwargs):
+
+        names = flatten(args)
+        if world or w:
+            children, parent = names, None
+        else:
+            children, parent = names[:-1], self.scene.node(names[-1])
+
+        result = []
+        for name in children:
+            node = self.scene.node(name)
+            if add and parent is not None:
+                instance = self.scene.create(node.type, node.name, parent, select=False)
+                instance.points = node.points
+                instance.attrs = node.attrs
+                result.append(instance)
+                continue
+            if node.parent is not parent:
+                self.scene.reparent(node, parent)
+            result.append(node)
+
+        return self._names(result)
+
+    def rename(self, *args, uuid=False, **kwargs):
+
+        if len(args) == 1:
+            node, name = self.scene.selection[0], args[0]
+        else:
+            node, name = self.scene.node(args[0]), args[1]
+
+        if uuid:
+            # Referencing one file twice gives both copies the same UUIDs.
+            self.scene.by_uuid[node.uuid].remove(node)
+            node.uuid = name
+            self.scene.by_uuid.setdefault(name, []).append(node)
+            return self.scene.name_of(node)
+
+        return self.scene.name_of(self.scene.rename(node, name))
+
+    def delete(self, *args, **kwargs):
+
+        for node in self._nodes(args):
+            self.scene.remove(node)
+
+    def select(self, *args, clear=False, cl=False, add=False, replace=False,
+               **kwargs):
+
+        if clear or cl:
+            self.scene.selection = []
+            return
+
+        nodes = self._nodes(args, selection=False)
+        if add:
+            self.scene.selection.extend(nodes)
+        else:
+            self.scene.selection = nodes
+
+    def ls(self, *args, long=False, l=False, type=None, typ=None,
+           selection=False, sl=False, shapes=False, **kwargs):
+
+        long = long or l
+        node_type = type or typ
+        if selection or sl:
+            nodes = list(self.scene.selection)
+        elif args:
+            nodes = []
+            for name in flatten(args):
+                if "*" in name or "?" in name:
+                    pattern = name.rsplit("|", 1)[-1]
+                    nodes.extend(n for n in self.scene.live_nodes()
+                                 if fnmatch.fnmatchcase(n.name, pattern))
+                else:
+                    nodes.extend(self.scene.find(name))
+        else:
+            nodes = self.scene.live_nodes()
+
+        if node_type:
+            types = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+            nodes = [n for n in nodes if any(is_type(n.type, t) for t in types)]
+        if shapes:
+            nodes = [n for n in nodes if is_type(n.type, "shape")]
+
+        return self._names(nodes, long)
+
+    def objExists(self, name):
+
+        node_name, _, attr = name.partition(".")
+        found = self.scene.find(node_name)
+        if len(found) != 1:
+            return bool(found) and not attr
+        if not attr:
+            return True
+
+        node = found[0]
+        return (attr in node.user_attrs or attr in node.attrs
+                or attr in CHANNELS or attr in ATTR_DEFAULTS)
+
+    def nodeType(self, name, **kwargs):
+
+        return self.scene.node(name).type
+
+    def listRelatives(self, *args, children=False, c=False,
+                      allDescendents=False, ad=False, shapes=False, s=False,
+                      parent=False, p=False, type=None, fullPath=False,
+                      f=False, **kwargs):
+
+        result = []
+        for node in self._nodes(args):
+            if parent or p:
+                found = [node.parent] if node.parent is not None else []
+            elif allDescendents or ad:
+                found = list(reversed(self.scene.descendants(node)))
+            else:
+                found = list(node.children)
+
+            if shapes or s:
+                found = [n for n in found if is_type(n.type, "shape")]
+            if type:
+                types = type if isinstance(type, (list, tuple)) else [type]
+                found = [n for n in found if any(is_type(n.type, t) for t in types)]
+            result.extend(found)
+
+        return self._names(result, fullPath or f) or None
+
+    def listAttr(self, *args, string=None, st=None, locked=False,
+                 userDefined=False, ud=False, **kwargs):
+
+        node = self.scene.node(flatten(args)[0])
+        pattern = string or st
+
+        if locked:
+            attrs = sorted(node.locked)
+        else:
+            attrs = list(node.user_attrs)
+            if not (userDefined or ud):
+                attrs = ["visibility", "translate", "rotate", "scale"] + attrs
+
+        if pattern:
+            attrs = [a for a in attrs if fnmatch.fnmatchcase(a, pattern)]
+
+        return attrs or None
+
+    def addAttr(self, *args, longName=None, ln=None, defaultValue=None,
+                dv=None, **kwargs):
+
+        node = self.scene.node(flatten(args)[0]) if args else self.scene.selection[0]
+        name = longName or ln
+        node.user_attrs.append(name)
+        default = defaultValue if defaultValue is not None else dv
+        if default is not None:
+            node.attrs[name] = default
+
+    def setAttr(self, plug, *values, type=None, lock=None, keyable=None,
+                channelBox=None, **kwargs):
+
+        node, attr = self.scene.plug(plug)
+        if lock is not None:
+            if lock:
+                node.locked.add(attr)
+            else:
+                node.locked.discard(attr)
+        if not values:
+            return
+
+        values = flatten(values)
+        channel = CHANNELS.get(attr)
+        if channel:
+            name, index = channel
+            if index is None:
+                node.channels[name] = tuple(float(v) for v in values[:3])
+            else:
+                current = list(node.channel(name))
+                current[index] = float(values[0])
+                node.channels[name] = tuple(current)
+        elif len(values) == 1:
+            node.attrs[attr] = values[0]
+        else:
+            node.attrs[attr] = list(values)
+
+    def getAttr(self, plug, time=None, t=None, **kwargs):
+
+        node, attr = self.scene.plug(plug)
+        time = time if time is not None else t
+        if time is None:
+            time = self.scene.time
+
+        driver = self.scene.drivers.get((node, attr))
+        if driver is not None:
+            return driver(time)
+
+        channel = CHANNELS.get(attr)
+        if channel:
+            name, index = channel
+            keys = node.keys.get(attr)
+            if keys:
+                return self._evaluate_keys(keys, time)
+            value = node.channel(name)
+            return value[index] if index is not None else [tuple(value)]
+
+        keys = node.keys.get(attr)
+        if keys:
+            return self._evaluate_keys(keys, time)
+
+        compute = getattr(self, f"_compute_{node.type}", None)
+        if compute is not None:
+            value = compute(node, attr)
+            if value is not None:
+                return value
+
+        if attr in node.attrs:
+            return node.attrs[attr]
+        if attr == "matrix":
+            return node.local_matrix().reshape(16).tolist()
+        if attr.startswith("worldMatrix"):
+            return node.world_matrix().reshape(16).tolist()
+        if attr.startswith("worldInverseMatrix"):
+            return np.linalg.inv(node.world_matrix()).reshape(16).tolist()
+
+        return ATTR_DEFAULTS.get(attr, 0.0)
+
+    @staticmethod
+    def _evaluate_keys(keys, time):
+
+        times = sorted(keys)
+        if time <= times[0]:
+            return keys[times[0]]
+        if time >= times[-1]:
+            return keys[times[-1]]
+
+        return float(np.interp(time, times, [keys[k] for k in times]))
+
+    def _input_points(self, node, attr):
+
+        source = self.scene.source(node, attr)
+        return source.world_points() if source is not None else np.zeros((0, 3))
+
+    @staticmethod
+    def _polyline_lengths(points):
+
+        if len(points) < 2:
+            return np.zeros(len(points))
+
+        segments = np.linalg.norm(np.diff(points, axis=0), axis=1)
+        return np.concatenate([[0.0], np.cumsum(segments)])
+
+    def _sample(self, points, fraction):
+
+        lengths = self._polyline_lengths(points)
+        if len(points) < 2 or lengths[-1] == 0.0:
+            return points[0] if len(points) else np.zeros(3), np.array([1.0, 0.0, 0.0])
+
+        target = np.clip(fraction, 0.0, 1.0) * lengths[-1]
+        index = min(int(np.searchsorted(lengths, target, side="right")) - 1,
+                    len(points) - 2)
+        span = lengths[index + 1] - lengths[index]
+        local = (target - lengths[index]) / span if span else 0.0
+        tangent = points[index + 1] - points[index]
+
+        return points[index] + tangent * local, tangent
+
+    def _compute_curveInfo(self, node, attr):
+
+        if attr == "arcLength":
+            return float(self._polyline_lengths(
+                self._input_points(node, "inputCurve"))[-1])
+
+        return None
+
+    def _compute_nearestPointOnCurve(self, node, attr):
+
+        if attr not in ("parameter", "result.parameter"):
+            return None
+
+        points = self._input_points(node, "inputCurve")
+        position = np.asarray(node.attrs.get("inPosition", (0.0, 0.0, 0.0)), dtype=float)
+        best, best_param = None, 0.0
+        for index in range(len(points) - 1):
+            a, b = points[index], points[index + 1]
+            ab = b - a
+            denom = float(ab @ ab)
+            local = float(np.clip((position - a) @ ab / denom, 0.0, 1.0)) if denom else 0.0
+            distance = np.linalg.norm(a + ab * local - position)
+            if best is None or distance < best:
+                best, best_param = distance, index + local
+
+        return best_param
+
+    def _compute_arcLengthDimension(self, node, attr):
+
+        if attr != "arcLength":
+            return None
+
+        points = self._input_points(node, "nurbsGeometry")
+        lengths = self._polyline_lengths(points)
+        if len(points) < 2:
+            return 0.0
+
+        param = float(node.attrs.get("uParamValue", 0.0))
+        index = min(int(param), len(points) - 2)
+        local = param - index
+        return float(lengths[index] + (lengths[index + 1] - lengths[index]) * local)
+
+    def _compute_pointOnCurveInfo(self, node, attr):
+
+        if attr not in ("position", "tangent", "normalizedTangent"):
+            return None
+
+        points = self._input_points(node, "inputCurve")
+        param = float(node.attrs.get("parameter", 0.0))
+        if not node.attrs.get("turnOnPercentage"):
+            param = param / max(len(points) - 1, 1)
+        position, tangent = self._sample(points, param)
+        value = position if attr == "position" else tangent
+
+        return [tuple(float(v) for v in value)]
+
+    def _input(self, node, attr, default=None):
+
+        source = self.scene.connections.get((node, attr))
+        if source is None:
+            return node.attrs.get(attr, default)
+
+        source_node, source_attr = source
+        return self.getAttr(f"{self.scene.name_of(source_node, long=True)}.{source_attr}")
+
+    def _input_matrix(self, node, attr):
+
+        value = self._input(node, attr)
+        if value is None:
+            return IDENTITY
+        return np.asarray(value, dtype=float).reshape(4, 4)
+
+    def _input_vector(self, node, attr, default):
+
+        value = self._input(node, attr, default)
+        vector = [self._input(node, f"{attr}{axis}", value[index])
+                  for index, axis in enumerate("XYZ")]
+        return np.asarray(vector, dtype=float)
+
+    def _indices(self, node, prefix):
+
+        # Sparse array plugs like matrixIn[2] or target[0].weight, set or connected.
+        plugs = list(node.attrs)
+        plugs.extend(attr for dst, attr in self.scene.connections if dst is node)
+        return sorted({int(plug[len(prefix):].partition("]")[0])
+                       for plug in plugs if plug.startswith(prefix)})
+
+    def _compute_multMatrix(self, node, attr):
+
+        if attr != "matrixSum":
+            return None
+
+        result = IDENTITY
+        for index in self._indices(node, "matrixIn["):
+            result = result @ self._input_matrix(node, f"matrixIn[{index}]")
+
+        return result.reshape(16).tolist()
+
+    def _compute_composeMatrix(self, node, attr):
+
+        if attr != "outputMatrix":
+            return None
+
+        matrix = rig_builders_matrix.compose_matrices(
+            self._input_vector(node, "inputTranslate", (0.0, 0.0, 0.0)),
+            self._input_vector(node, "inputRotate", (0.0, 0.0, 0.0)),
+            self._input_vector(node, "inputScale", (1.0, 1.0, 1.0)),
+            self._input_vector(node, "inputShear", (0.0, 0.0, 0.0)),
+            int(self._input(node, "inputRotateOrder", 0)))[0]
+
+        return matrix.reshape(16).tolist()
+
+    def _compute_blendMatrix(self, node, attr):
+
+        if attr != "outputMatrix":
+            return None
+
+        # Translation and scale blend linearly; rotation is the lerp projected
+        # back onto a rotation, which matches a slerp at rest and at the ends.
+        result = self._input_matrix(node, "inputMatrix")
+        for index in self._indices(node, "target["):
+            weight = float(self._input(node, f"target[{index}].weight", 1.0))
+            target = self._input_matrix(node, f"target[{index}].targetMatrix")
+
+            scale = np.linalg.norm(result[:3, :3], axis=1)
+            target_scale = np.linalg.norm(target[:3, :3], axis=1)
+            rotation = (result[:3, :3] / scale[:, None]) * (1.0 - weight) \
+                + (target[:3, :3] / target_scale[:, None]) * weight
+            u, _, vt = np.linalg.svd(rotation)
+
+            blended = np.eye(4)
+            blended[:3, :3] = (scale + (target_scale - scale) * weight)[:, None] * (u @ vt)
+            blended[3, :3] = result[3, :3] + (target[3, :3] - result[3, :3]) * weight
+            result = blended
+
+        return result.reshape(16).tolist()
+
+    def _compute_aimMatrix(self, node, attr):
+
+        if attr != "outputMatrix":
+            return None
+
+        matrix = self._input_matrix(node, "inputMatrix")
+        scale = np.linalg.norm(matrix[:3, :3], axis=1)
+        rotation = matrix[:3, :3] / scale[:, None]
+
+        primary_axis = self._input_vector(node, "primaryInputAxis", (1.0, 0.0, 0.0))
+        secondary_axis = self._input_vector(node, "secondaryInputAxis", (0.0, 1.0, 0.0))
+
+        aim = self._input_matrix(node, "primaryTargetMatrix")[3, :3] - matrix[3, :3]
+        aim = aim / np.linalg.norm(aim)
+
+        mode = int(self._input(node, "secondaryMode", 0))
+        if mode == 1:
+            up = self._input_matrix(node, "secondaryTargetMatrix")[3, :3] - matrix[3, :3]
+        elif mode == 2:
+            up = self._input_vector(node, "secondaryTargetVector", (0.0, 1.0, 0.0)) \
+                @ self._input_matrix(node, "secondaryTargetMatrix")[:3, :3]
+        else:
+            up = secondary_axis @ rotation
+
+        up = up - aim * (up @ aim)
+        up = up / np.linalg.norm(up)
+        local = np.array([primary_axis, secondary_axis, np.cross(primary_axis, secondary_axis)])
+        world = np.array([aim, up, np.cross(aim, up)])
+
+        result = np.eye(4)
+        result[:3, :3] = scale[:, None] * (np.linalg.inv(local) @ world)
+        result[3, :3] = matrix[3, :3]
+
+        return result.reshape(16).tolist()
+
+    def xform(self, *args, query=False, q=False, matrix=None, m=None,
+              worldSpace=False, ws=False, objectSpace=False, os=False,
+              translation=None, t=None, rotation=None, ro=None, scale=None,
+              s=None, shear=None, sh=None, relative=False, r=False, **kwargs):
+
+        nodes = self._nodes(args)
+        world = worldSpace or ws
+        matrix = matrix if matrix is not None else m
+        translation = translation if translation is not None else t
+        rotation = rotation if rotation is not None else ro
+        scale = scale if scale is not None else s
+        shear = shear if shear is not None else sh
+
+        if query or q:
+            node = nodes[0]
+            if matrix:
+                value = node.world_matrix() if world else node.local_matrix()
+                return value.reshape(16).tolist()
+            if translation:
+                if world:
+                    return node.world_matrix()[3, :3].tolist()
+                return list(node.channel("translate"))
+            if rotation:
+                return list(node.channel("rotate"))
+            if scale:
+                return list(node.channel("scale"))
+            return None
+
+        for node in nodes:
+            if matrix is not None and not isinstance(matrix, bool):
+                if world:
+                    node.set_world_matrix(matrix)
+                else:
+                    node.set_local_matrix(matrix)
+                continue
+
+            if world and translation is not None:
+                m_world = node.world_matrix().copy()
+                m_world[3, :3] = translation
+                node.set_world_matrix(m_world)
+                translation = None
+
+            for name, value in (("translate", translation), ("rotate", rotation),
+                                ("scale", scale), ("shear", shear)):
+                if value is None:
+                    continue
+                value = tuple(float(v) for v in value)
+                if relative or r:
+                    value = tuple(a + b for a, b in zip(node.channel(name), value))
+                node.channels[name] = value
+
+    def move(self, *args, relative=False, r=False, objectSpace=False,
+             os=False, worldSpace=False, ws=False, **kwargs):
+
+        values = [a for a in args if isinstance(a, (int, float))]
+        nodes = self._nodes([a for a in args if not isinstance(a, (int, float))])
+        offset = np.asarray(values[:3], dtype=float)
+
+        for node in nodes:
+            m_world = node.world_matrix().copy()
+            if relative or r:
+                if objectSpace or os:
+                    axes = m_world[:3, :3]
+                    axes = axes / np.linalg.norm(axes, axis=1)[:, None]
+                    m_world[3, :3] += offset @ axes
+                else:
+                    m_world[3, :3] += offset
+            else:
+                m_world[3, :3] = offset
+            node.set_world_matrix(m_world)
+
+    def rotate(self, *args, relative=False, r=False, **kwargs):
+
+        values = [a for a in args if isinstance(a, (int, float))]
+        nodes = self._nodes([a for a in args if not isinstance(a, (int, float))])
+
+        for node in nodes:
+            current = node.channel("rotate") if (relative or r) else (0.0, 0.0, 0.0)
+            node.channels["rotate"] = tuple(a + b for a, b in zip(current, values))
+
+    def matchTransform(self, *args, position=False, pos=False, rotation=False,
+                       rot=False, scale=False, scl=False, positionX=False,
+                       positionY=False, positionZ=False, **kwargs):
+
+        nodes = self._nodes(args, selection=False)
+        target = nodes[-1].world_matrix()
+        axes = [positionX, positionY, positionZ]
+        everything = not any([position, pos, rotation, rot, scale, scl] + axes)
+
+        for node in nodes[:-1]:
+            current = node.world_matrix()
+            translate, rotate, scl_, shear = rig_builders_matrix.decompose_matrices(current)
+            t_translate, t_rotate, t_scale, _ = rig_builders_matrix.decompose_matrices(target)
+
+            if everything or position or pos:
+                translate = t_translate
+            elif any(axes):
+                for index, enabled in enumerate(axes):
+                    if enabled:
+                        translate[0, index] = t_translate[0, index]
+            if everything or rotation or rot:
+                rotate = t_rotate
+            if everything or scale or scl:
+                scl_ = t_scale
+
+            node.set_world_matrix(rig_builders_matrix.compose_matrices(
+                translate, rotate, scl_, shear)[0])
+
+    def makeIdentity(self, *args, apply=False, a=False, translate=False,
+                     t=False, rotate=False, r=False, scale=False, s=False,
+                     jointOrient=False, jo=False, **kwargs):
+
+        channels = []
+        if translate or t:
+            channels.append("translate")
+        if rotate or r:
+            channels.append("rotate")
+        if scale or s:
+            channels.append("scale")
+        if not channels:
+            channels = ["translate", "rotate", "scale"]
+
+        for node in self._nodes(args):
+            for name in channels:
+                node.channels.pop(name, None)
+            if jointOrient or jo:
+                node.channels.pop("jointOrient", None)
+
+    def connectAttr(self, source, destination, force=False, f=False, **kwargs):
+
+        self.scene.connect(self.scene.plug(source), self.scene.plug(destination))
+
+    def disconnectAttr(self, source, destination, **kwargs):
+
+        self.scene.disconnect(self.scene.plug(destination))
+
+    def listConnections(self, *args, type=None, t=None, source=True, s=True,
+                        destination=True, d=True, connections=False,
+                        c=False, plugs=False, p=False, **kwargs):
+
+        names = flatten(args)
+        node_type = type or t
+        result = []
+        for name in names:
+            node_name, _, attr = name.partition(".")
+            node = self.scene.node(node_name)
+            for (dst, dst_attr), (src, src_attr) in self.scene.connections.items():
+                if dst is node and (not attr or dst_attr == attr):
+                    other, own, other_attr = src, dst_attr, src_attr
+                elif src is node and (not attr or src_attr == attr):
+                    other, own, other_attr = dst, src_attr, dst_attr
+                else:
+                    continue
+                if node_type and not is_type(other.type, node_type):
+                    continue
+                other_name = self.scene.name_of(other)
+                if plugs or p:
+                    other_name = f"{other_name}.{other_attr}"
+                if connections or c:
+                    result.append(f"{self.scene.name_of(node)}.{own}")
+                result.append(other_name)
+
+        return result or None
+
+    def _constraint(self, kind, args, kwargs):
+
+        nodes = self._nodes(args)
+        targets, constrained = nodes[:-1], nodes[-1]
+        name = flag(kwargs, "name", "n") or f"{constrained.name}_{kind}1"
+        node = self.scene.create(kind, name, constrained, select=False)
+        for index, target in enumerate(targets):
+            attr = f"{target.name.rpartition(':')[2]}W{index}"
+            node.user_attrs.append(attr)
+            node.attrs[attr] = 1.0
+            self.scene.connect((target, "parentMatrix"),
+                               (node, f"target[{index}].targetParentMatrix"))
+
+        return [self.scene.name_of(node)]
+
+    def parentConstraint(self, *args, **kwargs):
+
+        return self._constraint("parentConstraint", args, kwargs)
+
+    def orientConstraint(self, *args, **kwargs):
+
+        return self._constraint("orientConstraint", args, kwargs)
+
+    def pointConstraint(self, *args, **kwargs):
+
+        return self._constraint("pointConstraint", args, kwargs)
+
+    def aimConstraint(self, *args, **kwargs):
+
+        return self._constraint("aimConstraint", args, kwargs)
+
+    def poleVectorConstraint(self, *args, **kwargs):
+
+        return self._constraint("poleVectorConstraint", args, kwargs)
+
+    def ikHandle(self, *args, startJoint=None, sj=None, endEffector=None,
+                 ee=None, name=None, n=None, curve=None, c=None, **kwargs):
+
+        end = self.scene.node(endEffector or ee)
+        handle = self.scene.create("ikHandle", name or n or "ikHandle")
+        handle.set_world_matrix(end.world_matrix())
+        effector = self.scene.create("ikEffector", "effector", end.parent, select=False)
+
+        result = [self.scene.name_of(handle), self.scene.name_of(effector)]
+        if flag(kwargs, "createCurve", "ccv") and not (curve or c):
+            result.append(self.curve(p=[(0, 0, 0)] * 4, n="curve"))
+
+        return result
+
+    def skinCluster(self, *args, name=None, n=None, **kwargs):
+
+        node = self.scene.create("skinCluster", name or n)
+        return [self.scene.name_of(node)]
+
+    def angleBetween(self, vector1=None, v1=None, vector2=None, v2=None,
+                     euler=False, er=False, **kwargs):
+
+        a = np.asarray(vector1 or v1, dtype=float)
+        b = np.asarray(vector2 or v2, dtype=float)
+        a = a / np.linalg.norm(a)
+        b = b / np.linalg.norm(b)
+        axis = np.cross(a, b)
+        sin = np.linalg.norm(axis)
+        cos = float(np.clip(a @ b, -1.0, 1.0))
+        if sin < 1.0e-9:
+            return [0.0, 0.0, 0.0]
+
+        axis = axis / sin
+        x, y, z = axis
+        k = np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+        rotation = np.eye(3) + sin * k + (1.0 - cos) * (k @ k)
+
+        return rig_builders_matrix.matrices_to_euler(rotation.T)[0].tolist()
+
+    def setKeyframe(self, *args, attribute=None, at=None, time=None, t=None,
+                    value=None, v=None, **kwargs):
+
+        time = time if time is not None else t
+        if isinstance(time, (list, tuple)):
+            time = time[0]
+        if time is None:
+            time = self.scene.time
+        value = value if value is not None else v
+
+        attributes = attribute or at
+        if isinstance(attributes, str):
+            attributes = [attributes]
+
+        for name in flatten(args) or [self.scene.name_of(n) for n in self.scene.selection]:
+            node_name, _, plug_attr = name.partition(".")
+            node = self.scene.node(node_name)
+            for attr in attributes or ([plug_attr] if plug_attr else
+                                       ["translate", "rotate", "scale"]):
+                key_value = value
+                if key_value is None:
+                    key_value = self.getAttr(f"{node_name}.{attr}", time=time)
+                node.keys.setdefault(attr, {})[float(time)] = key_value
+            self.standin.fire("anim_curve", node)
+
+        return 1
+
+    def cutKey(self, *args, time=None, t=None, attribute=None, at=None, **kwargs):
+
+        time = time if time is not None else t
+        for node in self._nodes(args):
+            for keys in node.keys.values():
+                for key in list(keys):
+                    if time is None or time[0] <= key <= time[1]:
+                        del keys[key]
+            self.standin.fire("anim_curve", node)
+
+    def keyframe(self, *args, query=False, q=False, timeChange=False,
+                 tc=False, valueChange=False, vc=False, attribute=None,
+                 at=None, **kwargs):
+
+        attr = attribute or at
+        for node in self._nodes(args):
+            keys = node.keys.get(attr) if attr else next(iter(node.keys.values()), {})
+            if keys:
+                times = sorted(keys)
+                if valueChange or vc:
+                    return [keys[k] for k in times]
+                return times
+
+        return None
+
+    def playbackOptions(self, query=False, q=False, minTime=None, min=None,
+                        maxTime=None, max=None, animationStartTime=None,
+                        ast=None, animationEndTime=None, aet=None, **kwargs):
+
+        minimum = minTime if minTime is not None else min
+        maximum = maxTime if maxTime is not None else max
+
+        if query or q:
+            if minimum:
+                return self.scene.min_time
+            if maximum:
+                return self.scene.max_time
+            return None
+
+        if minimum is not None:
+            self.scene.min_time = float(minimum)
+        if maximum is not None:
+            self.scene.max_time = float(maximum)
+
+    def currentTime(self, *args, query=False, q=False, edit=False, e=False,
+                    **kwargs):
+
+        if query or q:
+            return self.scene.time
+        if args:
+            self.scene.time = float(args[0])
+
+        return self.scene.time
+
+    def hide(self, *args, **kwargs):
+
+        for node in self._nodes(args, selection=False):
+            node.attrs["visibility"] = 0
+
+    def showHidden(self, *args, **kwargs):
+
+        for node in self._nodes(args, selection=False):
+            node.attrs["visibility"] = 1
+
+    def internalVar(self, userTmpDir=False, utd=False, **kwargs):
+
+        return "/tmp/"
+
+    def loadPlugin(self, path, quiet=False, qt=False, **kwargs):
+
+        return self.standin.load_plugin(path)
+
+    def pluginInfo(self, path, query=False, q=False, loaded=False, l=False,
+                   **kwargs):
+
+        return path in self.standin.plugins
+
+    def file(self, *args, new=False, force=False, f=False, query=False,
+             q=False, sceneName=False, sn=False, **kwargs):
+
+        if new:
+            self.standin.new_scene()
+            return None
+        if query or q:
+            return ""
+
+        return None
+
+    def namespace(self, add=None, set=None, exists=None, query=False, q=False,
+                  **kwargs):
+
+        if exists is not None:
+            return exists.strip(":") in self.scene.namespaces
+        if add is not None:
+            name = add.lstrip(":") if add.startswith(":") else self.scene.qualify(add)
+            self.scene.namespaces.add(name)
+            return f":{name}"
+        if set is not None:
+            name = set.strip(":")
+            if name not in self.scene.namespaces:
+                raise RuntimeError(f"Namespace does not exist: {set}")
+            self.scene.namespace = name
+            return f":{name}"
+
+        return None
+
+    def namespaceInfo(self, currentNamespace=False, cur=False, absoluteName=False,
+                      an=False, **kwargs):
+
+        return f":{self.scene.namespace}"
+
+    def undoInfo(self, *args, **kwargs):
+
+        return None
+
+    def refresh(self, *args, **kwargs):
+
+        return None
+
+    def setToolTo(self, *args, **kwargs):
+
+        return None
+
+    def viewFit(self, *args, **kwargs):
+
+        return None
+
+    def keyTangent(self, *args, **kwargs):
+
+        return None
+
+    def setInfinity(self, *args, **kwargs):
+
+        return None
+
+    def filterCurve(self, *args, **kwargs):
+
+        return None
+
+    def bakeResults(self, *args, **kwargs):
+
+        return None
+
+    def animLayer(self, *args, **kwargs):
+
+        return None
+
+    def dgdirty(self, *args, **kwargs):
+
+        return None
+
+    def listHistory(self, *args, **kwargs):
+
+        # Upstream through connections only, like listHistory on the DG.
+        pending = self._nodes(args, selection=False)
+        seen = []
+        while pending:
+            node = pending.pop()
+            if node in seen:
+                continue
+            seen.append(node)
+            pending.extend(source for (target, _), (source, _) in
+                           self.scene.connections.items() if target is node)
+
+        return self._names(seen)
+
+    def dgtimer(self, *args, query=False, q=False, **kwargs):
+
+        # The stand-in never evaluates the DG, so every timer reads zero.
+        if query or q:
+            return 0.0
+        return None
+
+    def evaluationManager(self, query=False, q=False, mode=None, **kwargs):
+
+        if query or q:
+            return [self.scene.evaluation_mode]
+        if mode is not None:
+            self.scene.evaluation_mode = mode
+        return None
+
+
+class FakeMObject:
+
+    kNullObj = None
+
+    def __init__(self, node=None):
+
+        self.node = node
+
+    def hasFn(self, fn):
+
+        if self.node is None:
+            return False
+        if fn == FakeMFn.kDagNode:
+            return self.node.dag
+        if fn == FakeMFn.kTransform:
+            return is_type(self.node.type, "transform")
+        if fn == FakeMFn.kJoint:
+            return self.node.type == "joint"
+
+        return False
+
+    def isNull(self):
+
+        return self.node is None
+
+
+class FakeMFn:
+
+    kDagNode = 107
+    kTransform = 110
+    kJoint = 121
+    kNumericAttribute = 567
+    kUnitAttribute = 568
+    kEnumAttribute = 569
+
+
+class FakeMObjectHandle:
+
+    def __init__(self, obj):
+
+        self.obj = obj
+
+    def object(self):
+
+        return self.obj
+
+    def isValid(self):
+
+        return self.obj.node is not None and self.obj.node.alive
+
+
+class FakeMUuid:
+
+    def __init__(self, value):
+
+        self.value = value
+
+    def asString(self):
+
+        return self.value
+
+
+class FakeMDagPath:
+
+    def __init__(self, node):
+
+        self._node = node
+
+    def fullPathName(self):
+
+        return self._node.full_path()
+
+    def partialPathName(self):
+
+        return STANDIN.scene.display(self._node)
+
+    def node(self):
+
+        return FakeMObject(self._node)
+
+    def inclusiveMatrix(self):
+
+        STANDIN.calls["MDagPath.inclusiveMatrix"] += 1
+        return self._node.world_matrix().reshape(16).tolist()
+
+    def extendToShape(self):
+
+        shapes = [c for c in self._node.children if is_type(c.type, "shape")]
+        if shapes:
+            self._node = shapes[0]
+        return self
+
+
+class FakeMPoint:
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+
+class FakeMSpace:
+
+    kObject = 2
+    kWorld = 4
+
+
+class FakeMFnNurbsCurve:
+
+    # Stand-in curves are polylines, i.e. degree 1 curves through their points,
+    # parameterized by chord length like the pointOnCurveInfo stand-in.
+
+    def __init__(self, dag):
+
+        STANDIN.calls["MFnNurbsCurve"] += 1
+        self._node = dag._node
+
+    @property
+    def degree(self):
+
+        return 1
+
+    def cvPositions(self, space=FakeMSpace.kObject):
+
+        if space == FakeMSpace.kWorld:
+            points = self._node.world_points()
+        else:
+            points = np.asarray(self._node.points or [], dtype=float).reshape(-1, 3)
+        return [FakeMPoint(*point) for point in points]
+
+    def knots(self):
+
+        points = np.asarray(self._node.points or [], dtype=float).reshape(-1, 3)
+        return FakeCommands._polyline_lengths(points).tolist()
+
+
+class FakeMFnDependencyNode:
+
+    def __init__(self, obj=None):
+
+        self.obj = obj
+
+    def name(self):
+
+        return self.obj.node.name
+
+    def uuid(self):
+
+        return FakeMUuid(self.obj.node.uuid)
+
+    def typeName(self):
+
+        return self.obj.node.type
+
+    def findPlug(self, attr, want_networked=False):
+
+        return FakeMPlug(self.obj.node, attr)
+
+
+class FakeMFnDagNode(FakeMFnDependencyNode):
+
+    def childCount(self):
+
+        return len(self.obj.node.children)
+
+    def child(self, index):
+
+        return FakeMObject(self.obj.node.children[index])
+
+    def fullPathName(self):
+
+        return self.obj.node.full_path()
+
+    def partialPathName(self):
+
+        return STANDIN.scene.display(self.obj.node)
+
+
+class FakeMPlug:
+
+    def __init__(self, node, attr):
+
+        self._node = node
+        self.attr = attr
+
+    def name(self):
+
+        return f"{STANDIN.scene.display(self._node)}.{self.attr}"
+
+    def node(self):
+
+        return FakeMObject(self._node)
+
+    def attribute(self):
+
+        return FakeMObject()
+
+    def child(self, index):
+
+        if self.attr in ("shear", "sh"):
+            return FakeMPlug(self._node, self.attr + ("XY", "XZ", "YZ")[index])
+        return FakeMPlug(self._node, self.attr + "XYZ"[index])
+
+    def _value(self):
+
+        context = STANDIN.context
+        time = context.time.value if context is not None and context.time else None
+        return STANDIN.commands.getAttr(self.name(), time=time)
+
+    def asDouble(self):
+
+        STANDIN.calls["MPlug.asDouble"] += 1
+        return float(self._value())
+
+    def asInt(self):
+
+        STANDIN.calls["MPlug.asInt"] += 1
+        return int(self._value())
+
+    def asMObject(self):
+
+        STANDIN.calls["MPlug.asMObject"] += 1
+        return FakeMObject(self._value())
+
+
+class FakeMTime:
+
+    def __init__(self, value=0.0, unit=None):
+
+        self.value = float(value)
+
+    @staticmethod
+    def uiUnit():
+
+        return None
+
+
+class FakeMDGContext:
+
+    def __init__(self, time=None):
+
+        self.time = time
+
+    def makeCurrent(self):
+
+        previous = STANDIN.context or FakeMDGContext()
+        STANDIN.context = self if self.time is not None else None
+        return previous
+
+
+class FakeMFnMatrixData:
+
+    def __init__(self, obj=None):
+
+        self.obj = obj
+
+    def matrix(self):
+
+        return list(self.obj.node)
+
+    def create(self, matrix):
+
+        return list(matrix)
+
+
+class FakeMMatrix(list):
+
+    pass
+
+
+class FakeMUnitValue:
+
+    kInternal = 0
+
+    def __init__(self, value, unit=0):
+
+        self.value = value
+
+    @staticmethod
+    def uiUnit():
+
+        return FakeMUnitValue.kInternal
+
+
+class FakeMFnUnitAttribute:
+
+    kAngle = 1
+    kDistance = 2
+    kTime = 3
+
+    def __init__(self, obj=None):
+
+        self.obj = obj
+
+    def unitType(self):
+
+        return 0
+
+
+class FakeMFnNumericData:
+
+    kBoolean = 1
+    kByte = 2
+    kChar = 3
+    kShort = 4
+    kInt = 7
+    kFloat = 11
+    kDouble = 14
+
+
+class FakeMFnNumericAttribute:
+
+    def __init__(self, obj=None):
+
+        self.obj = obj
+
+    def numericType(self):
+
+        return FakeMFnNumericData.kDouble
+
+
+class FakeMDGModifier:
+
+    def __init__(self):
+
+        self.ops = []
+        self.done = 0
+        self.undo = []
+
+    def createNode(self, node_type):
+
+        obj = FakeMObject()
+        self.ops.append(("create", obj, node_type))
+        return obj
+
+    def renameNode(self, obj, name):
+
+        self.ops.append(("rename", obj, name))
+
+    def connect(self, source, destination):
+
+        self.ops.append(("connect", source, destination))
+
+    def _set(self, plug, value):
+
+        self.ops.append(("set", plug, getattr(value, "value", value)))
+
+    newPlugValue = _set
+    newPlugValueBool = _set
+    newPlugValueInt = _set
+    newPlugValueDouble = _set
+    newPlugValueString = _set
+    newPlugValueMAngle = _set
+    newPlugValueMDistance = _set
+
+    def doIt(self):
+
+        STANDIN.calls["MDGModifier.doIt"] += 1
+        scene = STANDIN.scene
+        commands = STANDIN.commands
+
+        for op, target, value in self.ops[self.done:]:
+            if op == "create":
+                target.node = scene.create(value, select=False)
+                self.undo.append(("create", target.node, None))
+            elif op == "rename":
+                self.undo.append(("rename", target.node, target.node.name))
+                scene.rename(target.node, value)
+            elif op == "set":
+                previous = commands.getAttr(target.name())
+                commands.setAttr(target.name(), value)
+                self.undo.append(("set", target, previous))
+            else:
+                commands.connectAttr(target.name(), value.name())
+                self.undo.append(("connect", value, None))
+
+        self.done = len(self.ops)
+
+    def undoIt(self):
+
+        scene = STANDIN.scene
+        for op, target, value in reversed(self.undo):
+            if op == "create":
+                scene.remove(target)
+            elif op == "rename":
+                scene.rename(target, value)
+            elif op == "set":
+                STANDIN.commands.setAttr(target.name(), value)
+            else:
+                scene.disconnect((target._node, target.attr))
+
+        self.undo = []
+        self.done = 0
+
+
+class FakeMPxCommand:
+
+    def __init__(self):
+
+        pass
+
+
+class FakeMFnPlugin:
+
+    def __init__(self, obj=None, vendor="", version="", api_version="Any"):
+
+        self.obj = obj
+
+    def registerCommand(self, name, creator, syntax=None):
+
+        STANDIN.register_command(name, creator)
+
+    def deregisterCommand(self, name):
+
+        STANDIN.deregister_command(name)
+
+
+class FakeMSelectionList:
+
+    def __init__(self):
+
+        self.items = []
+
+    def add(self, name):
+
+        node_name, _, attr = name.partition(".")
+        node = STANDIN.scene.node(node_name)
+        self.items.append(FakeMPlug(node, attr) if attr else node)
+        return self
+
+    def getPlug(self, index):
+
+        return self.items[index]
+
+    def length(self):
+
+        return len(self.items)
+
+    def getDependNode(self, index):
+
+        return FakeMObject(self.items[index])
+
+    def getDagPath(self, index):
+
+        return FakeMDagPath(self.items[index])
+
+
+class FakeMessages:
+
+    def __init__(self, standin):
+
+        self.standin = standin
+
+    def make(self):
+
+        standin = self.standin
+
+        class MMessage:
+
+            @staticmethod
+            def removeCallbacks(ids):
+
+                for callback_id in ids:
+                    standin.remove_callback(callback_id)
+
+            @staticmethod
+            def removeCallback(callback_id):
+
+                standin.remove_callback(callback_id)
+
+        class MDGMessage:
+
+            @staticmethod
+            def addNodeAddedCallback(func, node_type="dependNode", client_data=None):
+
+                return standin.add_callback("added", func, client_data)
+
+            @staticmethod
+            def addNodeRemovedCallback(func, node_type="dependNode", client_data=None):
+
+                return standin.add_callback("removed", func, client_data)
+
+            @staticmethod
+            def addConnectionCallback(func, client_data=None):
+
+                return standin.add_callback("connection", func, client_data)
+
+        class MAnimMessage:
+
+            # The stand-in keeps keys on the animated node itself, so the
+            # edited "curve" handed to the callback is that node.
+
+            @staticmethod
+            def addAnimCurveEditedCallback(func, client_data=None):
+
+                return standin.add_callback("anim_curve", func, client_data)
+
+        class MNodeMessage:
+
+            @staticmethod
+            def addNameChangedCallback(node, func, client_data=None):
+
+                return standin.add_callback("renamed", func, client_data)
+
+        class MDagMessage:
+
+            @staticmethod
+            def addAllDagChangesCallback(func, client_data=None):
+
+                return standin.add_callback("dag", func, client_data)
+
+        class MSceneMessage:
+
+            kBeforeNew = "before_new"
+            kAfterNew = "after_new"
+            kBeforeOpen = "before_open"
+            kAfterOpen = "after_open"
+
+            @staticmethod
+            def addCallback(message, func, client_data=None):
+
+                return standin.add_callback(message, func, client_data)
+
+        return (MMessage, MDGMessage, MNodeMessage, MDagMessage, MSceneMessage,
+                MAnimMessage)
+
+
+class MayaStandIn:
+
+    def __init__(self):
+
+        self.scene = FakeScene()
+        self.calls = Counter()
+        self.callbacks = {}
+        self._callback_ids = itertools.count(1)
+        self.commands = FakeCommands(self)
+        self.plugins = {}
+        self.context = None
+        self.cmds = None
+        self.om = None
+
+    def new_scene(self):
+
+        self.fire("before_new")
+        self.scene = FakeScene()
+        self.fire("after_new")
+
+    def reset_calls(self):
+
+        self.calls = Counter()
+
+    def add_callback(self, kind, func, client_data=None):
+
+        callback_id = next(self._callback_ids)
+        self.callbacks[callback_id] = (kind, func, client_data)
+        return callback_id
+
+    def remove_callback(self, callback_id):
+
+        self.callbacks.pop(callback_id, None)
+
+    def fire(self, kind, node=None, *args):
+
+        for callback_kind, func, client_data in list(self.callbacks.values()):
+            if callback_kind != kind:
+                continue
+            if kind == "connection":
+                func(*args, client_data)
+            elif kind == "anim_curve":
+                func([FakeMObject(node)], client_data)
+            elif node is None:
+                func(client_data)
+            elif kind == "dag":
+                parent = FakeMDagPath(node.parent) if node.parent else None
+                func(0, FakeMDagPath(node), parent, client_data)
+            else:
+                func(FakeMObject(node), *args, client_data)
+
+    def load_plugin(self, path):
+
+        if path not in self.plugins:
+            name = "plugin_" + path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.initializePlugin(FakeMObject())
+            self.plugins[path] = module
+
+        return [path]
+
+    def register_command(self, name, creator):
+
+        def command(*args, **kwargs):
+
+            return creator().doIt(list(args))
+
+        setattr(self.cmds, name, self._record(name, command))
+
+    def deregister_command(self, name):
+
+        if hasattr(self.cmds, name):
+            delattr(self.cmds, name)
+
+    def animate(self, plug, func):
+
+        node, attr = self.scene.plug(plug)
+        self.scene.drivers[(node, attr)] = func
+
+    def _record(self, name, func):
+
+        standin = self
+
+        def command(*args, **kwargs):
+
+            standin.calls[name] += 1
+            return func(*args, **kwargs)
+
+        command.__name__ = name
+        return command
+
+    def _unknown_command(self, name):
+
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        return self._record(name, lambda *args, **kwargs: None)
+
+    def install(self):
+
+        if self.cmds is not None:
+            return self
+
+        cmds = types.ModuleType("maya.cmds")
+        for name in dir(FakeCommands):
+            if name.startswith("_") or name == "scene":
+                continue
+            setattr(cmds, name, self._record(name, getattr(self.commands, name)))
+        cmds.__getattr__ = self._unknown_command
+
+        om = types.ModuleType("maya.api.OpenMaya")
+        om.MObject = FakeMObject
+        om.MFn = FakeMFn
+        om.MFnDependencyNode = FakeMFnDependencyNode
+        om.MSelectionList = FakeMSelectionList
+        om.MDagPath = FakeMDagPath
+        om.MFnDagNode = FakeMFnDagNode
+        om.MFnNurbsCurve = FakeMFnNurbsCurve
+        om.MPoint = FakeMPoint
+        om.MSpace = FakeMSpace
+        om.MObjectHandle = FakeMObjectHandle
+        om.MPlug = FakeMPlug
+        om.MTime = FakeMTime
+        om.MDGContext = FakeMDGContext
+        om.MFnMatrixData = FakeMFnMatrixData
+        om.MMatrix = FakeMMatrix
+        om.MAngle = FakeMUnitValue
+        om.MDistance = FakeMUnitValue
+        om.MFnUnitAttribute = FakeMFnUnitAttribute
+        om.MFnNumericAttribute = FakeMFnNumericAttribute
+        om.MFnNumericData = FakeMFnNumericData
+        om.MDGModifier = FakeMDGModifier
+        om.MPxCommand = FakeMPxCommand
+        om.MFnPlugin = FakeMFnPlugin
+        (om.MMessage, om.MDGMessage, om.MNodeMessage, om.MDagMessage,
+         om.MSceneMessage, om.MAnimMessage) = FakeMessages(self).make()
+
+        maya = types.ModuleType("maya")
+        api = types.ModuleType("maya.api")
+        maya.cmds = cmds
+        maya.api = api
+        api.OpenMaya = om
+
+        sys.modules["maya"] = maya
+        sys.modules["maya.cmds"] = cmds
+        sys.modules["maya.api"] = api
+        sys.modules["maya.api.OpenMaya"] = om
+
+        self.cmds = cmds
+        self.om = om
+        return self
+
+
+STANDIN = MayaStandIn()
@@ -0,0 +1,296 @@
+
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import maya_standin
+
+STANDIN = maya_standin.STANDIN.install()
+
+from anim import animation_pipeline
+from rig import rig_builders_pipeline
+from benchmarks import synthetic_scene
+
+# Load the commit plugin before any profiler session so its command is
+# instrumented like every other cmds entry and call counts do not depend on
+# which benchmark runs first.
+rig_builders_pipeline.DG_BATCH.load_plugin()
+
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budgets.json")
+
+CALL_TOLERANCE = 0.0
+TIME_TOLERANCE = 0.5
+TIME_FLOOR = 0.02
+
+
+class Benchmark:
+
+    def __init__(self, name, setup, run):
+
+        self.name = name
+        self.setup = setup
+        self.run = run
+
+
+class BenchmarkResult:
+
+    def __init__(self, name, wall_time, cmds_calls, stages, commands):
+
+        self.name = name
+        self.wall_time = wall_time
+        self.cmds_calls = cmds_calls
+        self.stages = stages
+        self.commands = commands
+
+    def as_budget(self, budget=None):
+
+        # Wall time is machine dependent, so a calls-only update keeps the
+        # recorded time and moves just the call counts.
+        wall_time = budget["wall_time"] if budget else self.wall_time
+
+        return {
+            "wall_time": wall_time,
+            "cmds_calls": self.cmds_calls,
+            "stages": dict(sorted(self.stages.items())),
+        }
+
+
+def reset_scene():
+
+    STANDIN.new_scene()
+    RIG_CTX.clear()
+    ANIM_CTX.clear()
+
+
+def build_rig():
+
+    root = synthetic_scene.build_ue5_skeleton(UE5_SCHEMA)
+    with contextlib.redirect_stdout(io.StringIO()):
+        RigBuilder.build_auto_rig(root)
+
+
+def setup_build_auto_rig():
+
+    reset_scene()
+    return synthetic_scene.build_ue5_skeleton(UE5_SCHEMA)
+
+
+def run_build_auto_rig(root):
+
+    RigBuilder.build_auto_rig(root)
+
+
+def setup_apply_root_motion_path():
+
+    reset_scene()
+    build_rig()
+
+    path = AnimationPath()
+    synthetic_scene.build_root_motion_groups(path, ANIM_CTX, "walk", count=6)
+    path.build_root_motion_curve()
+    path.setup_root_motion_path()
+
+    return path
+
+
+def run_apply_root_motion_path(path):
+
+    path.apply_root_motion_path("walk")
+
+
+def setup_foot_lock_ranges():
+
+    reset_scene()
+    synthetic_scene.build_foot_lock_locators(ANIM_CTX, frames=600)
+
+    return AnimationLocomotion()
+
+
+def run_foot_lock_ranges(locomotion):
+
+    locomotion.locomotion_get_foot_lock_ranges()
+
+
+def setup_contact_detection():
+
+    return synthetic_scene.foot_trajectories(frames=10000)
+
+
+def run_contact_detection(positions):
+
+    ContactDetector.detect(positions, 0, ContactThresholds(
+        vertical_speed=0.5, horizontal_speed=1.0, height=1.0, min_frames=3))
+
+
+BENCHMARKS = (
+    Benchmark("build_auto_rig",
+              setup_build_auto_rig, run_build_auto_rig),
+    Benchmark("apply_root_motion_path",
+              setup_apply_root_motion_path, run_apply_root_motion_path),
+    Benchmark("locomotion_get_foot_lock_ranges",
+              setup_foot_lock_ranges, run_foot_lock_ranges),
+    Benchmark("contact_detection_10k",
+              setup_contact_detection, run_contact_detection),
+)
+
+
+def measure(benchmark, repeat):
+
+    best = None
+    for _ in range(repeat):
+        # The UI holds the scene watcher from setup through the run, so what
+        # setup caches is still valid when the measured call starts.
+        SCENE_WATCHER.acquire(benchmark)
+        try:
+            state = benchmark.setup()
+            STANDIN.reset_calls()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                with PROFILER.session(benchmark.name):
+                    start = time.perf_counter()
+                    benchmark.run(state)
+                    wall_time = time.perf_counter() - start
+        finally:
+            SCENE_WATCHER.release(benchmark)
+
+        report = PROFILER.last_report
+        stages = {stage["name"]: stage["cmds_calls"] for stage in report["stages"]}
+        result = BenchmarkResult(benchmark.name, wall_time, report["cmds_calls"],
+                                 stages, dict(STANDIN.calls))
+        if best is None or result.wall_time < best.wall_time:
+            best = result
+
+    return best
+
+
+def check(result, budget, call_tolerance, time_tolerance, time_floor):
+
+    failures = []
+    if budget is None:
+        return [f"{result.name}: no budget recorded, run with --update"]
+
+    limit = budget["cmds_calls"] * (1.0 + call_tolerance)
+    if result.cmds_calls > limit:
+        failures.append(f"{result.name}: {result.cmds_calls} cmds calls "
+                        f"(budget {budget['cmds_calls']})")
+
+    for stage, calls in sorted(result.stages.items()):
+        allowed = budget["stages"].get(stage)
+        if allowed is None:
+            continue
+        if calls > allowed * (1.0 + call_tolerance):
+            failures.append(f"{result.name}: {stage} made {calls} cmds calls "
+                            f"(budget {allowed})")
+
+    limit = max(budget["wall_time"] * (1.0 + time_tolerance),
+                budget["wall_time"] + time_floor)
+    if result.wall_time > limit:
+        failures.append(f"{result.name}: {result.wall_time * 1000.0:.1f}ms wall time "
+                        f"(budget {budget['wall_time'] * 1000.0:.1f}ms)")
+
+    return failures
+
+
+def format_result(result, budget):
+
+    lines = [f"{result.name}: {result.wall_time * 1000.0:.1f}ms, "
+             f"{result.cmds_calls} cmds calls"]
+    if budget:
+        lines[0] += (f" (budget {budget['wall_time'] * 1000.0:.1f}ms, "
+                     f"{budget['cmds_calls']} calls)")
+
+    commands = sorted(result.commands.items(), key=lambda item: item[1], reverse=True)
+    for name, count in commands[:8]:
+        lines.append(f"    {name:<24}{count:>8}")
+
+    return "\n".join(lines)
+
+
+def load_budgets(path):
+
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_budgets(budgets, path):
+
+    with open(path, "w") as handle:
+        json.dump(budgets, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Run the auto rig benchmarks against a recording maya.cmds stand-in.")
+    parser.add_argument("names", nargs="*",
+                        help="benchmarks to run, all of them by default")
+    parser.add_argument("--budgets", default=BUDGETS_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--call-tolerance", type=float, default=CALL_TOLERANCE)
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--time-floor", type=float, default=TIME_FLOOR,
+                        help="seconds of wall time noise allowed on any benchmark")
+    parser.add_argument("--update", action="store_true",
+                        help="record the current results as the new budgets")
+    parser.add_argument("--calls-only", action="store_true",
+                        help="with --update, keep the recorded wall times")
+    args = parser.parse_args(argv)
+
+    budgets = load_budgets(args.budgets)
+    selected = [b for b in BENCHMARKS if not args.names or b.name in args.names]
+    if not selected:
+        parser.error(f"unknown benchmarks: {', '.join(args.names)}")
+
+    failures = []
+    for benchmark in selected:
+        result = measure(benchmark, args.repeat)
+        budget = budgets.get(benchmark.name)
+        print(format_result(result, budget))
+
+        if args.update:
+            budgets[benchmark.name] = result.as_budget(
+                budget if args.calls_only else None)
+        else:
+            failures.extend(check(result, budget, args.call_tolerance,
+                                  args.time_tolerance, args.time_floor))
+
+    if args.update:
+        save_budgets(budgets, args.budgets)
+        print(f"budgets written to {args.budgets}")
+        return 0
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+
+    return 1 if failures else 0
+
+
+RIG_CTX = rig_builders_pipeline.RIG_CTX
+ANIM_CTX = animation_pipeline.animation_transfer.ANIM_CTX
+UE5_SCHEMA = rig_builders_pipeline.rig_builders_runtime.UE5_SCHEMA
+PROFILER = rig_builders_pipeline.PROFILER
+SCENE_WATCHER = rig_builders_pipeline.SCENE_WATCHER
+
+RigBuilder = rig_builders_pipeline.RigBuilder
+AnimationPath = animation_pipeline.animation_transfer.AnimationPath
+AnimationLocomotion = animation_pipeline.animation_locomotion.AnimationLocomotion
+ContactDetector = animation_pipeline.animation_locomotion.ContactDetector
+ContactThresholds = animation_pipeline.animation_locomotion.ContactThresholds
+
+
+if __name__ == "__main__":
+    sys.exit(main())
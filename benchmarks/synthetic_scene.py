@@ -0,0 +1,205 @@
+
+
+import math
+
+import numpy as np
+
+from benchmarks import maya_standin
+
+
+SIDES = {"l": 1.0, "r": -1.0}
+
+BODY_POSITIONS = {
+    "root": (0.0, 0.0, 0.0),
+    "pelvis": (0.0, 95.0, 0.0),
+    "spine_01": (0.0, 103.0, -1.0),
+    "spine_02": (0.0, 113.0, -2.0),
+    "spine_03": (0.0, 124.0, -2.0),
+    "spine_04": (0.0, 136.0, -1.0),
+    "spine_05": (0.0, 146.0, 0.0),
+    "neck_01": (0.0, 155.0, 1.0),
+    "neck_02": (0.0, 161.0, 2.0),
+    "head": (0.0, 168.0, 3.0),
+}
+
+LIMB_POSITIONS = {
+    "clavicle": (3.0, 148.0, 2.0),
+    "upperarm": (17.0, 146.0, -1.0),
+    "lowerarm": (44.0, 145.0, -3.0),
+    "hand": (70.0, 145.0, 0.0),
+    "thigh": (10.0, 92.0, 0.0),
+    "calf": (11.0, 50.0, 2.0),
+    "foot": (12.0, 8.0, -2.0),
+    "ball": (12.0, 1.0, 12.0),
+}
+
+FINGER_BASES = {
+    "thumb": (73.0, 143.0, 5.0),
+    "index": (78.0, 145.0, 3.0),
+    "middle": (79.0, 145.0, 1.0),
+    "ring": (78.0, 145.0, -1.0),
+    "pinky": (77.0, 145.0, -3.0),
+}
+
+EXTRA_JOINTS = (
+    ("ik_foot_root", "root", (0.0, 0.0, 0.0)),
+    ("ik_foot_l", "ik_foot_root", (12.0, 8.0, -2.0)),
+    ("ik_foot_r", "ik_foot_root", (-12.0, 8.0, -2.0)),
+    ("ik_hand_root", "root", (0.0, 0.0, 0.0)),
+    ("ik_hand_gun", "ik_hand_root", (-70.0, 145.0, 0.0)),
+    ("ik_hand_l", "ik_hand_gun", (70.0, 145.0, 0.0)),
+    ("ik_hand_r", "ik_hand_gun", (-70.0, 145.0, 0.0)),
+)
+
+
+def mirrored(position, side):
+
+    x, y, z = position
+    return (x * SIDES[side], y, z)
+
+
+def ue5_joint_layout(schema):
+
+    layout = [("root", None, BODY_POSITIONS["root"])]
+
+    spine = schema["spine"]["c"]["spine"]
+    parent = "root"
+    for name in spine:
+        layout.append((name, parent, BODY_POSITIONS[name]))
+        parent = name
+
+    parent = spine[-1]
+    for name in schema["head"]["c"]["head"]:
+        layout.append((name, parent, BODY_POSITIONS[name]))
+        parent = name
+
+    for side, side_dict in schema["limb"].items():
+        for limb_name, chain in side_dict.items():
+            parent = spine[-1] if limb_name == "upperarm" else spine[0]
+            for name in chain:
+                key = name.rsplit("_", 1)[0]
+                layout.append((name, parent, mirrored(LIMB_POSITIONS[key], side)))
+                parent = name
+
+    for side, side_dict in schema["hand"].items():
+        for finger, chain in side_dict.items():
+            parent = f"hand_{side}"
+            x, y, z = FINGER_BASES[finger]
+            for index, name in enumerate(chain):
+                layout.append((name, parent, mirrored((x + index * 3.0, y, z), side)))
+                parent = name
+
+    positions = {name: position for name, _, position in layout}
+    for side, side_dict in schema["twist"].items():
+        for limb_name, chain in side_dict.items():
+            parent = f"{limb_name}_{side}"
+            start = np.asarray(positions[parent])
+            end = np.asarray(positions[chain[-1]])
+            twists = sorted(chain[:-1])
+            for index, name in enumerate(twists):
+                blend = (index + 1.0) / (len(twists) + 1.0)
+                layout.append((name, parent, tuple(start + (end - start) * blend)))
+
+    layout.extend(EXTRA_JOINTS)
+
+    return layout
+
+
+def profile_joint_layout(schema, profile):
+
+    # The same body under another profile's names, without the joints that
+    # profile only proxies; children of a dropped joint move to its parent.
+    parents = {}
+    layout = []
+    for name, parent, position in ue5_joint_layout(schema):
+        parent = parents.get(parent, parent)
+        if name in profile.proxies:
+            parents[name] = parent
+            continue
+        layout.append((name, parent, position))
+
+    return [(profile.aliases.get(name, name), parent, position, name)
+            for name, parent, position in layout]
+
+
+def build_ue5_skeleton(schema, profile=None):
+
+    scene = maya_standin.STANDIN.scene
+    joints = {}
+
+    if profile is None:
+        layout = [(name, parent, position, name)
+                  for name, parent, position in ue5_joint_layout(schema)]
+    else:
+        layout = profile_joint_layout(schema, profile)
+
+    for source_name, parent, position, name in layout:
+        joint = scene.create("joint", source_name, joints.get(parent), select=False)
+        world = np.eye(4)
+        world[3, :3] = position
+        joint.set_world_matrix(world)
+        joints[name] = joint
+
+    scene.selection = []
+    return joints["root"].full_path()
+
+
+def build_root_motion_groups(path, anim_ctx, clip, count, spacing=150.0):
+
+    cmds = maya_standin.STANDIN.cmds
+
+    anim_ctx.retarget_time_registry[clip] = [0, 30]
+    anim_ctx.locomotion_registry["per_frame_distance"] = spacing / 30.0
+
+    for index in range(count):
+        position = [0.0, 0.0, spacing * (index + 1)]
+        anim_ctx.path_registry.setdefault("root_motion_positions", {})[clip] = [
+            [0.0, 0.0, position[2] - 40.0], position, [0.0, 0.0, position[2] + 60.0]]
+
+        path.setup_root_motion_edit(clip)
+        group = anim_ctx.path_registry["current_root_motion_group"]
+        cmds.group(empty=True, name=f"{group}_pose_reference", parent=group)
+        cmds.currentTime(10 + index)
+        path.cache_root_motion_positions(clip)
+
+    cmds.playbackOptions(minTime=0, maxTime=30)
+
+
+def build_foot_lock_locators(anim_ctx, frames, stride=32):
+
+    standin = maya_standin.STANDIN
+    cmds = standin.cmds
+
+    locs = []
+    for side, phase in (("l", 0.0), ("r", 0.5)):
+        loc = cmds.spaceLocator(name=f"foot_{side}_footlock_LOC")[0]
+        standin.animate(f"{loc}.translateY",
+                        lambda frame, phase=phase: foot_height(frame, stride, phase))
+        locs.append(loc)
+
+    anim_ctx.locomotion_registry["foot_lock"] = locs
+    cmds.playbackOptions(minTime=0, maxTime=frames)
+
+    return locs
+
+
+def foot_height(frame, stride, phase):
+
+    cycle = (frame / float(stride) + phase) % 1.0
+    if cycle < 0.5:
+        return 8.0
+    return 8.0 + 12.0 * math.sin((cycle - 0.5) * 2.0 * math.pi)
+
+
+def foot_trajectories(frames, stride=32, step_length=60.0):
+
+    positions = np.zeros((frames + 1, 2, 3))
+    for index, (side, phase) in enumerate((("l", 0.0), ("r", 0.5))):
+        cycle = np.arange(frames + 1) / float(stride) + phase
+        swing = np.clip((cycle % 1.0 - 0.5) * 2.0, 0.0, 1.0)
+        positions[:, index, 0] = SIDES[side] * LIMB_POSITIONS["foot"][0]
+        positions[:, index, 1] = [foot_height(frame, stride, phase)
+                                  for frame in range(frames + 1)]
+        positions[:, index, 2] = (np.floor(cycle) + swing) * step_length
+
+    return positions
@@ -10,27 +10,53 @@ import maya.cmds as cmds
 import maya.OpenMayaUI as omui
 from maya.app.general.mayaMixin import MayaQWidgetDockableMixin
 
+from rig import rig_builders_matrix
+from rig import rig_builders_nurbs
+from rig import rig_builders_registry
+from rig import rig_builders_profiler
+from rig import rig_builders_manifest
+from rig import rig_builders_schema
+from rig import rig_builders_profiles
+from rig import rig_builders_transaction
 from rig import rig_builders_runtime
 from rig import rig_builders_ctrl
 from rig import rig_builders_body
 from rig import rig_builders_hand_foot
 from rig import rig_builders_deformation
 from rig import rig_builders_space
+from rig import rig_builders_pipeline
 
 from anim import animation_runtime
+from anim import animation_sampler
+from anim import animation_contacts
 from anim import animation_transfer
 from anim import animation_locomotion
-
+from anim import animation_pipeline
+
+rig_builders_registry.SCENE_WATCHER.uninstall()
+
+importlib.reload(rig_builders_matrix)
+importlib.reload(rig_builders_nurbs)
+importlib.reload(rig_builders_registry)
+importlib.reload(rig_builders_profiler)
+importlib.reload(rig_builders_manifest)
+importlib.reload(rig_builders_schema)
+importlib.reload(rig_builders_profiles)
+importlib.reload(rig_builders_transaction)
 importlib.reload(rig_builders_runtime)
 importlib.reload(rig_builders_ctrl)
 importlib.reload(rig_builders_body)
 importlib.reload(rig_builders_hand_foot)
 importlib.reload(rig_builders_deformation)
 importlib.reload(rig_builders_space)
+importlib.reload(rig_builders_pipeline)
 
 importlib.reload(animation_runtime)
+importlib.reload(animation_sampler)
+importlib.reload(animation_contacts)
 importlib.reload(animation_transfer)
 importlib.reload(animation_locomotion)
+importlib.reload(animation_pipeline)
 
 
 class MySquareUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
@@ -43,6 +69,8 @@ class MySquareUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
 
         self.animbuilder = AnimBuilder()
 
+        SCENE_WATCHER.acquire(self)
+
         self.setWindowTitle("Auto Rig & Animation Toolkit")
         self.resize(300, 300)
 
@@ -67,19 +95,51 @@ class MySquareUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
 
         # self.rig_ctx.rebuild()
 
-        self.reload_scene()
+        self.sync_scene()
         self.populate_dropdown_from_registry()
         # self.on_run_selected()
 
+    def dockCloseEventTriggered(self):
+        for rig_ctx in RIG_CONTEXTS:
+            rig_ctx.unwatch_scene()
+        SCENE_WATCHER.release(self)
+
     def build_basic_tools(self, layout):
         self._add_button("Run Full Pipeline", self.debug, layout)
         self._add_button("AUTO RIG (UE5)", self.build_auto_rig, layout)
         self._add_button("Reopen current scene", self.reload_scene, layout)
+        self._add_button("Profile Playback", self.profile_playback, layout)
+        self.profile_checkbox = QtWidgets.QCheckBox("Profile stages")
+        layout.addWidget(self.profile_checkbox)
+        self.matrix_blend_checkbox = QtWidgets.QCheckBox("Matrix IK/FK blend")
+        layout.addWidget(self.matrix_blend_checkbox)
+        self.matrix_spine_checkbox = QtWidgets.QCheckBox("Matrix spine")
+        layout.addWidget(self.matrix_spine_checkbox)
         layout.addStretch()
 
     def debug(self):
+        if not self.profile_checkbox.isChecked():
+            self.run_full_pipeline()
+            return
+
+        report_path = os.path.join(
+            cmds.internalVar(userTmpDir=True), "auto_rig_profile.json")
+        previous = StageProfiler.load(
+            report_path) if os.path.exists(report_path) else None
+
+        with PROFILER.session("Run Full Pipeline", report_path):
+            self.run_full_pipeline()
+
+        print(StageProfiler.format_report(PROFILER.last_report))
+        if previous:
+            rows = StageProfiler.compare(previous, PROFILER.last_report)
+            print(StageProfiler.format_comparison(rows, limit=15))
+
+    def run_full_pipeline(self):
         sel = cmds.ls("root", type="joint", long=True)[0]
-        self.run_with_undo(RigBuilder.build_auto_rig, sel)
+        self.run_with_undo(
+            RigBuilder.build_auto_rig, sel, None, self.blend_mode(),
+            self.spine_mode())
         folder = r"C:\Users\huang\Documents\maya\projects\auto_rig_Lite\assets\anim_retarget"
 
         files = os.listdir(folder)
@@ -123,16 +183,57 @@ class MySquareUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
         cmds.refresh(suspend=False)
 
     def build_auto_rig(self):
-        sel = cmds.ls("root", type="joint", long=True)[0]
-        self.run_with_undo(RigBuilder.build_auto_rig, sel)
+        for root in cmds.ls("root", "*:root", type="joint", long=True):
+            namespace = ContextRegistry.namespace_of(root)
+            self.run_with_undo(
+                RigBuilder.build_auto_rig, root, RIG_CONTEXTS.get(namespace),
+                self.blend_mode(), self.spine_mode())
+
+    def profile_playback(self):
+        for root in cmds.ls("root", "*:root", type="joint", long=True):
+            ctx = RIG_CONTEXTS.get(ContextRegistry.namespace_of(root))
+            suffix = f"_{ctx.namespace}" if ctx.namespace else ""
+            report_path = os.path.join(
+                cmds.internalVar(userTmpDir=True),
+                f"auto_rig_eval_profile{suffix}.json")
+
+            report = EVAL_PROFILER.run(
+                ctx, label=f"playback {ctx.namespace or ':'}", path=report_path)
+            print(EvaluationProfiler.format_report(report))
+
+    def blend_mode(self):
+        if self.matrix_blend_checkbox.isChecked():
+            return BLEND_MATRIX
+        return BLEND_CONSTRAINT
+
+    def spine_mode(self):
+        if self.matrix_spine_checkbox.isChecked():
+            return SPINE_MATRIX
+        return SPINE_CURVE
 
     def reload_scene(self):
 
         scene = cmds.file(query=True, sceneName=True)
         cmds.file(scene, open=True, force=True)
 
-        self.rig_ctx.rebuild()
-        self.anim_ctx.rebuild()
+        self.sync_scene()
+
+    def sync_scene(self):
+
+        # Opening a scene dirties every group, so each character restores from
+        # its manifest then; otherwise rescan only the groups edited since the
+        # last sync.
+        namespaces = {rig_ctx.namespace for rig_ctx in RIG_CONTEXTS}
+        namespaces.update(RigManifest.namespaces())
+        for namespace in sorted(namespaces):
+            rig_ctx = RIG_CONTEXTS.get(namespace)
+            anim_ctx = ANIM_CONTEXTS.get(namespace)
+            rig_ctx.watch_scene()
+            if not rig_ctx.fully_dirty():
+                rig_ctx.rebuild()
+            elif not RigManifest.restore(rig_ctx, anim_ctx):
+                rig_ctx.rebuild()
+                anim_ctx.rebuild()
 
         self.card_list.clear()
         groups = self.anim_ctx.path_registry.get("root_motion_groups")
@@ -219,7 +320,8 @@ class MySquareUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
         self.run_with_undo(self.animbuilder.preview_root_motion, file_name)
 
     def finalize_root_motion(self):
-        self.run_with_undo(self.animbuilder.finalize_root_motion)
+        file_name = self.dropdown.currentText()
+        self.run_with_undo(self.animbuilder.finalize_root_motion, file_name)
 
     def _add_button(self, label, callback, layout):
         btn = QtWidgets.QPushButton(label)
@@ -230,7 +332,10 @@ class MySquareUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
     def run_with_undo(self, func, *args):
         cmds.undoInfo(openChunk=True)
         try:
-            return func(*args)
+            with DG_BATCH.transaction(func.__name__):
+                result = func(*args)
+            RigManifest.write_all(RIG_CONTEXTS, ANIM_CONTEXTS)
+            return result
         except Exception as e:
             cmds.warning(str(e))
             raise
@@ -238,155 +343,6 @@ class MySquareUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
             cmds.undoInfo(closeChunk=True)
 
 
-class RigBuilder:
-
-    @staticmethod
-    def build_limb_ikfk():
-
-        SkeletonRig.build_limb_ikfk_skeletons()
-
-        ControlBuilder.build_limb_fK_controls()
-        ControlBuilder.build_limb_iK_controls()
-        ControlBuilder.build_limb_ikfk_controls()
-
-        LimbRig.build_limb_ikfk_deform_drivers()
-        LimbRig.build_limb_fk_ctrl_joint_drivers()
-        LimbRig.build_limb_ik_ctrl_joint_drivers()
-
-        LimbRig.build_clavicle_fk_ctrl_joint_drivers()
-
-    @staticmethod
-    def build_spine_ikfk():
-
-        SkeletonRig.build_spine_ikfk_skeletons()
-
-        ControlBuilder.build_spine_fK_controls()
-        ControlBuilder.build_spine_iK_controls()
-        ControlBuilder.build_spine_ikfk_controls()
-        ControlBuilder.build_hip_controls()
-
-        SpineRig.build_spine_ik_curve()
-        SpineRig.build_spine_curve_driver_joints()
-        SpineRig.build_spine_ik_ctrl_follow_joints()
-
-        SpineRig.build_spine_ikfk_deform_drivers()
-        SpineRig.build_spine_fk_ctrl_joint_drivers()
-        SpineRig.build_spine_ik_ctrl_curve_drivers()
-        SpineRig.build_spine_ik_ctrl_curve_orient_drivers()
-        SpineRig.build_spine_curve_ik_joint_drivers()
-
-        SpineRig.build_spine_hip_ctrl_drivers()
-
-    @staticmethod
-    def build_hand():
-
-        ControlBuilder.build_hand_controls()
-
-        HandRig.build_hand_spread_attributes()
-        HandRig.build_hand_curl_attributes()
-
-        HandRig.build_finger_fk_deform_drivers()
-
-    @staticmethod
-    def build_foot():
-
-        FootRig.build_roll_bank_skeleton()
-        FootRig.build_roll_bank_iK_driver()
-        FootRig.build_roll_driver()
-        FootRig.build_bank_driver()
-
-    @staticmethod
-    def build_twist():
-
-        TwistRig.build_twist_driver()
-        TwistRig.build_twist_system()
-
-    @staticmethod
-    def build_head():
-
-        ControlBuilder.build_head_controls()
-        HeadRig.build_head_fk_deform_drivers()
-
-    @staticmethod
-    def build_space():
-
-        SpaceSystem.build_clavicle_follow_spine_driver()
-        SpaceSystem.build_thigh_follow_pelvis_drivers()
-        SpaceSystem.build_head_follow_spine_driver()
-        SpaceSystem.build_spine_start_end_mid_ctrl_driver()
-        SpaceSystem.build_ik_fk_hand_ctrl_drivers()
-
-        SpaceSystem.build_root_ik_fk_ctrl_drivers()
-
-    @staticmethod
-    def build_auto_rig(root):
-
-        RIG_CTX.clear()
-
-        SkeletonRig.register_deform_skeleton(root)
-
-        ControlBuilder.build_root_fK_controls()
-
-        RigBuilder.build_limb_ikfk()
-        RigBuilder.build_spine_ikfk()
-
-        RigBuilder.build_hand()
-        RigBuilder.build_foot()
-        RigBuilder.build_head()
-
-        # RigBuilder.build_twist()
-
-        RigBuilder.build_space()
-
-        print("\n" + "=" * 60)
-        print("AUTO RIG LITE UE5 BUILD SUCCESS")
-        print("=" * 60 + "\n")
-
-
-class AnimBuilder:
-
-    def __init__(self):
-
-        self.animtransfer = AnimTransfer()
-        self.animpath = AnimPath()
-        self.locomotion = AnimLocomotion()
-
-    def build_retarget_fk_ik_ctrl(self, file_path, file_name):
-
-        self.animtransfer.import_retarget_skeleton(file_path)
-        self.animtransfer.build_retarget_bind_pose()
-        self.animtransfer.build_retarget_fk_constraints()
-        self.animtransfer.build_limb_retarget_ik_constraints()
-        self.animtransfer.build_spine_retarget_ik_constraints()
-        self.locomotion.locomotion_setup_foot_lock_reference()
-        self.animpath.setup_root_motion_curve_locator()
-        self.animtransfer.remove_retarget_bind_pose()
-        self.locomotion.locomotion_base_distance(file_name)
-
-    def setup_root_motion_edit(self, file_name):
-
-        self.animpath.setup_root_motion_edit(file_name)
-
-    def build_root_motion(self, file_name):
-
-        self.locomotion.create_pose_reference()
-        self.animpath.get_root_motion_positions(file_name)
-        self.animpath.cache_root_motion_positions(file_name)
-        self.animpath.build_root_motion_curve()
-
-    def preview_root_motion(self, file_name):
-
-        self.animpath.build_root_motion_curve()
-        # self.animpath.apply_root_motion_pathsssss()
-        self.animpath.setup_root_motion_path()
-        self.animpath.apply_root_motion_path(file_name)
-
-    def finalize_root_motion(self):
-
-        self.locomotion.locomotion_get_foot_lock_ranges()
-        self.locomotion.foot_ik_lock()
-
-
 def get_maya_window():
     ptr = omui.MQtUtil.mainWindow()
     return shiboken6.wrapInstance(int(ptr), QtWidgets.QWidget)
@@ -399,24 +355,25 @@ def show_square_ui():
 
 
 RIG_CTX = rig_builders_runtime.RIG_CTX
+RIG_CONTEXTS = rig_builders_runtime.RIG_CONTEXTS
+BLEND_CONSTRAINT = rig_builders_runtime.BLEND_CONSTRAINT
+BLEND_MATRIX = rig_builders_runtime.BLEND_MATRIX
+SPINE_CURVE = rig_builders_runtime.SPINE_CURVE
+SPINE_MATRIX = rig_builders_runtime.SPINE_MATRIX
+ContextRegistry = rig_builders_registry.ContextRegistry
+SCENE_WATCHER = rig_builders_registry.SCENE_WATCHER
+RigManifest = rig_builders_manifest.RigManifest
+DG_BATCH = rig_builders_transaction.DG_BATCH
 ANIM_CTX = animation_runtime.ANIM_CTX
+ANIM_CONTEXTS = animation_runtime.ANIM_CONTEXTS
 
-ControlBuilder = rig_builders_ctrl.ControlBuilder
-
-SkeletonRig = rig_builders_body.SkeletonRig
-SpineRig = rig_builders_body.SpineRig
-LimbRig = rig_builders_body.LimbRig
-HandRig = rig_builders_hand_foot.HandRig
-FootRig = rig_builders_hand_foot.FootRig
-TwistRig = rig_builders_deformation.TwistRig
-HeadRig = rig_builders_hand_foot.HeadRig
-
-SpaceSystem = rig_builders_space.SpaceSystem
-
+RigBuilder = rig_builders_pipeline.RigBuilder
+AnimBuilder = animation_pipeline.AnimBuilder
 
-AnimTransfer = animation_transfer.AnimationTransfer
-AnimPath = animation_transfer.AnimationPath
-AnimLocomotion = animation_locomotion.AnimationLocomotion
+PROFILER = rig_builders_profiler.PROFILER
+StageProfiler = rig_builders_profiler.StageProfiler
+EVAL_PROFILER = rig_builders_profiler.EVAL_PROFILER
+EvaluationProfiler = rig_builders_profiler.EvaluationProfiler
 
 
 show_square_ui()
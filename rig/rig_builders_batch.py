@@ -0,0 +1,287 @@
+
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MANIFEST_NAME = "batch_manifest.json"
+MANIFEST_VERSION = 1
+
+RESULT_PREFIX = "AUTO_RIG_BATCH_RESULT "
+
+SCENE_TYPES = {".ma": "mayaAscii", ".mb": "mayaBinary"}
+
+WORKER_TIMEOUT = 900.0
+
+
+class BatchJob:
+
+    __slots__ = ("source", "target", "name")
+
+    def __init__(self, source, target, name):
+
+        self.source = source
+        self.target = target
+        self.name = name
+
+    def __repr__(self):
+
+        return f"BatchJob({self.name})"
+
+    def up_to_date(self):
+
+        if not os.path.exists(self.target):
+            return False
+        return os.path.getmtime(self.target) >= os.path.getmtime(self.source)
+
+    @staticmethod
+    def collect(source_dir, output_dir, extensions=tuple(SCENE_TYPES)):
+
+        jobs = []
+        for folder, _, files in os.walk(source_dir):
+            for file_name in sorted(files):
+                if os.path.splitext(file_name)[1].lower() not in extensions:
+                    continue
+                source = os.path.join(folder, file_name)
+                name = os.path.relpath(source, source_dir).replace(os.sep, "/")
+                jobs.append(BatchJob(source, os.path.join(output_dir, name), name))
+
+        return sorted(jobs, key=lambda job: job.name)
+
+
+class BatchManifest:
+
+    def __init__(self, path):
+
+        self.path = path
+        self.jobs = {}
+
+        if os.path.exists(path):
+            with open(path) as handle:
+                data = json.load(handle)
+            if data.get("version") == MANIFEST_VERSION:
+                self.jobs = data.get("jobs", {})
+
+    def update(self, name, entry):
+
+        self.jobs[name] = entry
+        self.write()
+
+    def write(self):
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as handle:
+            json.dump({"version": MANIFEST_VERSION, "jobs": self.jobs},
+                      handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        os.replace(temp_path, self.path)
+
+    def summary(self):
+
+        counts = {}
+        for entry in self.jobs.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+
+class BatchRunner:
+
+    def __init__(self, worker_command, max_workers=4, timeout=WORKER_TIMEOUT):
+
+        self.worker_command = list(worker_command)
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def run(self, jobs, manifest, force=False):
+
+        pending = []
+        for job in jobs:
+            if not force and job.up_to_date():
+                previous = manifest.jobs.get(job.name, {})
+                if previous.get("status") == "ok":
+                    continue
+                entry = dict(previous, status="skipped", target=job.target)
+                manifest.update(job.name, entry)
+                continue
+            pending.append(job)
+
+        if not pending:
+            return manifest
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.run_job, job): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                entry = future.result()
+                manifest.update(job.name, entry)
+                print(f"[{entry['status']}] {job.name} "
+                      f"{entry['seconds']:.1f}s {entry.get('nodes', 0)} nodes")
+
+        return manifest
+
+    def run_job(self, job):
+
+        os.makedirs(os.path.dirname(job.target) or ".", exist_ok=True)
+        command = self.worker_command + [job.source, job.target]
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            path for path in (ROOT, env.get("PYTHONPATH")) if path)
+
+        start = time.perf_counter()
+        entry = {"source": job.source, "target": job.target}
+        try:
+            process = subprocess.run(command, capture_output=True, text=True,
+                                     timeout=self.timeout, env=env, cwd=ROOT)
+        except subprocess.TimeoutExpired:
+            entry.update(status="timeout", error=f"worker exceeded {self.timeout}s")
+        except OSError as e:
+            entry.update(status="failed", error=str(e))
+        else:
+            result = BatchRunner.parse_result(process.stdout)
+            if process.returncode == 0 and result is not None:
+                entry.update(result, status="ok")
+            else:
+                lines = (process.stderr or process.stdout).strip().splitlines()
+                entry.update(status="failed", returncode=process.returncode,
+                             error=lines[-1] if lines else "worker produced no result")
+
+        entry["seconds"] = time.perf_counter() - start
+        return entry
+
+    @staticmethod
+    def parse_result(stdout):
+
+        for line in reversed(stdout.splitlines()):
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX):])
+        return None
+
+
+def rig_scene_roots():
+
+    import maya.cmds as cmds
+    from rig import rig_builders_pipeline
+    from rig import rig_builders_manifest
+    from anim import animation_runtime
+
+    RigBuilder = rig_builders_pipeline.RigBuilder
+    RIG_CONTEXTS = rig_builders_pipeline.rig_builders_runtime.RIG_CONTEXTS
+    ContextRegistry = rig_builders_pipeline.rig_builders_registry.ContextRegistry
+    RigManifest = rig_builders_manifest.RigManifest
+    ANIM_CONTEXTS = animation_runtime.ANIM_CONTEXTS
+
+    roots = cmds.ls("root", "*:root", type="joint", long=True)
+    if not roots:
+        raise RuntimeError("No root joint found in scene")
+
+    nodes_before = len(cmds.ls())
+    rigs = []
+    for root in roots:
+        ctx = RIG_CONTEXTS.get(ContextRegistry.namespace_of(root))
+        start = time.perf_counter()
+        RigBuilder.build_auto_rig(root, ctx)
+        # The saved scene must carry the manifest, or the UI has to rescan
+        # every group the first time it opens the output.
+        manifest = RigManifest.write(ctx, ANIM_CONTEXTS.get(ctx.namespace))
+        rigs.append({
+            "namespace": ctx.namespace,
+            "profile": ctx.skeleton_profile.name,
+            "manifest": manifest,
+            "seconds": time.perf_counter() - start,
+        })
+
+    return {"nodes": len(cmds.ls()) - nodes_before, "rigs": rigs}
+
+
+def emit_result(result):
+
+    sys.stdout.write(RESULT_PREFIX + json.dumps(result, sort_keys=True) + "\n")
+    sys.stdout.flush()
+
+
+def run_worker(source, target):
+
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    try:
+        import maya.cmds as cmds
+
+        cmds.file(source, open=True, force=True)
+        result = rig_scene_roots()
+        scene_type = SCENE_TYPES.get(os.path.splitext(target)[1].lower(), "mayaAscii")
+        cmds.file(rename=target)
+        cmds.file(save=True, force=True, type=scene_type)
+    finally:
+        maya.standalone.uninitialize()
+
+    emit_result(result)
+
+
+def default_mayapy():
+
+    return os.environ.get("MAYAPY", "mayapy")
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Auto rig every skeleton scene in a folder with headless mayapy workers.")
+    parser.add_argument("source_dir", nargs="?")
+    parser.add_argument("output_dir", nargs="?")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--mayapy", default=default_mayapy(),
+                        help="mayapy executable, $MAYAPY by default")
+    parser.add_argument("--standin", action="store_true",
+                        help="rig with the maya.cmds stand-in instead of mayapy")
+    parser.add_argument("--extensions", nargs="+", default=list(SCENE_TYPES))
+    parser.add_argument("--manifest", help=f"defaults to <output_dir>/{MANIFEST_NAME}")
+    parser.add_argument("--timeout", type=float, default=WORKER_TIMEOUT)
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild scenes whose outputs are already up to date")
+    parser.add_argument("--worker", nargs=2, metavar=("SOURCE", "TARGET"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(*args.worker)
+        return 0
+
+    if not args.source_dir or not args.output_dir:
+        parser.error("source_dir and output_dir are required")
+
+    if args.standin:
+        worker_command = [sys.executable, "-m", "benchmarks.batch_standin"]
+    else:
+        worker_command = [args.mayapy, "-m", "rig.rig_builders_batch", "--worker"]
+
+    jobs = BatchJob.collect(args.source_dir, args.output_dir,
+                            tuple(ext.lower() for ext in args.extensions))
+    if not jobs:
+        parser.error(f"no scenes found in {args.source_dir}")
+
+    manifest = BatchManifest(
+        args.manifest or os.path.join(args.output_dir, MANIFEST_NAME))
+    runner = BatchRunner(worker_command, max(1, args.workers), args.timeout)
+    runner.run(jobs, manifest, force=args.force)
+
+    summary = manifest.summary()
+    print(", ".join(f"{count} {status}" for status, count in sorted(summary.items())))
+    print(f"manifest written to {manifest.path}")
+
+    return 1 if summary.get("failed") or summary.get("timeout") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
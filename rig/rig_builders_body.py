@@ -1,588 +1,553 @@
 
 
+import numpy as np
 import maya.cmds as cmds
 
+from rig import rig_builders_nurbs
+from rig import rig_builders_profiles
 from rig import rig_builders_runtime
 
 
+# Both spine modes aim each driver down the chain with the same world up, so
+# they agree at rest.
+SPINE_AIM_VECTOR = (1, 0, 0)
+SPINE_UP_VECTOR = (0, 1, 0)
+SPINE_WORLD_UP = (0, 0, -1)
+
+
 class SkeletonRig:
 
     @staticmethod
-    def register_deform_skeleton(root):
+    def register_deform_skeleton(ctx, root):
 
         deform_group = RigHelpers.get_or_create_group_chain(
-            "Group", "skeleton", "deform_joints")
+            ctx, "Group", "skeleton", "deform_joints")
 
         new_root = cmds.parent(root, deform_group)[0]
-        new_root = cmds.ls(new_root, long=True)[0]
-        RIG_CTX.skeleton_root = new_root
+        ctx.skeleton_root = new_root
 
         all_joints = [new_root] + cmds.listRelatives(
             new_root, allDescendents=True, type="joint", fullPath=True)
 
-        for joint in all_joints:
-            joint_name = joint.split("|")[-1]
-            RIG_CTX.joint_registry.setdefault(
+        profile, deform_joints = PROFILES.map_joints(all_joints)
+        missing = [joint_name for joint_name in SCHEMA.all_joints()
+                   if joint_name not in deform_joints
+                   and joint_name not in profile.proxies]
+        if missing:
+            raise RuntimeError(
+                f"Skeleton profile {profile.name} is missing rig joints: "
+                f"{', '.join(missing)}")
+        ctx.skeleton_profile = profile
+
+        SkeletonRig.build_proxy_joints(ctx, deform_group, profile, deform_joints)
+
+        for joint_name, joint in deform_joints.items():
+            ctx.joint_registry.setdefault(
                 "deform", {})[joint_name] = joint
 
+        ctx.world_matrices.capture(deform_joints)
+
+    @staticmethod
+    def build_proxy_joints(ctx, deform_group, profile, deform_joints):
+
+        # Proxies sit beside the root, so the exported skeleton is unchanged.
+        for joint_name, (start, end, blend) in profile.proxies.items():
+            if joint_name in deform_joints:
+                continue
+
+            start_matrix = np.array(cmds.xform(
+                deform_joints[start], q=True, m=True, ws=True)).reshape(4, 4)
+            end_matrix = np.array(cmds.xform(
+                deform_joints[end], q=True, m=True, ws=True)).reshape(4, 4)
+            matrix = start_matrix.copy()
+            matrix[3, :3] += (end_matrix[3, :3] - start_matrix[3, :3]) * blend
+
+            proxy = cmds.createNode(
+                "joint", name=SkeletonProfile.proxy_name(joint_name),
+                parent=deform_group)
+            proxy = cmds.ls(proxy, long=True)[0]
+            cmds.xform(proxy, matrix=matrix.ravel().tolist(), worldSpace=True)
+            cmds.setAttr(f"{proxy}.rotateOrder",
+                         cmds.getAttr(f"{deform_joints[start]}.rotateOrder"))
+            deform_joints[joint_name] = proxy
+
     @staticmethod
-    def build_limb_ikfk_skeletons():
+    def build_limb_ikfk_skeletons(ctx):
 
-        SkeletonRig.build_skeleton("limb", "ik")
-        SkeletonRig.build_skeleton("limb", "fk")
+        SkeletonRig.build_skeleton(ctx, "limb", "ik")
+        SkeletonRig.build_skeleton(ctx, "limb", "fk")
 
     @staticmethod
-    def build_spine_ikfk_skeletons():
+    def build_spine_ikfk_skeletons(ctx):
 
-        SkeletonRig.build_skeleton("spine", "ik")
-        SkeletonRig.build_skeleton("spine", "fk")
+        SkeletonRig.build_skeleton(ctx, "spine", "ik")
+        SkeletonRig.build_skeleton(ctx, "spine", "fk")
 
     @staticmethod
-    def build_skeleton(category, suffix):
+    def build_skeleton(ctx, category, suffix):
 
         # print(f"#######################{category}_{suffix}#######################")
 
-        schema = UE5_SCHEMA.get(category, {})
-
-        deform_joints = RIG_CTX.joint_registry.get("deform", {})
+        deform_joints = ctx.joint_registry.get("deform", {})
 
         joint_group = RigHelpers.get_or_create_group_chain(
-            "Group", "skeleton", f"{suffix}_joints")
+            ctx, "Group", "skeleton", f"{suffix}_joints")
         cmds.setAttr(f"{joint_group}.visibility", 0)
 
         driving_system = RigHelpers.get_or_create_group_chain(
-            "Group", "driving_system")
+            ctx, "Group", "driving_system")
         cmds.setAttr(f"{driving_system}.visibility", 0)
 
-        root_joint = RIG_CTX.skeleton_root
-        new_root = cmds.duplicate(root_joint, returnRootsOnly=True)[0]
-        new_root = cmds.ls(new_root, long=True)[0]
-
-        all_joints = [new_root] + cmds.listRelatives(
-            new_root, allDescendents=True, type="joint", fullPath=True)
-        joint_map = {j.split("|")[-1]: j for j in all_joints}
-
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
-
-                base_joint = joint_map.get(chain[0])
-                chain_grp = cmds.group(
-                    empty=True, name=f"{suffix}_{limb_name}_{side}_jnt_GRP",
-                    parent=joint_group)
-                chain_grp = cmds.ls(chain_grp, long=True)[0]
-                cmds.matchTransform(chain_grp, base_joint)
-                RigHelpers.bake_transform_to_opm(chain_grp)
-                # cmds.setAttr(f"{chain_grp}.visibility", 0)
-                RIG_CTX.group_registry.setdefault(
-                    f"{suffix}_joint", {})[f"{limb_name}_{side}"] = chain_grp
-
-                cmds.parent(base_joint, chain_grp)
-                chain_root = cmds.listRelatives(
-                    chain_grp, children=True, type="joint", fullPath=True)[0]
-                chain_joints = [chain_root] + cmds.listRelatives(
-                    chain_root, allDescendents=True, type="joint", fullPath=True)
-                chain_joints.sort(key=lambda x: x.count("|"), reverse=True)
-
-                keep_set = set(chain)
-                rename_queue = []
-                for joint in chain_joints:
-                    joint_name = joint.split("|")[-1]
-                    if joint_name in keep_set:
-                        rename_queue.append((joint, joint_name))
-                    else:
-                        cmds.delete(joint)
-
-                rename_queue.sort(key=lambda x: x[0].count("|"))
-                for joint, joint_name in reversed(rename_queue):
-                    cmds.rename(joint, f"{joint_name}_{suffix}_JNT")
-                for joint, joint_name in rename_queue:
-                    new_joint = cmds.ls(
-                        f"{joint_name}_{suffix}_JNT", long=True)[0]
-                    cmds.setAttr(f"{new_joint}.jointOrient", 0, 0, 0)
-                    deform_joint = deform_joints.get(joint_name)
-                    cmds.matchTransform(new_joint, deform_joint)
-                    RigHelpers.bake_transform_to_opm(new_joint)
-                    RIG_CTX.joint_registry.setdefault(
-                        suffix, {})[joint_name] = new_joint
-
-        cmds.delete(new_root)
+        world_matrices = ctx.world_matrices
+        group_matrix = np.array(
+            cmds.xform(joint_group, q=True, m=True, ws=True)).reshape(4, 4)
+
+        for chain in SCHEMA.chains(category):
+
+            chain_grp = cmds.group(
+                empty=True, name=f"{suffix}_{chain.key}_jnt_GRP",
+                parent=joint_group)
+            parent_matrix = world_matrices.matrix(deform_joints.get(chain.joints[0]))
+            RigHelpers.set_offset_parent_matrix(
+                chain_grp, parent_matrix @ np.linalg.inv(group_matrix))
+            # cmds.setAttr(f"{chain_grp}.visibility", 0)
+            ctx.group_registry.setdefault(
+                f"{suffix}_joint", {})[chain.key] = chain_grp
+
+            parent = cmds.ls(chain_grp, long=True)[0]
+            for joint_name in chain.joints:
+                new_joint = cmds.createNode(
+                    "joint", name=f"{joint_name}_{suffix}_JNT", parent=parent)
+                new_joint = f"{parent}|{new_joint.split('|')[-1]}"
+
+                deform_joint = deform_joints.get(joint_name)
+                world_matrix = world_matrices.matrix(deform_joint)
+                RigHelpers.set_offset_parent_matrix(
+                    new_joint, world_matrix @ np.linalg.inv(parent_matrix))
+                world_matrices.alias(new_joint, deform_joint)
+                DG_BATCH.set_attr(f"{new_joint}.rotateOrder",
+                                  cmds.getAttr(f"{deform_joint}.rotateOrder"))
+                ctx.joint_registry.setdefault(
+                    suffix, {})[joint_name] = new_joint
+
+                parent, parent_matrix = new_joint, world_matrix
 
 
 class LimbRig:
 
     @staticmethod
-    def build_limb_ikfk_deform_drivers():
-
-        schema = UE5_SCHEMA.get("limb", {})
+    def build_limb_ikfk_deform_drivers(ctx):
 
         constraint_system = RigHelpers.get_or_create_group_chain(
-            "Group", "driving_system", "constraints")
-
-        fk_ctrls = RIG_CTX.control_registry.get("fk", {})
-        ik_ctrls = RIG_CTX.control_registry.get("ik", {})
-        ikfk_ctrls = RIG_CTX.control_registry.get("ikfk", {})
-
-        fk_joints = RIG_CTX.joint_registry.get("fk", {})
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
-        deform_joints = RIG_CTX.joint_registry.get("deform", {})
+            ctx, "Group", "driving_system", "constraints")
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        fk_ctrls = ctx.control_registry.get("fk", {})
+        ik_ctrls = ctx.control_registry.get("ik", {})
+        ikfk_ctrls = ctx.control_registry.get("ikfk", {})
 
-                chain_group = cmds.group(
-                    empty=True, name=f"constraint_{limb_name}_{side}_GRP",
-                    parent=constraint_system)
+        fk_joints = ctx.joint_registry.get("fk", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
+        deform_joints = ctx.joint_registry.get("deform", {})
 
-                ikfk_ctrl = ikfk_ctrls.get(f"{limb_name}_{side}")
+        for chain in SCHEMA.chains("limb"):
 
-                ikfk_ctrl_short = ikfk_ctrl.split("|")[-1]
+            chain_group = cmds.group(
+                empty=True, name=f"constraint_{chain.key}_GRP",
+                parent=constraint_system)
 
-                md = cmds.createNode(
-                    "multiplyDivide", name=f"{ikfk_ctrl_short}_IKFKBlend_MD")
-                cmds.setAttr(f"{md}.input2X", 0.1)
-                cmds.connectAttr(f"{ikfk_ctrl_short}.IKFKBlend",
-                                 f"{md}.input1X")
+            ikfk_ctrl = ikfk_ctrls.get(chain.key)
 
-                rev = cmds.createNode(
-                    "reverse", name=f"{ikfk_ctrl_short}_IKFKBlend_REV")
-                cmds.connectAttr(f"{md}.outputX",
-                                 f"{rev}.inputX")
+            ikfk_ctrl_short = ctx.node_index.unqualify(ikfk_ctrl.split("|")[-1])
 
-                for joint_name in chain:
+            md, rev = RigHelpers.create_ikfk_blend_pair(
+                ctx, chain.key, ikfk_ctrl, ikfk_ctrl_short)
 
-                    fk_joint = fk_joints.get(joint_name)
-                    ik_joint = ik_joints.get(joint_name)
-                    deform_joint = deform_joints.get(joint_name)
+            for joint_name in chain.joints:
 
-                    fk_ctrl = fk_ctrls.get(joint_name)
-                    ik_ctrl = ik_ctrls.get(joint_name)
+                fk_joint = fk_joints.get(joint_name)
+                ik_joint = ik_joints.get(joint_name)
+                deform_joint = deform_joints.get(joint_name)
 
-                    constraint = cmds.parentConstraint(
-                        fk_joint, ik_joint, deform_joint)[0]
+                fk_ctrl = fk_ctrls.get(joint_name)
+                ik_ctrl = ik_ctrls.get(joint_name)
 
-                    w0_attr = cmds.listAttr(constraint, string="*W0")[0]
-                    w1_attr = cmds.listAttr(constraint, string="*W1")[0]
+                RigHelpers.blend_ikfk(
+                    ctx, fk_joint, ik_joint, deform_joint, md, rev, chain_group)
 
-                    cmds.connectAttr(f"{md}.outputX",
-                                     f"{constraint}.{w0_attr}")
-                    cmds.connectAttr(f"{rev}.outputX",
-                                     f"{constraint}.{w1_attr}")
-
-                    if not joint_name.startswith("clavicle"):
-                        cmds.connectAttr(f"{md}.outputX",
-                                         f"{fk_ctrl}.visibility")
-                        if ik_ctrl:
-                            cmds.connectAttr(f"{rev}.outputX",
-                                             f"{ik_ctrl}.visibility")
-
-                    cmds.parent(constraint, chain_group)
+                if joint_name != chain.clavicle:
+                    DG_BATCH.connect_attr(f"{md}.outputX",
+                                          f"{fk_ctrl}.visibility")
+                    if ik_ctrl:
+                        DG_BATCH.connect_attr(f"{rev}.outputX",
+                                              f"{ik_ctrl}.visibility")
 
     @staticmethod
-    def build_clavicle_fk_ctrl_joint_drivers():
-
-        schema = UE5_SCHEMA.get("limb", {})
-
-        fk_ctrls = RIG_CTX.control_registry.get("fk", {})
-        fk_joints = RIG_CTX.joint_registry.get("fk", {})
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
+    def build_clavicle_fk_ctrl_joint_drivers(ctx):
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
-                for joint_name in chain:
+        fk_ctrls = ctx.control_registry.get("fk", {})
+        fk_joints = ctx.joint_registry.get("fk", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
 
-                    if not joint_name.startswith("clavicle"):
-                        continue
+        for chain in SCHEMA.chains("limb"):
+            if not chain.clavicle:
+                continue
 
-                    fk_ctrl = fk_ctrls.get(joint_name)
-                    fk_joint = fk_joints.get(joint_name)
-                    ik_joint = ik_joints.get(joint_name)
+            fk_ctrl = fk_ctrls.get(chain.clavicle)
+            fk_joint = fk_joints.get(chain.clavicle)
+            ik_joint = ik_joints.get(chain.clavicle)
 
-                    cmds.parentConstraint(fk_ctrl, fk_joint)
-                    cmds.parentConstraint(fk_ctrl, ik_joint)
+            cmds.parentConstraint(fk_ctrl, fk_joint)
+            cmds.parentConstraint(fk_ctrl, ik_joint)
 
     @staticmethod
-    def build_limb_fk_ctrl_joint_drivers():
+    def build_limb_fk_ctrl_joint_drivers(ctx):
 
-        schema = UE5_SCHEMA.get("limb", {})
+        fk_ctrls = ctx.control_registry.get("fk", {})
+        fk_joints = ctx.joint_registry.get("fk", {})
 
-        fk_ctrls = RIG_CTX.control_registry.get("fk", {})
-        fk_joints = RIG_CTX.joint_registry.get("fk", {})
+        for chain in SCHEMA.chains("limb"):
+            for joint_name in chain.joints:
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
-                for joint_name in chain:
+                if joint_name == chain.clavicle:
+                    continue
 
-                    if joint_name.startswith("clavicle"):
-                        continue
+                fk_ctrl = fk_ctrls.get(joint_name)
+                fk_joint = fk_joints.get(joint_name)
 
-                    fk_ctrl = fk_ctrls.get(joint_name)
-                    fk_joint = fk_joints.get(joint_name)
-
-                    cmds.parentConstraint(fk_ctrl, fk_joint)
+                cmds.parentConstraint(fk_ctrl, fk_joint)
 
     @staticmethod
-    def build_limb_ik_ctrl_joint_drivers():
-
-        schema = UE5_SCHEMA.get("limb", {})
+    def build_limb_ik_ctrl_joint_drivers(ctx):
 
-        ik_ctrls = RIG_CTX.control_registry.get("ik", {})
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
+        ik_ctrls = ctx.control_registry.get("ik", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        orient_groups = []
+        for chain in SCHEMA.chains("limb"):
 
-                if limb_name == "upperarm":
-                    start_i, mid_i, end_i = 1, 2, 3
-                else:
-                    start_i, mid_i, end_i = 0, 1, 2
+            pole_ctrl = ik_ctrls.get(chain.pole)
+            ik_ctrl = ik_ctrls.get(chain.end)
 
-                pole_ctrl = ik_ctrls.get(chain[mid_i])
-                ik_ctrl = ik_ctrls.get(chain[end_i])
+            start_joint = ik_joints.get(chain.start)
+            end_joint = ik_joints.get(chain.end)
 
-                start_joint = ik_joints.get(chain[start_i])
-                end_joint = ik_joints.get(chain[end_i])
+            ik_handle = cmds.ikHandle(
+                startJoint=start_joint, endEffector=end_joint,
+                solver="ikRPsolver", name=f"{chain.end}_IKH")[0]
+            cmds.poleVectorConstraint(pole_ctrl, ik_handle)
+            cmds.parent(ik_handle, ik_ctrl)
 
-                ik_handle = cmds.ikHandle(
-                    startJoint=start_joint, endEffector=end_joint,
-                    solver="ikRPsolver", name=f"{chain[end_i]}_IKH")[0]
-                cmds.poleVectorConstraint(pole_ctrl, ik_handle)
-                cmds.parent(ik_handle, ik_ctrl)
+            if chain.clavicle:
+                orient_grp = cmds.group(
+                    empty=True, name=f"{chain.end}_orient_GRP", parent=ik_ctrl)
+                RigHelpers.match_transform(ctx, orient_grp, end_joint)
+                cmds.orientConstraint(orient_grp, end_joint)
+                orient_groups.append(orient_grp)
 
-                if limb_name == "upperarm":
-                    orient_grp = cmds.group(
-                        empty=True, name=f"{chain[end_i]}_orient_GRP", parent=ik_ctrl)
-                    cmds.matchTransform(orient_grp, end_joint)
-                    RigHelpers.bake_transform_to_opm(orient_grp)
-                    cmds.orientConstraint(orient_grp, end_joint)
+        RigHelpers.bake_transforms_to_opm(orient_groups)
 
 
 class SpineRig:
 
     @staticmethod
-    def build_spine_ik_curve():
-
-        schema = UE5_SCHEMA.get("spine", {})
+    def build_spine_ik_curve(ctx):
 
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
 
         spine_system = RigHelpers.get_or_create_group_chain(
-            "Group", "driving_system", "spine")
+            ctx, "Group", "driving_system", "spine")
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        for chain in SCHEMA.chains("spine"):
 
-                points = []
-                for joint_name in chain[0:-1]:
-                    ik_joint = ik_joints[joint_name]
-                    pos = cmds.xform(ik_joint, query=True,
-                                     worldSpace=True, translation=True)
-                    points.append(pos)
+            points = []
+            for joint_name in chain.drivers:
+                ik_joint = ik_joints[joint_name]
+                pos = cmds.xform(ik_joint, query=True,
+                                 worldSpace=True, translation=True)
+                points.append(pos)
 
-                curve = cmds.curve(
-                    editPoint=points, degree=3, name="spine_IK_EP_CRV")
+            curve = cmds.curve(
+                editPoint=points, degree=3, name="spine_IK_EP_CRV")
 
-                cmds.parent(curve, spine_system)
+            curve = cmds.parent(curve, spine_system)[0]
+            ctx.node_index.record(curve, "spine_IK_EP_CRV")
 
     @staticmethod
-    def build_spine_curve_driver_joints():
-
-        schema = UE5_SCHEMA.get("spine", {})
+    def build_spine_curve_driver_joints(ctx):
 
         spine_system = RigHelpers.get_or_create_group_chain(
-            "Group", "driving_system", "spine")
+            ctx, "Group", "driving_system", "spine")
 
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
 
-        curve = cmds.ls("spine_IK_EP_CRV", long=True)[0]
+        curve = ctx.node_index.lookup("spine_IK_EP_CRV")
+        spline = BSplineCurve.from_node(curve)
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        for chain in SCHEMA.chains("spine"):
 
-                ref_loc = cmds.spaceLocator(name=f"{limb_name}_MP_ref_LOC")[0]
-                deform_loc = cmds.spaceLocator(
-                    name=f"{limb_name}_DEF_MP_LOC")[0]
+            driver_joints = []
+            for joint_name in chain.drivers:
 
-                npoc = cmds.createNode(
-                    "nearestPointOnCurve", name=f"{limb_name}_NPC")
-                cmds.connectAttr(f"{curve}.worldSpace[0]",
-                                 f"{npoc}.inputCurve")
-                cmds.connectAttr(f"{deform_loc}.worldPosition[0]",
-                                 f"{npoc}.inPosition")
+                cmds.select(clear=True)
+                driver_jnt = cmds.joint(
+                    name=f"{joint_name}_spine_driver_JNT")
+
+                driver_jnt = cmds.parent(driver_jnt, spine_system)[0]
+                ctx.node_index.record(
+                    driver_jnt, f"{joint_name}_spine_driver_JNT")
+                driver_joints.append(driver_jnt)
 
-                for i, joint_name in enumerate(chain[0:-1]):
+            RigHelpers.bake_transforms_to_opm(driver_joints)
 
-                    driver_jnt = cmds.joint(
-                        name=f"{joint_name}_spine_driver_JNT")
-                    ik_joint = ik_joints.get(joint_name)
+            params = spline.closest_params(
+                [RigHelpers.world_position(ctx, ik_joints.get(joint_name))
+                 for joint_name in chain.drivers])
 
-                    cmds.matchTransform(driver_jnt, ref_loc)
-                    cmds.parent(driver_jnt, spine_system)
-                    RigHelpers.bake_transform_to_opm(driver_jnt)
+            for joint_name, driver_jnt, param in zip(
+                    chain.drivers, driver_joints, params.tolist()):
 
-                    mp = cmds.createNode(
-                        "motionPath", name=f"{joint_name}_spine_MP")
-                    cmds.connectAttr(f"{curve}.worldSpace[0]",
-                                     f"{mp}.geometryPath")
-                    cmds.connectAttr(f"{mp}.allCoordinates",
-                                     f"{driver_jnt}.translate")
+                ik_joint = ik_joints.get(joint_name)
 
-                    cmds.matchTransform(driver_jnt, ik_joint,
-                                        position=False, rotation=True, scale=False)
+                mp = cmds.createNode(
+                    "motionPath", name=f"{joint_name}_spine_MP")
+                cmds.connectAttr(f"{curve}.worldSpace[0]",
+                                 f"{mp}.geometryPath")
+                cmds.connectAttr(f"{mp}.allCoordinates",
+                                 f"{driver_jnt}.translate")
 
-                    cmds.matchTransform(deform_loc, ik_joint)
-                    param = cmds.getAttr(f"{npoc}.parameter")
-                    cmds.setAttr(f"{mp}.uValue", param)
+                RigHelpers.match_transform(ctx, driver_jnt, ik_joint,
+                                           position=False, rotation=True, scale=False)
 
-                cmds.delete(ref_loc, deform_loc, npoc)
+                cmds.setAttr(f"{mp}.uValue", param)
 
-                for i in range(1, len(chain[0:-1]) - 1):
-                    current = cmds.ls(
-                        f"{chain[i]}_spine_driver_JNT", long=True)[0]
-                    target = cmds.ls(
-                        f"{chain[i + 1]}_spine_driver_JNT", long=True)[0]
+            for i in range(1, len(chain.drivers) - 1):
+                current = ctx.node_index.lookup(
+                    f"{chain.drivers[i]}_spine_driver_JNT")
+                target = ctx.node_index.lookup(
+                    f"{chain.drivers[i + 1]}_spine_driver_JNT")
 
-                    cmds.aimConstraint(target, current,
-                                       aimVector=(1, 0, 0), upVector=(0, 1, 0),
-                                       worldUpType="vector",
-                                       worldUpVector=(0, 0, -1),)
+                cmds.aimConstraint(target, current,
+                                   aimVector=SPINE_AIM_VECTOR,
+                                   upVector=SPINE_UP_VECTOR,
+                                   worldUpType="vector",
+                                   worldUpVector=SPINE_WORLD_UP)
 
     @staticmethod
-    def build_spine_ik_ctrl_follow_joints():
-
-        schema = UE5_SCHEMA.get("spine", {})
+    def build_spine_ik_ctrl_follow_joints(ctx):
 
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
 
         spine_system = RigHelpers.get_or_create_group_chain(
-            "Group", "driving_system", "spine")
+            ctx, "Group", "driving_system", "spine")
 
-        curve = cmds.ls("spine_IK_EP_CRV", long=True)[0]
+        curve = ctx.node_index.lookup("spine_IK_EP_CRV")
+        spline = BSplineCurve.from_node(curve)
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        for chain in SCHEMA.chains("spine"):
 
-                start_joint = cmds.joint(name="spine_start_follow_JNT")
-                end_joint = cmds.joint(name="spine_end_follow_JNT")
+            start_joint = cmds.joint(name="spine_start_follow_JNT")
+            end_joint = cmds.joint(name="spine_end_follow_JNT")
 
-                start_ik = ik_joints[chain[0]]
-                end_ik = ik_joints[chain[-2]]
-                cmds.parent(start_joint, spine_system)
-                cmds.parent(end_joint, spine_system)
-                cmds.matchTransform(start_joint, start_ik)
-                cmds.matchTransform(end_joint, end_ik)
+            start_ik = ik_joints[chain.drivers[0]]
+            end_ik = ik_joints[chain.drivers[-1]]
+            cmds.parent(start_joint, spine_system)
+            cmds.parent(end_joint, spine_system)
+            RigHelpers.match_transform(ctx, start_joint, start_ik)
+            RigHelpers.match_transform(ctx, end_joint, end_ik)
 
-                mid_info = cmds.createNode(
-                    "pointOnCurveInfo", name="spine_mid_POCI")
-                cmds.connectAttr(f"{curve}.worldSpace[0]",
-                                 f"{mid_info}.inputCurve")
-                cmds.setAttr(f"{mid_info}.turnOnPercentage", 1)
-                cmds.setAttr(f"{mid_info}.parameter", 0.5)
-                mid_pos = cmds.getAttr(f"{mid_info}.position")[0]
-                mid_tangent = cmds.getAttr(f"{mid_info}.tangent")[0]
-                cmds.delete(mid_info)
-
-                mid_joint = cmds.joint(
-                    name="spine_mid_follow_JNT", position=mid_pos)
-                cmds.parent(mid_joint, spine_system)
-
-                default_vec = (1, 0, 0)
-                rot = cmds.angleBetween(v1=default_vec, v2=mid_tangent,
-                                        euler=True)
-                cmds.setAttr(f"{mid_joint}.rotateX", -90)
-                cmds.setAttr(f"{mid_joint}.rotateY", rot[1])
-                cmds.setAttr(f"{mid_joint}.rotateZ", rot[2])
+            mid_pos, mid_tangent = spline.point_and_tangent(
+                spline.normalized_params(0.5))
+            mid_pos = mid_pos[0].tolist()
+            mid_tangent = mid_tangent[0].tolist()
+
+            mid_joint = cmds.joint(
+                name="spine_mid_follow_JNT", position=mid_pos)
+            cmds.parent(mid_joint, spine_system)
+
+            default_vec = (1, 0, 0)
+            rot = cmds.angleBetween(v1=default_vec, v2=mid_tangent,
+                                    euler=True)
+            cmds.setAttr(f"{mid_joint}.rotateX", -90)
+            cmds.setAttr(f"{mid_joint}.rotateY", rot[1])
+            cmds.setAttr(f"{mid_joint}.rotateZ", rot[2])
+
+            ctx.node_index.record(start_joint, "spine_start_follow_JNT")
+            ctx.node_index.record(end_joint, "spine_end_follow_JNT")
+            ctx.node_index.record(mid_joint, "spine_mid_follow_JNT")
 
     @staticmethod
-    def build_spine_ikfk_deform_drivers():
+    def follow_joints(ctx):
 
-        schema = UE5_SCHEMA.get("spine", {})
+        return [ctx.node_index.lookup(f"spine_{name}_follow_JNT")
+                for name in ("start", "mid", "end")]
+
+    @staticmethod
+    def build_spine_ikfk_deform_drivers(ctx):
 
         constraint_system = RigHelpers.get_or_create_group_chain(
-            "Group", "driving_system", "constraints")
+            ctx, "Group", "driving_system", "constraints")
 
-        fk_ctrls = RIG_CTX.control_registry.get("fk", {})
-        ik_ctrls = RIG_CTX.control_registry.get("ik", {})
-        ikfk_ctrls = RIG_CTX.control_registry.get("ikfk", {})
+        fk_ctrls = ctx.control_registry.get("fk", {})
+        ik_ctrls = ctx.control_registry.get("ik", {})
+        ikfk_ctrls = ctx.control_registry.get("ikfk", {})
 
-        fk_joints = RIG_CTX.joint_registry.get("fk", {})
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
-        deform_joints = RIG_CTX.joint_registry.get("deform", {})
+        fk_joints = ctx.joint_registry.get("fk", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
+        deform_joints = ctx.joint_registry.get("deform", {})
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        for chain in SCHEMA.chains("spine"):
 
-                chain_group = cmds.group(
-                    empty=True, name=f"constraint_{limb_name}_{side}_GRP",
-                    parent=constraint_system)
+            chain_group = cmds.group(
+                empty=True, name=f"constraint_{chain.key}_GRP",
+                parent=constraint_system)
 
-                ikfk_ctrl = ikfk_ctrls[f"{limb_name}_{side}"]
-                ikfk_ctrl_short = ikfk_ctrl.split("|")[-1]
+            ikfk_ctrl = ikfk_ctrls[chain.key]
 
-                md = cmds.createNode(
-                    "multiplyDivide", name="spine_c_IKFKBlend_MD")
-                cmds.setAttr(f"{md}.input2X", 0.1)
-                cmds.connectAttr(f"{ikfk_ctrl_short}.IKFKBlend",
-                                 f"{md}.input1X")
+            md, rev = RigHelpers.create_ikfk_blend_pair(
+                ctx, chain.key, ikfk_ctrl, chain.key)
 
-                rev = cmds.createNode("reverse", name="spine_c_IKFKBlend_REV")
-                cmds.connectAttr(f"{md}.outputX",
-                                 f"{rev}.inputX")
+            for joint_name in chain.joints:
 
-                for joint_name in chain:
+                fk_joint = fk_joints[joint_name]
+                ik_joint = ik_joints[joint_name]
+                deform_joint = deform_joints[joint_name]
 
-                    fk_joint = fk_joints[joint_name]
-                    ik_joint = ik_joints[joint_name]
-                    deform_joint = deform_joints[joint_name]
+                RigHelpers.blend_ikfk(
+                    ctx, fk_joint, ik_joint, deform_joint, md, rev, chain_group)
 
-                    constraint = cmds.parentConstraint(
-                        fk_joint, ik_joint, deform_joint)[0]
-                    w0_attr = cmds.listAttr(constraint, string="*W0")[0]
-                    w1_attr = cmds.listAttr(constraint, string="*W1")[0]
-                    cmds.connectAttr(f"{md}.outputX",
-                                     f"{constraint}.{w0_attr}")
-                    cmds.connectAttr(f"{rev}.outputX",
-                                     f"{constraint}.{w1_attr}")
+                fk_ctrl = fk_ctrls[joint_name]
+                DG_BATCH.connect_attr(f"{md}.outputX",
+                                      f"{fk_ctrl}.visibility")
 
-                    fk_ctrl = fk_ctrls[joint_name]
-                    cmds.connectAttr(f"{md}.outputX",
-                                     f"{fk_ctrl}.visibility")
+            for joint_name in chain.ik_targets:
+                ik_ctrl = ik_ctrls.get(joint_name)
+                DG_BATCH.connect_attr(f"{rev}.outputX",
+                                      f"{ik_ctrl}.visibility")
 
-                    cmds.parent(constraint, chain_group)
+    @staticmethod
+    def build_spine_fk_ctrl_joint_drivers(ctx):
 
-                for joint_name in chain[1:4]:
-                    ik_ctrl = ik_ctrls.get(joint_name)
-                    cmds.connectAttr(f"{rev}.outputX",
-                                     f"{ik_ctrl}.visibility")
+        fk_ctrls = ctx.control_registry.get("fk", {})
+        fk_joints = ctx.joint_registry.get("fk", {})
 
-    @staticmethod
-    def build_spine_fk_ctrl_joint_drivers():
+        for chain in SCHEMA.chains("spine"):
+            for joint_name in chain.joints[1:]:
 
-        schema = UE5_SCHEMA.get("spine", {})
+                fk_ctrl = fk_ctrls.get(joint_name)
+                fk_joint = fk_joints.get(joint_name)
 
-        fk_ctrls = RIG_CTX.control_registry.get("fk", {})
-        fk_joints = RIG_CTX.joint_registry.get("fk", {})
+                cmds.parentConstraint(fk_ctrl, fk_joint)
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
-                for joint_name in chain[1:]:
+    @staticmethod
+    def build_spine_ik_ctrl_groups(ctx):
 
-                    fk_ctrl = fk_ctrls.get(joint_name)
-                    fk_joint = fk_joints.get(joint_name)
+        ik_ctrls = ctx.control_registry.get("ik", {})
+        ik_groups = ctx.group_registry.get("ik_ctrl", {})
 
-                    cmds.parentConstraint(fk_ctrl, fk_joint)
+        follow_joints = SpineRig.follow_joints(ctx)
 
-    @staticmethod
-    def build_spine_ik_ctrl_curve_drivers():
+        for chain in SCHEMA.chains("spine"):
+
+            chain_grp = ik_groups.get(chain.key)
 
-        schema = UE5_SCHEMA.get("spine", {})
+            targets = chain.ik_targets
+            bake_nodes = []
+            for joint_name, follow_joint in zip(targets, follow_joints):
 
-        ik_ctrls = RIG_CTX.control_registry.get("ik", {})
-        ik_groups = RIG_CTX.group_registry.get("ik_ctrl", {})
+                ctrl_grp = cmds.group(empty=True, name=f"{joint_name}_ik_ctrl_GRP",
+                                      world=True)
+                RigHelpers.match_transform(ctx, ctrl_grp, follow_joint)
+                cmds.makeIdentity(ctrl_grp, apply=True, rotate=True)
+                ctrl_grp = cmds.parent(ctrl_grp, chain_grp)[0]
 
-        start_joint = cmds.ls("spine_start_follow_JNT", long=True)[0]
-        mid_joint = cmds.ls("spine_mid_follow_JNT", long=True)[0]
-        end_joint = cmds.ls("spine_end_follow_JNT", long=True)[0]
+                ik_ctrl = ik_ctrls.get(joint_name)
+                RigHelpers.match_transform(ctx, ik_ctrl, follow_joint)
+                cmds.makeIdentity(ik_ctrl, apply=True, rotate=True)
+                cmds.parent(ik_ctrl, ctrl_grp)
 
-        curve = cmds.ls("spine_IK_EP_CRV", long=True)[0]
+                cmds.makeIdentity(follow_joint, apply=False, rotate=True)
+                bake_nodes.extend([ctrl_grp, follow_joint])
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+            RigHelpers.bake_transforms_to_opm(bake_nodes)
 
-                chain_grp = ik_groups.get(f"{limb_name}_{side}")
+    @staticmethod
+    def build_spine_ik_ctrl_curve_drivers(ctx):
 
-                follow_joints = [start_joint, mid_joint, end_joint]
-                targets = chain[1:4]
-                for joint_name, follow_joint in zip(targets, follow_joints):
+        ik_ctrls = ctx.control_registry.get("ik", {})
 
-                    ctrl_grp = cmds.group(empty=True, name=f"{joint_name}_ik_ctrl_GRP",
-                                          world=True)
-                    cmds.matchTransform(ctrl_grp, follow_joint)
-                    cmds.makeIdentity(ctrl_grp, apply=True, rotate=True)
-                    cmds.parent(ctrl_grp, chain_grp)
-                    RigHelpers.bake_transform_to_opm(ctrl_grp)
+        follow_joints = SpineRig.follow_joints(ctx)
 
-                    ik_ctrl = ik_ctrls.get(joint_name)
-                    cmds.matchTransform(ik_ctrl, follow_joint)
-                    cmds.makeIdentity(ik_ctrl, apply=True, rotate=True)
-                    ik_ctrl = cmds.parent(ik_ctrl, ctrl_grp)[0]
-                    ik_ctrl = cmds.ls(ik_ctrl, long=True)[0]
-                    RIG_CTX.control_registry.setdefault(
-                        "ik", {})[joint_name] = ik_ctrl
+        curve = ctx.node_index.lookup("spine_IK_EP_CRV")
 
-                    cmds.makeIdentity(follow_joint, apply=False, rotate=True)
-                    RigHelpers.bake_transform_to_opm(follow_joint)
+        for chain in SCHEMA.chains("spine"):
 
-                    cmds.parentConstraint(ik_ctrl, follow_joint)
+            for joint_name, follow_joint in zip(chain.ik_targets, follow_joints):
+                ik_ctrl = ik_ctrls.get(joint_name)
+                cmds.parentConstraint(ik_ctrl, follow_joint)
 
-                cmds.skinCluster(follow_joints, curve, toSelectedBones=True,
-                                 maximumInfluences=1, normalizeWeights=1,
-                                 name="spine_curve_skinCluster")[0]
+            cmds.skinCluster(follow_joints, curve, toSelectedBones=True,
+                             maximumInfluences=1, normalizeWeights=1,
+                             name="spine_curve_skinCluster")[0]
 
     @staticmethod
-    def build_spine_ik_ctrl_curve_orient_drivers():
-
-        schema = UE5_SCHEMA.get("spine", {})
+    def build_spine_ik_ctrl_curve_orient_drivers(ctx):
 
-        ik_ctrls = RIG_CTX.control_registry.get("ik", {})
+        ik_ctrls = ctx.control_registry.get("ik", {})
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        for chain in SCHEMA.chains("spine"):
 
-                start_ctrl = ik_ctrls.get(chain[1])
-                end_ctrl = ik_ctrls.get(chain[3])
+            start_ctrl = ik_ctrls.get(chain.start)
+            end_ctrl = ik_ctrls.get(chain.end)
 
-                start_driver_joint = cmds.ls(
-                    f"{chain[0]}_spine_driver_JNT", long=True)[0]
+            start_driver_joint = ctx.node_index.lookup(
+                f"{chain.drivers[0]}_spine_driver_JNT")
 
-                end_driver_joint = cmds.ls(
-                    f"{chain[-2]}_spine_driver_JNT", long=True)[0]
+            end_driver_joint = ctx.node_index.lookup(
+                f"{chain.drivers[-1]}_spine_driver_JNT")
 
-                cmds.orientConstraint(
-                    start_ctrl, start_driver_joint, maintainOffset=True)
-                cmds.orientConstraint(
-                    end_ctrl, end_driver_joint, maintainOffset=True)
+            cmds.orientConstraint(
+                start_ctrl, start_driver_joint, maintainOffset=True)
+            cmds.orientConstraint(
+                end_ctrl, end_driver_joint, maintainOffset=True)
 
-                mid_ctrl = ik_ctrls.get(chain[2])
-                mid_driver_names = [chain[2], chain[3]]
+            mid_ctrl = ik_ctrls.get(chain.mid)
+            mid_driver_names = [chain.mid, chain.end]
 
-                for joint_name in mid_driver_names:
+            for joint_name in mid_driver_names:
 
-                    driver = cmds.ls(
-                        f"{joint_name}_spine_driver_JNT", long=True)[0]
-                    aim_constraints = cmds.listRelatives(
-                        driver, type="aimConstraint", fullPath=True)[0]
+                driver = ctx.node_index.lookup(
+                    f"{joint_name}_spine_driver_JNT")
+                aim_constraints = cmds.listRelatives(
+                    driver, type="aimConstraint", fullPath=True)[0]
 
-                    cmds.connectAttr(f"{mid_ctrl}.rotateY",
-                                     f"{aim_constraints}.offsetX")
+                cmds.connectAttr(f"{mid_ctrl}.rotateY",
+                                 f"{aim_constraints}.offsetX")
 
     @staticmethod
-    def build_spine_curve_ik_joint_drivers():
-
-        schema = UE5_SCHEMA.get("spine", {})
+    def build_spine_curve_ik_joint_drivers(ctx):
 
-        ik_joints = RIG_CTX.joint_registry.get("ik", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        for chain in SCHEMA.chains("spine"):
 
-                for joint_name in chain[0:-1]:
+            for joint_name in chain.drivers:
 
-                    driver_joint = cmds.ls(
-                        f"{joint_name}_spine_driver_JNT", long=True)[0]
-                    ik_joint = ik_joints.get(joint_name)
+                driver_joint = ctx.node_index.lookup(
+                    f"{joint_name}_spine_driver_JNT")
+                ik_joint = ik_joints.get(joint_name)
 
-                    cmds.parentConstraint(driver_joint, ik_joint)
+                cmds.parentConstraint(driver_joint, ik_joint)
 
     @staticmethod
-    def build_spine_hip_ctrl_drivers():
+    def build_spine_hip_ctrl_drivers(ctx):
 
-        pelvis_fk_joint = RIG_CTX.joint_registry.get("fk", {}).get("pelvis")
-        pelvis_fk_ctrl = RIG_CTX.control_registry.get("fk", {}).get("pelvis")
+        pelvis_fk_joint = ctx.joint_registry.get("fk", {}).get("pelvis")
+        pelvis_fk_ctrl = ctx.control_registry.get("fk", {}).get("pelvis")
 
-        hip_ctrl = cmds.ls("pelvis_hip_CTRL", long=True)[0]
-        hip_offset_grp = cmds.ls("pelvis_hip_offset_GRP", long=True)[0]
-        spine_01_grp = cmds.ls("spine_01_hipFollow_GRP", long=True)[0]
-        pelvis_follow_grp = cmds.ls("pelvis_hipFollow_GRP", long=True)[0]
+        hip_ctrl = ctx.node_index.lookup("pelvis_hip_CTRL")
+        hip_offset_grp = ctx.node_index.lookup("pelvis_hip_offset_GRP")
+        spine_01_grp = ctx.node_index.lookup("spine_01_hipFollow_GRP")
+        pelvis_follow_grp = ctx.node_index.lookup("pelvis_hipFollow_GRP")
 
         cmds.parentConstraint(hip_offset_grp, spine_01_grp,
                               skipTranslate=("x", "y", "z"))
@@ -591,6 +556,129 @@ class SpineRig:
         cmds.parentConstraint(pelvis_follow_grp, pelvis_fk_joint)
 
 
+class MatrixSpineRig:
+
+    @staticmethod
+    def curve_weights(spline, positions, ctrl_positions):
+
+        # Each CV follows its nearest control, as the single-influence skin
+        # would, so a driver's weights are its basis values summed per control.
+        distances = np.linalg.norm(
+            spline.cvs[:, None] - np.asarray(ctrl_positions)[None], axis=2)
+        owners = np.eye(len(ctrl_positions))[np.argmin(distances, axis=1)]
+
+        weights = spline.basis(spline.closest_params(positions)) @ owners
+        weights[weights < 1.0e-4] = 0.0
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    @staticmethod
+    def build_spine_matrix_drivers(ctx):
+
+        ik_ctrls = ctx.control_registry.get("ik", {})
+        ik_joints = ctx.joint_registry.get("ik", {})
+
+        follow_joints = SpineRig.follow_joints(ctx)
+
+        curve = ctx.node_index.lookup("spine_IK_EP_CRV")
+        spline = BSplineCurve.from_node(curve)
+
+        for chain in SCHEMA.chains("spine"):
+
+            ctrls = [ik_ctrls.get(joint_name) for joint_name in chain.ik_targets]
+            ctrl_matrices = [RigHelpers.world_matrix(ctx, ctrl) for ctrl in ctrls]
+
+            # One delta per control: how far it has moved from its rest pose.
+            deltas = []
+            for joint_name, ctrl, matrix in zip(chain.ik_targets, ctrls, ctrl_matrices):
+                delta = DG_BATCH.create_node(
+                    "multMatrix", name=f"{joint_name}_spine_delta_MM")
+                DG_BATCH.defer(RigHelpers.set_matrix_attr,
+                               delta, "matrixIn[0]", np.linalg.inv(matrix))
+                DG_BATCH.connect_attr(f"{ctrl}.worldMatrix[0]",
+                                      f"{delta}.matrixIn[1]")
+                deltas.append(f"{delta}.matrixSum")
+
+            weights = MatrixSpineRig.curve_weights(
+                spline,
+                [RigHelpers.world_position(ctx, ik_joints.get(joint_name))
+                 for joint_name in chain.drivers],
+                [matrix[3, :3] for matrix in ctrl_matrices])
+
+            outputs = []
+            for joint_name, joint_weights in zip(chain.drivers, weights):
+
+                ik_joint = ik_joints.get(joint_name)
+                source = MatrixSpineRig.blend_deltas(joint_name, deltas, joint_weights)
+
+                world = DG_BATCH.create_node(
+                    "multMatrix", name=f"{joint_name}_spine_MM")
+                DG_BATCH.defer(RigHelpers.set_matrix_attr, world, "matrixIn[0]",
+                               RigHelpers.world_matrix(ctx, ik_joint))
+                DG_BATCH.connect_attr(source, f"{world}.matrixIn[1]")
+                outputs.append(f"{world}.matrixSum")
+
+            mid_ctrl = ik_ctrls.get(chain.mid)
+            for i in range(1, len(chain.drivers) - 1):
+                joint_name = chain.drivers[i]
+                aim = DG_BATCH.create_node(
+                    "aimMatrix", name=f"{joint_name}_spine_AM")
+                DG_BATCH.set_attr(f"{aim}.primaryInputAxis", *SPINE_AIM_VECTOR)
+                DG_BATCH.set_attr(f"{aim}.secondaryInputAxis", *SPINE_UP_VECTOR)
+                # Align mode: the secondary axis follows a world vector.
+                DG_BATCH.set_attr(f"{aim}.secondaryMode", 2)
+                DG_BATCH.set_attr(f"{aim}.secondaryTargetVector", *SPINE_WORLD_UP)
+                DG_BATCH.connect_attr(outputs[i], f"{aim}.inputMatrix")
+                DG_BATCH.connect_attr(outputs[i + 1], f"{aim}.primaryTargetMatrix")
+                outputs[i] = f"{aim}.outputMatrix"
+
+                # The mid control's rotateY twists these drivers about their
+                # aim axis, as it drives the aim offsets in curve mode.
+                if joint_name in (chain.mid, chain.end):
+                    twist = DG_BATCH.create_node(
+                        "composeMatrix", name=f"{joint_name}_spine_twist_CM")
+                    DG_BATCH.connect_attr(f"{mid_ctrl}.rotateY",
+                                          f"{twist}.inputRotateX")
+                    twisted = DG_BATCH.create_node(
+                        "multMatrix", name=f"{joint_name}_spine_twist_MM")
+                    DG_BATCH.connect_attr(f"{twist}.outputMatrix",
+                                          f"{twisted}.matrixIn[0]")
+                    DG_BATCH.connect_attr(outputs[i], f"{twisted}.matrixIn[1]")
+                    outputs[i] = f"{twisted}.matrixSum"
+
+            # The drivers output world matrices, so the ik joints stop
+            # inheriting and take them directly as their offsetParentMatrix.
+            for joint_name, output in zip(chain.drivers, outputs):
+                ik_joint = ik_joints.get(joint_name)
+                DG_BATCH.set_attr(f"{ik_joint}.inheritsTransform", 0)
+                DG_BATCH.connect_attr(output, f"{ik_joint}.offsetParentMatrix")
+
+        cmds.delete(curve, *follow_joints)
+
+    @staticmethod
+    def blend_deltas(joint_name, deltas, weights):
+
+        influences = [(delta, weight) for delta, weight in zip(deltas, weights.tolist())
+                      if weight > 0.0]
+        if len(influences) == 1:
+            return influences[0][0]
+
+        # blendMatrix layers its targets, so each weight is taken relative to
+        # the influences blended before it.
+        blend = DG_BATCH.create_node(
+            "blendMatrix", name=f"{joint_name}_spine_BM")
+        DG_BATCH.connect_attr(influences[0][0], f"{blend}.inputMatrix")
+        total = influences[0][1]
+        for index, (delta, weight) in enumerate(influences[1:]):
+            total += weight
+            DG_BATCH.connect_attr(delta, f"{blend}.target[{index}].targetMatrix")
+            DG_BATCH.set_attr(f"{blend}.target[{index}].weight", weight / total)
+
+        return f"{blend}.outputMatrix"
+
+
 RigHelpers = rig_builders_runtime.RigHelpers
-RIG_CTX = rig_builders_runtime.RIG_CTX
-UE5_SCHEMA = rig_builders_runtime.UE5_SCHEMA
+BSplineCurve = rig_builders_nurbs.BSplineCurve
+DG_BATCH = rig_builders_runtime.DG_BATCH
+SCHEMA = rig_builders_runtime.SCHEMA
+PROFILES = rig_builders_runtime.PROFILES
+SkeletonProfile = rig_builders_profiles.SkeletonProfile
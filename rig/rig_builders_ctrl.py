@@ -1,6 +1,7 @@
 
 
 import math
+import functools
 
 import maya.cmds as cmds
 
@@ -22,31 +23,125 @@ class CtrlFactory:
             raise RuntimeError(f"Unknown ctrl size tier: {size}")
 
     @staticmethod
-    def create_ctrl_fk(**kwargs):
+    def create_ctrl_fk(ctx, **kwargs):
         args = dict(name="CTRL_FK", size="medium",
-                    normal=(0, 1, 0), color_index=18)
+                    normal=(0, 1, 0), color_index=18, instance=False)
         args.update(kwargs)
 
         radius = CtrlFactory._resolve_radius(args["size"])
+        key = CtrlFactory._shape_key("fk", radius, args["color_index"],
+                                     *args["normal"])
+
+        if args["instance"]:
+            shape = ctx.node_index.get(key)
+            if shape:
+                return CtrlFactory._instance_ctrl(args["name"], [shape])
 
         ctrl = cmds.circle(n=args["name"], r=radius,
                            nr=args["normal"], ch=False)[0]
 
-        shapes = cmds.listRelatives(ctrl, s=True, f=True) or []
-        for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
+        shapes = CtrlFactory._set_color(ctrl, args["color_index"])
+        if args["instance"] and shapes:
+            ctx.node_index.record(shapes[0], key)
 
         return ctrl
 
     @staticmethod
-    def create_ctrl_ik(**kwargs):
-        args = dict(name="CTRL_IK", size="medium", color_index=13)
+    def create_ctrl_ik(ctx=None, **kwargs):
+        args = dict(name="CTRL_IK", size="medium", color_index=13, instance=False)
+        args.update(kwargs)
+
+        return CtrlFactory._create_shape_ctrl(ctx, "ik", args)
+
+    @staticmethod
+    def create_ctrl_pole_vector(ctx=None, **kwargs):
+        args = dict(name="CTRL_Pole", size="medium", color_index=13, instance=False)
+        args.update(kwargs)
+
+        return CtrlFactory._create_shape_ctrl(ctx, "pole_vector", args)
+
+    @staticmethod
+    def create_ctrl_ikfk_switch(ctx=None, **kwargs):
+        args = dict(name="CTRL_IKFK", size="xsmall", color_index=6, instance=False)
+        args.update(kwargs)
+
+        return CtrlFactory._create_shape_ctrl(ctx, "ikfk_switch", args)
+
+    @staticmethod
+    def create_ctrl_half_circle(ctx=None, **kwargs):
+        args = dict(name="CTRL_halfCircle", size="medium", color_index=17,
+                    instance=False)
+        args.update(kwargs)
+
+        return CtrlFactory._create_shape_ctrl(ctx, "half_circle", args)
+
+    @staticmethod
+    def create_ctrl_half_circle_ribbon(ctx=None, **kwargs):
+        args = dict(name="CTRL_halfCircleRibbon", size="medium",
+                    thickness=0.15, segments=24, color_index=17, instance=False)
+        args.update(kwargs)
+
+        return CtrlFactory._create_shape_ctrl(
+            ctx, "half_circle_ribbon", args,
+            thickness=args["thickness"], segments=args["segments"])
+
+    @staticmethod
+    def create_ctrl_hip(ctx=None, **kwargs):
+
+        args = dict(name="CTRL_Hip", size="medium",
+                    color_index=17, segments=32, instance=False)
+        args.update(kwargs)
+
+        return CtrlFactory._create_shape_ctrl(
+            ctx, "hip", args, segments=args["segments"])
+
+    @staticmethod
+    def create_ctrl_cross_arrow(ctx=None, **kwargs):
+
+        args = dict(name="CTRL_Triangle", size="medium", color_index=14,
+                    instance=False)
         args.update(kwargs)
 
-        extent = CtrlFactory._resolve_radius(args["size"])
+        return CtrlFactory._create_shape_ctrl(ctx, "cross_arrow", args)
 
-        if args["size"] == "large":
+    @staticmethod
+    def _create_shape_ctrl(ctx, shape, args, **options):
+
+        curves = CtrlFactory.shape_points(shape, args["size"], **options)
+
+        key = None
+        if args["instance"]:
+            key = CtrlFactory._shape_key(
+                shape, args["size"], args["color_index"],
+                *[options[name] for name in sorted(options)])
+
+        return CtrlFactory._create_curves(
+            ctx, args["name"], curves, args["color_index"], key)
+
+    @staticmethod
+    def _shape_key(shape, size, color_index, *options):
+
+        # Round float sizes and options so that equal shapes share one key.
+        values = [round(v, 3) if isinstance(v, float) else v
+                  for v in (size, color_index, *options)]
+
+        return "_".join(["ctrlShape", shape, *map(str, values)])
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def shape_points(shape, size, **options):
+
+        extent = CtrlFactory._resolve_radius(size)
+        generator = getattr(CtrlFactory, f"_{shape}_points")
+        curves = generator(extent, size, **options)
+
+        return tuple(tuple(tuple(float(v) for v in point) for point in curve)
+                     for curve in curves)
+
+    @staticmethod
+    def _ik_points(extent, size):
+
+        if size == "large":
             hx = extent * 0.05
             hy = extent * 0.75
             hz = extent * 1
@@ -62,104 +157,52 @@ class CtrlFactory:
         p110 = (hx,  hy, -hz)
         p111 = (hx,  hy,  hz)
 
-        points = [p000, p100, p101, p001,
-                  p000, p010, p110, p111,
-                  p011, p010, p110, p100,
-                  p101, p111, p011, p001]
-
-        ctrl = cmds.curve(d=1, p=points, n=args["name"])
-
-        shapes = cmds.listRelatives(ctrl, s=True, f=True) or []
-        for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
-
-        return ctrl
+        return [[p000, p100, p101, p001,
+                 p000, p010, p110, p111,
+                 p011, p010, p110, p100,
+                 p101, p111, p011, p001]]
 
     @staticmethod
-    def create_ctrl_pole_vector(**kwargs):
-        args = dict(name="CTRL_Pole", size="medium", color_index=13)
-        args.update(kwargs)
+    def _pole_vector_points(extent, size):
 
-        extent = CtrlFactory._resolve_radius(args["size"])
         h = extent * 0.5
 
-        points = [(-h, 0, 0), (h, 0, 0),
-                  (0, 0, 0),
-                  (0, -h, 0), (0, h, 0),
-                  (0, 0, 0),
-                  (0, 0, -h), (0, 0, h)]
-
-        ctrl = cmds.curve(d=1, p=points, n=args["name"])
-
-        shapes = cmds.listRelatives(ctrl, s=True, f=True) or []
-        for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
-
-        return ctrl
+        return [[(-h, 0, 0), (h, 0, 0),
+                 (0, 0, 0),
+                 (0, -h, 0), (0, h, 0),
+                 (0, 0, 0),
+                 (0, 0, -h), (0, 0, h)]]
 
     @staticmethod
-    def create_ctrl_ikfk_switch(**kwargs):
-        args = dict(name="CTRL_IKFK", size="xsmall", color_index=6)
-        args.update(kwargs)
+    def _ikfk_switch_points(extent, size):
 
-        extent = CtrlFactory._resolve_radius(args["size"])
         h = extent * 0.5
         t = extent * 0.2
 
-        points = [(-t,  h, 0), (t,  h, 0),
-                  (t,  t, 0), (h,  t, 0),
-                  (h, -t, 0), (t, -t, 0),
-                  (t, -h, 0), (-t, -h, 0),
-                  (-t, -t, 0), (-h, -t, 0),
-                  (-h,  t, 0), (-t,  t, 0),
-                  (-t,  h, 0)]
-
-        ctrl = cmds.curve(d=1, p=points, n=args["name"])
-
-        shapes = cmds.listRelatives(ctrl, s=True, f=True) or []
-        for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
-
-        return ctrl
+        return [[(-t,  h, 0), (t,  h, 0),
+                 (t,  t, 0), (h,  t, 0),
+                 (h, -t, 0), (t, -t, 0),
+                 (t, -h, 0), (-t, -h, 0),
+                 (-t, -t, 0), (-h, -t, 0),
+                 (-h,  t, 0), (-t,  t, 0),
+                 (-t,  h, 0)]]
 
     @staticmethod
-    def create_ctrl_half_circle(**kwargs):
-        args = dict(name="CTRL_halfCircle", size="medium", color_index=17)
-        args.update(kwargs)
+    def _half_circle_points(extent, size, segments=16):
 
-        radius = CtrlFactory._resolve_radius(args["size"])
-
-        segments = 16
         points = []
-
-        import math
         for i in range(segments + 1):
             angle = math.pi * (i / segments)  # 0 → 180°
-            x = math.cos(angle) * radius
-            z = math.sin(angle) * radius
+            x = math.cos(angle) * extent
+            z = math.sin(angle) * extent
             points.append((x, 0, z))
 
-        ctrl = cmds.curve(d=1, p=points, n=args["name"])
-
-        shapes = cmds.listRelatives(ctrl, s=True, f=True) or []
-        for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
-
-        return ctrl
+        return [points]
 
     @staticmethod
-    def create_ctrl_half_circle_ribbon(**kwargs):
-        args = dict(name="CTRL_halfCircleRibbon", size="medium",
-                    thickness=0.15, segments=24, color_index=17)
-        args.update(kwargs)
+    def _half_circle_ribbon_points(extent, size, thickness=0.15, segments=24):
 
-        radius = CtrlFactory._resolve_radius(args["size"])
-        thickness = radius * args["thickness"]
-        segments = args["segments"]
+        thickness = extent * thickness
 
         top = []
         bottom = []
@@ -167,296 +210,282 @@ class CtrlFactory:
         for i in range(segments + 1):
             angle = math.pi * (i / segments)
 
-            y = math.cos(angle) * radius
-            z = math.sin(angle) * radius
+            y = math.cos(angle) * extent
+            z = math.sin(angle) * extent
 
-            px = thickness
-            py = y
-            pz = z
+            top.append((thickness, y, -z))
+            bottom.append((-thickness, y, -z))
 
-            top.append((px, py, -pz))
-            bottom.append((-px, py, -pz))
+        return [top + bottom[::-1] + [top[0]]]
 
-        points = top + bottom[::-1] + [top[0]]
+    @staticmethod
+    def _hip_points(extent, size, segments=32):
 
-        ctrl = cmds.curve(d=1, p=points, n=args["name"])
+        rx = extent
+        rz = extent * 0.45
 
-        shapes = cmds.listRelatives(ctrl, s=True, f=True) or []
-        for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
+        points = []
+        for i in range(segments + 1):
+            angle = 2 * math.pi * (i / segments)
 
-        return ctrl
+            x = math.cos(angle) * rx
+            z = math.sin(angle) * rz
 
-    @staticmethod
-    def create_ctrl_hip(**kwargs):
+            points.append((x, 0, z))
 
-        args = dict(name="CTRL_Hip", size="medium",
-                    color_index=17, segments=32)
-        args.update(kwargs)
+        return [points, CtrlFactory._rotate_points_y(points, 90)]
 
-        radius = CtrlFactory._resolve_radius(args["size"])
+    @staticmethod
+    def _cross_arrow_points(extent, size):
 
-        rx = radius
-        rz = radius * 0.45
+        r = extent * 0.5
+        arrow = [(0, 0, r + 25),
+                 (-r, 0, -r + 25),
+                 (r, 0, -r + 25),
+                 (0, 0, r + 25)]
+        line = [(0, 0, 0), (0, 0, 20)]
 
-        seg = args["segments"]
+        curves = []
+        for i in range(4):
+            curves.append(CtrlFactory._rotate_points_y(arrow, 90 * i))
+            curves.append(CtrlFactory._rotate_points_y(line, 90 * i))
 
-        points = []
+        return curves
 
-        for i in range(seg + 1):
-            angle = 2 * math.pi * (i / seg)
+    @staticmethod
+    def _rotate_points_y(points, degrees):
 
-            x = math.cos(angle) * rx
-            z = math.sin(angle) * rz
+        angle = math.radians(degrees)
+        c = round(math.cos(angle), 12)
+        s = round(math.sin(angle), 12)
 
-            points.append((x, 0, z))
+        return [(x * c + z * s, y, z * c - x * s) for x, y, z in points]
 
-        ctrl1 = cmds.curve(d=1, p=points, n=args["name"])
-        ctrl2 = cmds.curve(d=1, p=points)
+    @staticmethod
+    def _create_curves(ctx, name, curves, color_index, key=None):
 
-        cmds.rotate(0, 90, 0, ctrl2, r=True)
-        cmds.makeIdentity(ctrl2, apply=True, r=True)
+        if key:
+            shapes = [ctx.node_index.get(f"{key}_{index}")
+                      for index in range(len(curves))]
+            if all(shapes):
+                return CtrlFactory._instance_ctrl(name, shapes)
 
-        shapes = cmds.listRelatives(ctrl2, s=True, f=True) or []
-        for s in shapes:
-            cmds.parent(s, ctrl1, add=True, shape=True)
+        ctrl = cmds.curve(d=1, p=list(curves[0]), n=name)
 
-        cmds.delete(ctrl2)
+        if len(curves) > 1:
+            extras = [cmds.curve(d=1, p=list(points)) for points in curves[1:]]
+            cmds.parent(cmds.listRelatives(extras, s=True, f=True), ctrl,
+                        relative=True, shape=True)
+            cmds.delete(extras)
 
-        shapes = cmds.listRelatives(ctrl1, s=True, f=True) or []
-        for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
+        shapes = CtrlFactory._set_color(ctrl, color_index)
+        if key:
+            for index, shape in enumerate(shapes):
+                ctx.node_index.record(shape, f"{key}_{index}")
 
-        return ctrl1
+        return ctrl
 
     @staticmethod
-    def create_ctrl_cross_arrow(**kwargs):
+    def _instance_ctrl(name, shapes):
 
-        args = dict(name="CTRL_Triangle", size="medium", color_index=14)
-        args.update(kwargs)
+        ctrl = cmds.createNode("transform", name=name)
+        cmds.parent(shapes, ctrl, add=True, shape=True)
 
-        extent = CtrlFactory._resolve_radius(args["size"])
-        r = extent * 0.5
-        points = [(0, 0, r),
-                  (-r, 0, -r),
-                  (r, 0, -r),
-                  (0, 0, r)]
-        ctrl = cmds.curve(d=1, p=points, n=args["name"])
-        cmds.move(0, 0, 25, ctrl, relative=True)
-        cmds.xform(ctrl, ws=True, piv=(0, 0, 0))
-        cmds.makeIdentity(ctrl, apply=True, t=True, r=True, s=True, n=0)
-        line = cmds.curve(d=1,
-                          p=[(0, 0, 0), (0, 0, 20)], n=args["name"] + "_line")
-        line_shape = cmds.listRelatives(line, s=True, f=True)[0]
-        cmds.parent(line_shape, ctrl, add=True, shape=True)
-        cmds.delete(line)
-
-        for i in range(1, 4):
-            dup = cmds.duplicate(ctrl, rr=True)[0]
-            cmds.rotate(0, 90 * i, 0, dup, r=True, os=True)
-            cmds.makeIdentity(dup, apply=True, t=True, r=True, s=True, n=0)
-            shapes = cmds.listRelatives(dup, s=True, f=True) or []
-            cmds.parent(shapes, ctrl, add=True, shape=True)
-            cmds.delete(dup)
+        return ctrl
+
+    @staticmethod
+    def _set_color(ctrl, color_index):
 
         shapes = cmds.listRelatives(ctrl, s=True, f=True) or []
         for s in shapes:
-            cmds.setAttr(s + ".overrideEnabled", 1)
-            cmds.setAttr(s + ".overrideColor", int(args["color_index"]))
+            DG_BATCH.set_attr(s + ".overrideEnabled", 1)
+            DG_BATCH.set_attr(s + ".overrideColor", int(color_index))
 
-        return ctrl
+        return shapes
 
 
 class ControlBuilder:
 
     @staticmethod
-    def build_root_fK_controls():
+    def build_root_fK_controls(ctx):
 
-        root_joint = RIG_CTX.skeleton_root
+        root_joint = ctx.skeleton_root
 
         main_system = RigHelpers.get_or_create_group_chain(
-            "Group", "controls", "MainSystem")
+            ctx, "Group", "controls", "MainSystem")
 
-        root_joint = RIG_CTX.skeleton_root
+        root_joint = ctx.skeleton_root
         root_ctrl = CtrlFactory.create_ctrl_fk(
-            name="root", size=34.0, normal=(0, 0, 1))
+            ctx, name="root", size=34.0, normal=(0, 0, 1))
         root_ctrl = cmds.parent(root_ctrl, main_system)[0]
-        root_ctrl = cmds.ls(root_ctrl, long=True)[0]
-        cmds.matchTransform(root_ctrl, root_joint)
+        RigHelpers.match_transform(ctx, root_ctrl, root_joint)
         cmds.makeIdentity(root_ctrl, apply=True)
-        RIG_CTX.control_registry.setdefault(
+        ctx.control_registry.setdefault(
             "fk", {})["root"] = root_ctrl
 
     @staticmethod
-    def build_limb_fK_controls():
+    def build_limb_fK_controls(ctx):
 
-        ControlBuilder.build_fk_chain_controls("limb", "medium")
+        ControlBuilder.build_fk_chain_controls(ctx, "limb", "medium")
 
     @staticmethod
-    def build_limb_iK_controls():
+    def build_limb_iK_controls(ctx):
 
-        schema = UE5_SCHEMA.get("limb", {})
-
-        deform_map = RIG_CTX.joint_registry.get("deform", {})
+        deform_map = ctx.joint_registry.get("deform", {})
 
         ik_system = RigHelpers.get_or_create_group_chain(
-            "Group", "controls", "IKSystem")
+            ctx, "Group", "controls", "IKSystem")
 
-        for side, side_dict in schema.items():
+        bake_nodes = []
+        for side, chains in SCHEMA.by_side("limb"):
 
             schema_grp = cmds.group(
                 empty=True, name=f"ik_limb_{side}_ctrl_GRP", parent=ik_system)
             schema_base_joint = deform_map.get(f"limb_{side}")
-            schema_grp = cmds.ls(schema_grp, long=True)[0]
             if schema_base_joint:
-                cmds.matchTransform(schema_grp, schema_base_joint)
-                RigHelpers.bake_transform_to_opm(schema_grp)
-            RIG_CTX.group_registry.setdefault(
+                RigHelpers.match_transform(ctx, schema_grp, schema_base_joint)
+                bake_nodes.append(schema_grp)
+            ctx.group_registry.setdefault(
                 "ik_ctrl", {})[f"limb_{side}"] = schema_grp
 
-            for limb_name, chain in side_dict.items():
-                if limb_name == "upperarm":
-                    _, mid_name, end_name = chain[1:4]
-                else:
-                    _, mid_name, end_name = chain[0:3]
+            for chain in chains:
+                mid_name, end_name = chain.pole, chain.end
 
                 mid_joint = deform_map.get(mid_name)
                 end_joint = deform_map.get(end_name)
 
                 chain_grp = cmds.group(
-                    empty=True, name=f"ik_{limb_name}_{side}_ctrl_GRP", parent=schema_grp)
-                chain_grp = cmds.ls(chain_grp, long=True)[0]
-                chain_base_joint = deform_map.get(chain[0])
-                cmds.matchTransform(chain_grp, chain_base_joint)
-                RigHelpers.bake_transform_to_opm(chain_grp)
-                RIG_CTX.group_registry.setdefault(
-                    "ik_ctrl", {})[f"{limb_name}_{side}"] = chain_grp
+                    empty=True, name=f"ik_{chain.key}_ctrl_GRP", parent=schema_grp)
+                chain_base_joint = deform_map.get(chain.joints[0])
+                RigHelpers.match_transform(ctx, chain_grp, chain_base_joint)
+                bake_nodes.append(chain_grp)
+                ctx.group_registry.setdefault(
+                    "ik_ctrl", {})[chain.key] = chain_grp
 
                 ik_ctrl = CtrlFactory.create_ctrl_ik(
                     name=f"{end_name}_ik_CTRL", size="medium")
-                rot = limb_name == "thigh"
-                cmds.matchTransform(ik_ctrl, end_joint,
-                                    position=True, rotation=rot, scale=False)
+                rot = chain.name == "thigh"
+                RigHelpers.match_transform(ctx, ik_ctrl, end_joint,
+                                           position=True, rotation=rot, scale=False)
                 cmds.makeIdentity(ik_ctrl, apply=True,
                                   translate=False, rotate=True, scale=True, normal=0)
                 cmds.parent(ik_ctrl, chain_grp)
-                ik_ctrl = cmds.ls(ik_ctrl, long=True)[0]
-                RigHelpers.bake_transform_to_opm(ik_ctrl)
-                RIG_CTX.control_registry.setdefault(
+                bake_nodes.append(ik_ctrl)
+                ctx.control_registry.setdefault(
                     "ik", {})[end_name] = ik_ctrl
 
                 pole_ctrl = CtrlFactory.create_ctrl_pole_vector(
-                    name=f"{mid_name}_pole_CTRL")
-                cmds.matchTransform(pole_ctrl, mid_joint)
+                    ctx, name=f"{mid_name}_pole_CTRL", instance=True)
+                RigHelpers.match_transform(ctx, pole_ctrl, mid_joint)
                 offset = 40.0 if mid_name.startswith("calf") else -40.0
                 offset *= 1 if mid_name.endswith("_r") else -1
                 cmds.move(0, offset, 0, pole_ctrl,
                           relative=True, objectSpace=True)
                 cmds.setAttr(f"{pole_ctrl}.rotate", 0, 0, 0)
                 cmds.parent(pole_ctrl, chain_grp)
-                pole_ctrl = cmds.ls(pole_ctrl, long=True)[0]
-                RigHelpers.bake_transform_to_opm(pole_ctrl)
-                RIG_CTX.control_registry.setdefault(
+                bake_nodes.append(pole_ctrl)
+                ctx.control_registry.setdefault(
                     "ik", {})[mid_name] = pole_ctrl
 
+        RigHelpers.bake_transforms_to_opm(bake_nodes)
+
     @staticmethod
-    def build_limb_ikfk_controls():
+    def build_limb_ikfk_controls(ctx):
 
-        ControlBuilder.build_ikfk_controls("limb")
+        ControlBuilder.build_ikfk_controls(ctx, "limb")
 
     @staticmethod
-    def build_spine_fK_controls():
+    def build_spine_fK_controls(ctx):
 
-        ControlBuilder.build_fk_chain_controls("spine", "large")
+        ControlBuilder.build_fk_chain_controls(ctx, "spine", "large")
 
     @staticmethod
-    def build_spine_iK_controls():
+    def build_spine_iK_controls(ctx):
 
-        schema = UE5_SCHEMA.get("spine", {})
-
-        deform_map = RIG_CTX.joint_registry.get("deform", {})
+        deform_map = ctx.joint_registry.get("deform", {})
 
         ik_system = RigHelpers.get_or_create_group_chain(
-            "Group", "controls", "IKSystem")
+            ctx, "Group", "controls", "IKSystem")
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        bake_nodes = []
+        for chain in SCHEMA.chains("spine"):
 
-                chain_grp = cmds.group(
-                    empty=True, name=f"ik_{limb_name}_{side}_ctrl_GRP", parent=ik_system)
-                chain_grp = cmds.ls(chain_grp, long=True)[0]
-                base_joint = deform_map.get(chain[0])
-                cmds.matchTransform(chain_grp, base_joint)
-                RigHelpers.bake_transform_to_opm(chain_grp)
-                RIG_CTX.group_registry.setdefault(
-                    "ik_ctrl", {})[f"{limb_name}_{side}"] = chain_grp
+            chain_grp = cmds.group(
+                empty=True, name=f"ik_{chain.key}_ctrl_GRP", parent=ik_system)
+            base_joint = deform_map.get(chain.joints[0])
+            RigHelpers.match_transform(ctx, chain_grp, base_joint)
+            bake_nodes.append(chain_grp)
+            ctx.group_registry.setdefault(
+                "ik_ctrl", {})[chain.key] = chain_grp
+
+            for joint_name in chain.ik_targets:
+                ik_ctrl = CtrlFactory.create_ctrl_ik(
+                    name=f"{joint_name}_ik_CTRL", size="large")
+                ctx.control_registry.setdefault(
+                    "ik", {})[joint_name] = ik_ctrl
 
-                targets = chain[1:4]
-                for joint_name in targets:
-                    ik_ctrl = CtrlFactory.create_ctrl_ik(
-                        name=f"{joint_name}_ik_CTRL", size="large")
-                    ik_ctrl = cmds.ls(ik_ctrl, long=True)[0]
-                    RIG_CTX.control_registry.setdefault(
-                        "ik", {})[joint_name] = ik_ctrl
+        RigHelpers.bake_transforms_to_opm(bake_nodes)
 
     @staticmethod
-    def build_spine_ikfk_controls():
+    def build_spine_ikfk_controls(ctx):
 
-        ControlBuilder.build_ikfk_controls("spine")
+        ControlBuilder.build_ikfk_controls(ctx, "spine")
 
     @staticmethod
-    def build_hip_controls():
+    def build_hip_controls(ctx):
 
         hip_system = RigHelpers.get_or_create_group_chain(
-            "Group", "driving_system", "HipSystem")
+            ctx, "Group", "driving_system", "HipSystem")
 
-        deform_joints = RIG_CTX.joint_registry.get("deform", {})
+        deform_joints = ctx.joint_registry.get("deform", {})
 
-        pelvis_fk_ctrl = RIG_CTX.control_registry.get("fk", {}).get("pelvis")
+        pelvis_fk_ctrl = ctx.control_registry.get("fk", {}).get("pelvis")
         pelvis_joint = deform_joints.get("pelvis")
         spine_01_joint = deform_joints.get("spine_01")
 
         hip_ctrl = CtrlFactory.create_ctrl_hip(
             name="pelvis_hip_CTRL", size="medium", color_index=17)
-        cmds.matchTransform(hip_ctrl, pelvis_joint)
+        RigHelpers.match_transform(ctx, hip_ctrl, pelvis_joint)
         cmds.move(0, 0, 30, hip_ctrl, relative=True, objectSpace=True)
-        cmds.parent(hip_ctrl, pelvis_fk_ctrl)
-        RigHelpers.bake_transform_to_opm(hip_ctrl)
+        hip_ctrl = cmds.parent(hip_ctrl, pelvis_fk_ctrl)[0]
 
         hip_offset_grp = cmds.group(
             empty=True, name="pelvis_hip_offset_GRP", parent=hip_ctrl)
-        cmds.matchTransform(hip_offset_grp, spine_01_joint)
-        RigHelpers.bake_transform_to_opm(hip_offset_grp)
+        RigHelpers.match_transform(ctx, hip_offset_grp, spine_01_joint)
 
         spine_01_group = cmds.group(
             empty=True, name="spine_01_hipFollow_GRP", parent=hip_system)
-        cmds.matchTransform(spine_01_group, spine_01_joint)
-        RigHelpers.bake_transform_to_opm(spine_01_group)
+        RigHelpers.match_transform(ctx, spine_01_group, spine_01_joint)
 
         pelvis_follow_group = cmds.group(
             empty=True, name="pelvis_hipFollow_GRP", parent=spine_01_group)
-        cmds.matchTransform(pelvis_follow_group, pelvis_joint)
-        RigHelpers.bake_transform_to_opm(pelvis_follow_group)
+        RigHelpers.match_transform(ctx, pelvis_follow_group, pelvis_joint)
 
-    @staticmethod
-    def build_hand_controls():
+        RigHelpers.bake_transforms_to_opm(
+            [hip_ctrl, hip_offset_grp, spine_01_group, pelvis_follow_group])
+
+        ctx.node_index.record(hip_ctrl, "pelvis_hip_CTRL")
+        ctx.node_index.record(hip_offset_grp, "pelvis_hip_offset_GRP")
+        ctx.node_index.record(spine_01_group, "spine_01_hipFollow_GRP")
+        ctx.node_index.record(pelvis_follow_group, "pelvis_hipFollow_GRP")
 
-        schema = UE5_SCHEMA.get("hand", {})
+    @staticmethod
+    def build_hand_controls(ctx):
 
-        deform_joints = RIG_CTX.joint_registry.get("deform", {})
+        deform_joints = ctx.joint_registry.get("deform", {})
 
-        ControlBuilder.build_fk_chain_controls("hand", "small")
+        ControlBuilder.build_fk_chain_controls(ctx, "hand", "small")
 
-        fk_groups = RIG_CTX.group_registry.get("fk_ctrl", {})
+        fk_groups = ctx.group_registry.get("fk_ctrl", {})
 
-        for side, side_dict in schema.items():
+        hand_ctrls = []
+        for side, _ in SCHEMA.by_side("hand"):
             joint_name = f"hand_{side}"
             deform_joint = deform_joints.get(joint_name)
             hand_ctrl = CtrlFactory.create_ctrl_half_circle(
-                name=f"{joint_name}_ctrl", size="medium", color_index=17)
-            cmds.matchTransform(hand_ctrl, deform_joint)
+                ctx, name=f"{joint_name}_ctrl", size="medium", color_index=17,
+                instance=True)
+            RigHelpers.match_transform(ctx, hand_ctrl, deform_joint)
             rot_y = 90 if side == "l" else -90
             cmds.rotate(0, rot_y, 0, hand_ctrl,
                         relative=True, objectSpace=True)
@@ -464,125 +493,125 @@ class ControlBuilder:
 
             group = fk_groups.get(f"hand_{side}")
             cmds.parent(hand_ctrl, group)
-            hand_ctrl = cmds.ls(hand_ctrl, long=True)[0]
-            RigHelpers.bake_transform_to_opm(hand_ctrl)
-            RIG_CTX.control_registry.setdefault(
+            hand_ctrls.append(hand_ctrl)
+            ctx.control_registry.setdefault(
                 "hand", {})[joint_name] = hand_ctrl
 
+        RigHelpers.bake_transforms_to_opm(hand_ctrls)
+
     @staticmethod
-    def build_head_controls():
+    def build_head_controls(ctx):
 
-        ControlBuilder.build_fk_chain_controls("head", "medium")
+        ControlBuilder.build_fk_chain_controls(ctx, "head", "medium")
 
     @staticmethod
-    def build_fk_chain_controls(category, size):
+    def build_fk_chain_controls(ctx, category, size):
 
         # print(f"##########################{category}##########################")
 
-        schema = UE5_SCHEMA.get(category, {})
-
-        deform_map = RIG_CTX.joint_registry.get("deform", {})
+        deform_map = ctx.joint_registry.get("deform", {})
 
         fk_system = RigHelpers.get_or_create_group_chain(
-            "Group", "controls", "FKSystem")
+            ctx, "Group", "controls", "FKSystem")
 
-        for side, side_dict in schema.items():
+        bake_nodes = []
+        for side, chains in SCHEMA.by_side(category):
 
             schema_grp = cmds.group(
                 empty=True, name=f"{category}_{side}_ctrl_GRP", parent=fk_system)
             schema_base_joint = deform_map.get(f"{category}_{side}")
-            schema_grp = cmds.ls(schema_grp, long=True)[0]
             if schema_base_joint:
-                cmds.matchTransform(schema_grp, schema_base_joint)
-                RigHelpers.bake_transform_to_opm(schema_grp)
-            RIG_CTX.group_registry.setdefault(
+                RigHelpers.match_transform(ctx, schema_grp, schema_base_joint)
+                bake_nodes.append(schema_grp)
+            ctx.group_registry.setdefault(
                 "fk_ctrl", {})[f"{category}_{side}"] = schema_grp
 
-            for limb_name, chain in side_dict.items():
+            for chain in chains:
 
                 chain_grp = cmds.group(
-                    empty=True, name=f"fk_{limb_name}_{side}_ctrl_GRP", parent=schema_grp)
-                chain_grp = cmds.ls(chain_grp, long=True)[0]
-                chain_base_joint = deform_map.get(chain[0])
-                cmds.matchTransform(chain_grp, chain_base_joint)
-                RigHelpers.bake_transform_to_opm(chain_grp)
-                RIG_CTX.group_registry.setdefault(
-                    "fk_ctrl", {})[f"{limb_name}_{side}"] = chain_grp
+                    empty=True, name=f"fk_{chain.key}_ctrl_GRP", parent=schema_grp)
+                chain_base_joint = deform_map.get(chain.joints[0])
+                RigHelpers.match_transform(ctx, chain_grp, chain_base_joint)
+                bake_nodes.append(chain_grp)
+                ctx.group_registry.setdefault(
+                    "fk_ctrl", {})[chain.key] = chain_grp
 
                 previous_ctrl = None
 
-                for joint_name in chain:
+                for joint_name in chain.joints:
                     joint = deform_map.get(joint_name)
-                    if joint_name.startswith("clavicle"):
+                    if joint_name == chain.clavicle:
                         ctrl = CtrlFactory.create_ctrl_half_circle_ribbon(
                             name=f"{joint_name}_fk_CTRL", size=size, normal=(1, 0, 0))
                     else:
                         ctrl = CtrlFactory.create_ctrl_fk(
-                            name=f"{joint_name}_fk_CTRL", size=size, normal=(1, 0, 0))
+                            ctx, name=f"{joint_name}_fk_CTRL", size=size,
+                            normal=(1, 0, 0), instance=True)
 
                     if previous_ctrl:
                         cmds.parent(ctrl, previous_ctrl)
                     else:
                         cmds.parent(ctrl, chain_grp)
 
-                    cmds.matchTransform(ctrl, joint)
-                    if joint_name.startswith("clavicle") and joint_name.endswith("_l"):
+                    RigHelpers.match_transform(ctx, ctrl, joint)
+                    if joint_name == chain.clavicle and side == "l":
                         cmds.rotate(-180, 0, 0, ctrl,
                                     objectSpace=True, relative=True)
                         cmds.makeIdentity(
                             ctrl, apply=True, translate=True, rotate=True, scale=True)
                     cmds.setAttr(f"{ctrl}.visibility", keyable=False)
-                    RigHelpers.bake_transform_to_opm(ctrl)
-                    ctrl = cmds.ls(ctrl, long=True)[0]
-                    RIG_CTX.control_registry.setdefault(
+                    bake_nodes.append(ctrl)
+                    ctx.control_registry.setdefault(
                         "fk", {})[joint_name] = ctrl
 
                     previous_ctrl = ctrl
 
-    @staticmethod
-    def build_ikfk_controls(category):
+        RigHelpers.bake_transforms_to_opm(bake_nodes)
 
-        schema = UE5_SCHEMA.get(category, {})
+    @staticmethod
+    def build_ikfk_controls(ctx, category):
 
-        deform_map = RIG_CTX.joint_registry.get("deform", {})
+        deform_map = ctx.joint_registry.get("deform", {})
 
         ikfk_system = RigHelpers.get_or_create_group_chain(
-            "Group", "controls", "IKFKSystem")
+            ctx, "Group", "controls", "IKFKSystem")
 
-        for side, side_dict in schema.items():
-            for limb_name, chain in side_dict.items():
+        ctrls = []
+        for chain in SCHEMA.chains(category):
 
-                joint = deform_map[
-                    chain[3] if category == "spine"else f"{limb_name}_{side}"]
+            joint = deform_map[chain.ikfk]
 
-                ctrl = CtrlFactory.create_ctrl_ikfk_switch(
-                    name=f"{limb_name}_{side}_ikfk_CTRL")
-                cmds.parent(ctrl, ikfk_system)
-                ctrl = cmds.ls(ctrl, long=True)[0]
+            ctrl = CtrlFactory.create_ctrl_ikfk_switch(
+                ctx, name=f"{chain.key}_ikfk_CTRL", instance=True)
+            cmds.parent(ctrl, ikfk_system)
 
-                cmds.matchTransform(ctrl, joint)
-                cmds.setAttr(f"{ctrl}.rotate", 0, 0, 0)
-                offset_x = 25.0 if category == "spine" else (
-                    15.0 if side == "l"else -15.0)
-                cmds.move(offset_x, 0, 0, ctrl,
-                          relative=True, objectSpace=True)
-                RigHelpers.bake_transform_to_opm(ctrl)
-                RIG_CTX.control_registry.setdefault(
-                    "ikfk", {})[f"{limb_name}_{side}"] = ctrl
+            RigHelpers.match_transform(ctx, ctrl, joint)
+            cmds.setAttr(f"{ctrl}.rotate", 0, 0, 0)
+            offset_x = 25.0 if category == "spine" else (
+                15.0 if chain.side == "l"else -15.0)
+            cmds.move(offset_x, 0, 0, ctrl,
+                      relative=True, objectSpace=True)
+            ctx.control_registry.setdefault(
+                "ikfk", {})[chain.key] = ctrl
+            ctrls.append((chain.name, ctrl))
+
+        RigHelpers.bake_transforms_to_opm([ctrl for _, ctrl in ctrls])
+
+        for limb_name, ctrl in ctrls:
 
-                for attr in ("t", "r", "s"):
-                    for axis in "xyz":
-                        cmds.setAttr(f"{ctrl}.{attr}{axis}", lock=True,
-                                     keyable=False, channelBox=False)
-                cmds.setAttr(f"{ctrl}.visibility", lock=True,
-                             keyable=False, channelBox=False)
+            for attr in ("t", "r", "s"):
+                for axis in "xyz":
+                    cmds.setAttr(f"{ctrl}.{attr}{axis}", lock=True,
+                                 keyable=False, channelBox=False)
+            cmds.setAttr(f"{ctrl}.visibility", lock=True,
+                         keyable=False, channelBox=False)
 
-                default_value = 0 if limb_name == "thigh" else 10
-                cmds.addAttr(ctrl, longName="IKFKBlend", attributeType="double",
-                             minValue=0, maxValue=10, defaultValue=default_value,
-                             keyable=True)
+            default_value = 0 if limb_name == "thigh" else 10
+            cmds.addAttr(ctrl, longName="IKFKBlend", attributeType="double",
+                         minValue=0, maxValue=10, defaultValue=default_value,
+                         keyable=True)
 
 
 RigHelpers = rig_builders_runtime.RigHelpers
-RIG_CTX = rig_builders_runtime.RIG_CTX
-UE5_SCHEMA = rig_builders_runtime.UE5_SCHEMA
+DG_BATCH = rig_builders_runtime.DG_BATCH
+SCHEMA = rig_builders_runtime.SCHEMA
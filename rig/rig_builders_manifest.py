@@ -0,0 +1,152 @@
+
+
+import json
+import hashlib
+
+import maya.cmds as cmds
+
+from rig import rig_builders_registry
+
+
+MANIFEST_NODE = "autoRig_manifest"
+MANIFEST_ATTR = "manifest"
+MANIFEST_VERSION = 1
+
+
+class RigManifest:
+
+    @staticmethod
+    def node_name(namespace=""):
+
+        # One manifest per character, kept inside that character's namespace.
+        return f"{namespace}:{MANIFEST_NODE}" if namespace else MANIFEST_NODE
+
+    @staticmethod
+    def namespaces():
+
+        nodes = cmds.ls(MANIFEST_NODE, f"*:{MANIFEST_NODE}", type="network") or []
+        return sorted({ContextRegistry.namespace_of(node) for node in nodes})
+
+    @staticmethod
+    def collect_uuids(handles, uuids=None):
+
+        if uuids is None:
+            uuids = set()
+
+        if isinstance(handles, dict):
+            for value in handles.values():
+                RigManifest.collect_uuids(value, uuids)
+        elif isinstance(handles, (list, tuple)):
+            for value in handles:
+                RigManifest.collect_uuids(value, uuids)
+        elif handles:
+            uuids.add(handles)
+
+        return uuids
+
+    @staticmethod
+    def checksum(paths):
+
+        digest = hashlib.sha1()
+        for path in sorted(paths):
+            digest.update(path.encode("utf-8"))
+            digest.update(b"\n")
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def build(rig_ctx, anim_ctx):
+
+        sections = {
+            "rig": rig_ctx.to_manifest(),
+            "anim": anim_ctx.to_manifest(),
+        }
+
+        uuids = set()
+        for section in sections.values():
+            RigManifest.collect_uuids(section["handles"], uuids)
+
+        paths = {}
+        for uuid in uuids:
+            path = PATH_CACHE.resolve(uuid)
+            if path:
+                paths[uuid] = path
+
+        return {
+            "version": MANIFEST_VERSION,
+            "checksum": RigManifest.checksum(paths.values()),
+            "paths": paths,
+            "sections": sections,
+        }
+
+    @staticmethod
+    def write(rig_ctx, anim_ctx):
+
+        manifest = RigManifest.build(rig_ctx, anim_ctx)
+
+        node = RigManifest.node_name(rig_ctx.namespace)
+        if not cmds.objExists(node):
+            node = cmds.createNode("network", name=node)
+            cmds.addAttr(node, longName=MANIFEST_ATTR, dataType="string")
+
+        cmds.setAttr(f"{node}.{MANIFEST_ATTR}",
+                     json.dumps(manifest, separators=(",", ":")),
+                     type="string")
+
+        return node
+
+    @staticmethod
+    def write_all(rig_contexts, anim_contexts):
+
+        return [RigManifest.write(rig_ctx, anim_contexts.get(rig_ctx.namespace))
+                for rig_ctx in rig_contexts]
+
+    @staticmethod
+    def read(namespace=""):
+
+        node = RigManifest.node_name(namespace)
+        if not cmds.objExists(f"{node}.{MANIFEST_ATTR}"):
+            return None
+
+        raw = cmds.getAttr(f"{node}.{MANIFEST_ATTR}")
+        if not raw:
+            return None
+
+        try:
+            manifest = json.loads(raw)
+        except ValueError:
+            return None
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+
+        return manifest
+
+    @staticmethod
+    def is_current(manifest):
+
+        uuids = list(manifest["paths"])
+        found = cmds.ls(uuids, long=True) if uuids else []
+        if len(found) != len(uuids):
+            return False
+
+        return RigManifest.checksum(found) == manifest["checksum"]
+
+    @staticmethod
+    def restore(rig_ctx, anim_ctx):
+
+        manifest = RigManifest.read(rig_ctx.namespace)
+        if manifest is None or not RigManifest.is_current(manifest):
+            return False
+
+        PATH_CACHE.seed(manifest["paths"])
+
+        sections = manifest["sections"]
+        rig_ctx.load_manifest(sections["rig"])
+        anim_ctx.load_manifest(sections["anim"])
+
+        return True
+
+
+PATH_CACHE = rig_builders_registry.PATH_CACHE
+ContextRegistry = rig_builders_registry.ContextRegistry
@@ -0,0 +1,185 @@
+
+
+import numpy as np
+
+
+ROTATE_ORDERS = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+
+_AXIS_INDEX = {"x": 0, "y": 1, "z": 2}
+
+_EPSILON = 1.0e-9
+
+
+def _rotate_order_list(rotate_order, count):
+
+    if isinstance(rotate_order, (int, np.integer, str)):
+        rotate_order = [rotate_order] * count
+
+    orders = []
+    for order in rotate_order:
+        if isinstance(order, str):
+            order = ROTATE_ORDERS.index(order)
+        orders.append(int(order))
+
+    return np.asarray(orders, dtype=int)
+
+
+def _axis_matrices(axis, angles):
+
+    c = np.cos(angles)
+    s = np.sin(angles)
+    one = np.ones_like(angles)
+    zero = np.zeros_like(angles)
+
+    if axis == 0:
+        rows = ((one, zero, zero), (zero, c, s), (zero, -s, c))
+    elif axis == 1:
+        rows = ((c, zero, -s), (zero, one, zero), (s, zero, c))
+    else:
+        rows = ((c, s, zero), (-s, c, zero), (zero, zero, one))
+
+    return np.stack([np.stack(row, axis=-1) for row in rows], axis=-2)
+
+
+def _divide(values, lengths):
+
+    return np.divide(values, lengths, out=np.zeros_like(values),
+                     where=np.abs(lengths) > _EPSILON)
+
+
+def _complete_basis(rows, valid):
+
+    # Zero scale leaves no direction on an axis; fill it in with a
+    # right-handed axis so the decomposition stays finite.
+    rows = rows.copy()
+    valid = list(valid)
+    for k in range(3):
+        if valid[k]:
+            continue
+        if valid[(k + 1) % 3] and valid[(k + 2) % 3]:
+            rows[k] = np.cross(rows[(k + 1) % 3], rows[(k + 2) % 3])
+        else:
+            others = [rows[i] for i in range(3) if valid[i]]
+            candidates = np.eye(3) - sum(np.outer(o, o) for o in others)
+            best = candidates[np.argmax(np.linalg.norm(candidates, axis=1))]
+            rows[k] = best / np.linalg.norm(best)
+        valid[k] = True
+
+    return rows
+
+
+def euler_to_matrices(rotations, rotate_order=0):
+
+    rotations = np.radians(np.asarray(rotations, dtype=float).reshape(-1, 3))
+    orders = _rotate_order_list(rotate_order, len(rotations))
+
+    result = np.empty((len(rotations), 3, 3))
+    for order in np.unique(orders):
+        mask = orders == order
+        i, j, k = (_AXIS_INDEX[a] for a in ROTATE_ORDERS[order])
+        angles = rotations[mask]
+
+        result[mask] = (_axis_matrices(i, angles[:, i])
+                        @ _axis_matrices(j, angles[:, j])
+                        @ _axis_matrices(k, angles[:, k]))
+
+    return result
+
+
+def matrices_to_euler(rotation_matrices, rotate_order=0):
+
+    rotation_matrices = np.asarray(
+        rotation_matrices, dtype=float).reshape(-1, 3, 3)
+    orders = _rotate_order_list(rotate_order, len(rotation_matrices))
+
+    result = np.empty((len(rotation_matrices), 3))
+    for order in np.unique(orders):
+        mask = orders == order
+        name = ROTATE_ORDERS[order]
+        i, j, k = (_AXIS_INDEX[a] for a in name)
+        sign = 1.0 if name in ROTATE_ORDERS[:3] else -1.0
+
+        # Row-vector matrices, so element [q, p] is the column-convention [p, q].
+        m = rotation_matrices[mask]
+        cos_b = np.hypot(m[:, i, i], m[:, i, j])
+        locked = cos_b < _EPSILON
+
+        a = np.arctan2(sign * m[:, j, k], m[:, k, k])
+        b = np.arctan2(-sign * m[:, i, k], cos_b)
+        c = np.arctan2(sign * m[:, i, j], m[:, i, i])
+
+        a = np.where(locked, np.arctan2(-sign * m[:, k, j], m[:, j, j]), a)
+        c = np.where(locked, 0.0, c)
+
+        angles = np.empty((len(m), 3))
+        angles[:, i] = a
+        angles[:, j] = b
+        angles[:, k] = c
+        result[mask] = angles
+
+    return np.degrees(result)
+
+
+def compose_matrices(translate=None, rotate=None, scale=None, shear=None,
+                     rotate_order=0):
+
+    inputs = [v for v in (translate, rotate, scale, shear) if v is not None]
+    count = len(np.asarray(inputs[0], dtype=float).reshape(-1, 3)) if inputs else 1
+
+    def _channel(values, default):
+        if values is None:
+            return np.tile(default, (count, 1))
+        return np.asarray(values, dtype=float).reshape(-1, 3)
+
+    translate = _channel(translate, (0.0, 0.0, 0.0))
+    rotate = _channel(rotate, (0.0, 0.0, 0.0))
+    scale = _channel(scale, (1.0, 1.0, 1.0))
+    shear = _channel(shear, (0.0, 0.0, 0.0))
+
+    shear_m = np.tile(np.eye(3), (count, 1, 1))
+    shear_m[:, 1, 0] = shear[:, 0]
+    shear_m[:, 2, 0] = shear[:, 1]
+    shear_m[:, 2, 1] = shear[:, 2]
+
+    matrices = np.tile(np.eye(4), (count, 1, 1))
+    matrices[:, :3, :3] = (scale[:, :, None] * shear_m) @ euler_to_matrices(
+        rotate, rotate_order)
+    matrices[:, 3, :3] = translate
+
+    return matrices
+
+
+def decompose_matrices(matrices, rotate_order=0):
+
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+
+    translate = matrices[:, 3, :3].copy()
+    row0, row1, row2 = (matrices[:, n, :3] for n in range(3))
+
+    sx = np.linalg.norm(row0, axis=1)
+    r0 = _divide(row0, sx[:, None])
+
+    sy_xy = np.einsum("ij,ij->i", row1, r0)
+    v1 = row1 - sy_xy[:, None] * r0
+    sy = np.linalg.norm(v1, axis=1)
+    r1 = _divide(v1, sy[:, None])
+
+    sz_xz = np.einsum("ij,ij->i", row2, r0)
+    sz_yz = np.einsum("ij,ij->i", row2, r1)
+    v2 = row2 - sz_xz[:, None] * r0 - sz_yz[:, None] * r1
+    sz = np.linalg.norm(v2, axis=1)
+    r2 = _divide(v2, sz[:, None])
+
+    valid = np.stack([sx, sy, sz], axis=1) > _EPSILON
+    for n in np.flatnonzero(~valid.all(axis=1)):
+        r0[n], r1[n], r2[n] = _complete_basis(np.stack([r0[n], r1[n], r2[n]]), valid[n])
+
+    flipped = np.einsum("ij,ij->i", np.cross(r0, r1), r2) < 0.0
+    sz = np.where(flipped, -sz, sz)
+    r2 = np.where(flipped[:, None], -r2, r2)
+
+    scale = np.stack([sx, sy, sz], axis=1)
+    shear = np.stack([_divide(sy_xy, sy), _divide(sz_xz, sz), _divide(sz_yz, sz)], axis=1)
+    rotate = matrices_to_euler(np.stack([r0, r1, r2], axis=1), rotate_order)
+
+    return translate, rotate, scale, shear
@@ -0,0 +1,183 @@
+
+
+import numpy as np
+
+import maya.api.OpenMaya as om
+
+
+SAMPLES_PER_SPAN = 8
+
+NEWTON_ITERATIONS = 8
+
+_EPSILON = 1.0e-12
+
+
+def _basis_functions(knots, degree, spans, params):
+
+    count = len(params)
+    basis = np.zeros((count, degree + 1))
+    basis[:, 0] = 1.0
+    left = np.zeros((count, degree + 1))
+    right = np.zeros((count, degree + 1))
+
+    for j in range(1, degree + 1):
+        left[:, j] = params - knots[spans + 1 - j]
+        right[:, j] = knots[spans + j] - params
+        saved = np.zeros(count)
+        for r in range(j):
+            denom = right[:, r + 1] + left[:, j - r]
+            temp = np.divide(basis[:, r], denom,
+                             out=np.zeros(count), where=np.abs(denom) > _EPSILON)
+            basis[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        basis[:, j] = saved
+
+    return basis
+
+
+class BSplineCurve:
+
+    __slots__ = ("cvs", "knots", "degree", "_derivative")
+
+    def __init__(self, cvs, knots, degree):
+
+        # Maya stores len(cvs) + degree - 1 knots; pad to the full clamped vector.
+        self.cvs = np.asarray(cvs, dtype=float).reshape(-1, 3)
+        knots = np.asarray(knots, dtype=float)
+        self.knots = np.concatenate([knots[:1], knots, knots[-1:]])
+        self.degree = int(degree)
+        self._derivative = None
+
+        if len(self.knots) != len(self.cvs) + self.degree + 1:
+            raise RuntimeError(
+                f"Curve with {len(self.cvs)} CVs and degree {self.degree} "
+                f"needs {len(self.cvs) + self.degree - 1} knots, got {len(knots)}")
+
+    def __repr__(self):
+
+        return f"BSplineCurve({len(self.cvs)} cvs, degree {self.degree})"
+
+    def domain(self):
+
+        return (self.knots[self.degree], self.knots[len(self.cvs)])
+
+    def spans(self, params):
+
+        index = np.searchsorted(self.knots, params, side="right") - 1
+        return np.clip(index, self.degree, len(self.cvs) - 1)
+
+    def points(self, params):
+
+        params = np.clip(np.asarray(params, dtype=float).reshape(-1), *self.domain())
+        spans = self.spans(params)
+        basis = _basis_functions(self.knots, self.degree, spans, params)
+
+        indices = spans[:, None] - self.degree + np.arange(self.degree + 1)
+        return np.einsum("ij,ijk->ik", basis, self.cvs[indices])
+
+    def basis(self, params):
+
+        params = np.clip(np.asarray(params, dtype=float).reshape(-1), *self.domain())
+        spans = self.spans(params)
+        local = _basis_functions(self.knots, self.degree, spans, params)
+
+        weights = np.zeros((len(params), len(self.cvs)))
+        indices = spans[:, None] - self.degree + np.arange(self.degree + 1)
+        np.put_along_axis(weights, indices, local, axis=1)
+        return weights
+
+    def derivative(self):
+
+        if self._derivative is None:
+            degree = self.degree
+            if degree == 0:
+                raise RuntimeError("A degree 0 curve has no derivative curve")
+
+            lengths = (self.knots[degree + 1:degree + len(self.cvs)]
+                       - self.knots[1:len(self.cvs)])
+            scale = np.divide(degree, lengths, out=np.zeros(len(lengths)),
+                              where=lengths > _EPSILON)
+            cvs = (self.cvs[1:] - self.cvs[:-1]) * scale[:, None]
+            derivative = BSplineCurve(cvs, self.knots[2:-2], degree - 1)
+            derivative.knots = self.knots[1:-1]
+            self._derivative = derivative
+
+        return self._derivative
+
+    def tangents(self, params):
+
+        if self.degree == 0:
+            return np.zeros((len(np.atleast_1d(params)), 3))
+        return self.derivative().points(params)
+
+    def point_and_tangent(self, params):
+
+        return self.points(params), self.tangents(params)
+
+    def normalized_params(self, fractions):
+
+        start, end = self.domain()
+        return start + np.asarray(fractions, dtype=float) * (end - start)
+
+    def sample_params(self, samples_per_span=SAMPLES_PER_SPAN):
+
+        breaks = np.unique(self.knots[self.degree:len(self.cvs) + 1])
+        if len(breaks) < 2:
+            return breaks
+
+        steps = np.linspace(0.0, 1.0, samples_per_span, endpoint=False)
+        params = breaks[:-1, None] + np.diff(breaks)[:, None] * steps
+        return np.append(params.reshape(-1), breaks[-1])
+
+    def closest_params(self, positions, samples_per_span=SAMPLES_PER_SPAN,
+                       iterations=NEWTON_ITERATIONS):
+
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        start, end = self.domain()
+
+        grid = self.sample_params(samples_per_span)
+        grid_points = self.points(grid)
+        distances = np.einsum(
+            "ijk,ijk->ij", positions[:, None] - grid_points[None],
+            positions[:, None] - grid_points[None])
+        params = grid[np.argmin(distances, axis=1)]
+        best = np.min(distances, axis=1)
+
+        first = self.derivative() if self.degree > 0 else None
+        second = first.derivative() if first is not None and first.degree > 0 else None
+
+        # Overshooting steps are halved rather than dropped, so a seed on a
+        # coarse grid still walks into the nearest minimum.
+        scale = np.ones(len(positions))
+        for _ in range(iterations if first is not None else 0):
+            offset = self.points(params) - positions
+            d1 = first.points(params)
+            d2 = second.points(params) if second is not None else np.zeros_like(d1)
+
+            f = np.einsum("ij,ij->i", offset, d1)
+            df = np.einsum("ij,ij->i", d1, d1) + np.einsum("ij,ij->i", offset, d2)
+            step = np.divide(f, df, out=np.zeros(len(f)), where=np.abs(df) > _EPSILON)
+
+            candidates = np.clip(params - scale * step, start, end)
+            moved = self.points(candidates) - positions
+            candidate_distances = np.einsum("ij,ij->i", moved, moved)
+
+            better = candidate_distances < best
+            params = np.where(better, candidates, params)
+            best = np.where(better, candidate_distances, best)
+            scale = np.where(better, 1.0, scale * 0.5)
+
+        return params
+
+    @staticmethod
+    def from_node(curve):
+
+        sel = om.MSelectionList()
+        sel.add(curve)
+        dag = sel.getDagPath(0)
+        dag.extendToShape()
+
+        fn = om.MFnNurbsCurve(dag)
+        cvs = [(p.x, p.y, p.z) for p in fn.cvPositions(om.MSpace.kWorld)]
+
+        return BSplineCurve(cvs, list(fn.knots()), fn.degree)
@@ -0,0 +1,496 @@
+
+
+import time
+import random
+
+from rig import rig_builders_registry
+from rig import rig_builders_profiler
+from rig import rig_builders_runtime
+from rig import rig_builders_ctrl
+from rig import rig_builders_body
+from rig import rig_builders_hand_foot
+from rig import rig_builders_deformation
+from rig import rig_builders_space
+
+
+class BuildStep:
+
+    def __init__(self, name, func, inputs=(), outputs=()):
+
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+
+class StepRecord:
+
+    def __init__(self, name):
+
+        self.name = name
+        self.wall_time = 0.0
+        self.nodes_created = 0
+        self.nodes = []
+
+    def on_node_added(self, node):
+
+        self.nodes_created += 1
+        self.nodes.append(PathCache.uuid_of(node))
+
+
+class BuildReport:
+
+    def __init__(self):
+
+        self.records = []
+        self.wall_time = 0.0
+
+    @property
+    def nodes_created(self):
+
+        return sum(record.nodes_created for record in self.records)
+
+    def build_tags(self):
+
+        return {record.name: list(record.nodes)
+                for record in self.records if record.nodes}
+
+    def as_dict(self):
+
+        return {
+            "wall_time": self.wall_time,
+            "nodes_created": self.nodes_created,
+            "steps": [
+                {"name": r.name, "wall_time": r.wall_time,
+                 "nodes_created": r.nodes_created}
+                for r in self.records],
+        }
+
+    def format(self, limit=None):
+
+        total = self.wall_time or 1.0
+        records = sorted(self.records, key=lambda r: r.wall_time, reverse=True)
+        if limit:
+            records = records[:limit]
+
+        lines = [f"{'step':<55}{'time':>10}{'share':>8}{'nodes':>8}"]
+        for record in records:
+            lines.append(
+                f"{record.name:<55}{record.wall_time * 1000.0:>8.1f}ms"
+                f"{record.wall_time / total * 100.0:>7.1f}%"
+                f"{record.nodes_created:>8}")
+        lines.append(
+            f"{'total':<55}{self.wall_time * 1000.0:>8.1f}ms"
+            f"{'':>8}{self.nodes_created:>8}")
+
+        return "\n".join(lines)
+
+
+class BuildGraph:
+
+    def __init__(self, steps, provided=()):
+
+        self.steps = list(steps)
+        self.provided = set(provided)
+
+    def producers(self):
+
+        producers = {}
+        for step in self.steps:
+            for resource in step.outputs:
+                if resource in producers:
+                    raise RuntimeError(
+                        f"Resource '{resource}' is produced by both "
+                        f"{producers[resource].name} and {step.name}")
+                producers[resource] = step
+
+        return producers
+
+    def order(self):
+
+        producers = self.producers()
+
+        depends = {}
+        for step in self.steps:
+            depends[step.name] = set()
+            for resource in step.inputs:
+                if resource in self.provided:
+                    continue
+                if resource not in producers:
+                    raise RuntimeError(
+                        f"{step.name} needs '{resource}' but no step produces it")
+                depends[step.name].add(producers[resource].name)
+
+        ordered = []
+        done = set()
+        pending = list(self.steps)
+        while pending:
+            for step in pending:
+                if depends[step.name] <= done:
+                    break
+            else:
+                names = ", ".join(step.name for step in pending)
+                raise RuntimeError(f"Build steps form a cycle: {names}")
+
+            pending.remove(step)
+            ordered.append(step)
+            done.add(step.name)
+
+        return ordered
+
+    def run(self, ctx, seed=None):
+
+        # A seed runs the ready steps in shuffled order. Validation builds use
+        # it so a step that leaves a real dependency out of its inputs fails
+        # instead of passing on the hand-written order.
+        shuffle = random.Random(seed) if seed is not None else None
+
+        pending = self.order()
+        available = set(self.provided)
+
+        report = BuildReport()
+        build_start = time.perf_counter()
+
+        # Step records collect the nodes each step creates from the watcher.
+        SCENE_WATCHER.acquire(self)
+        try:
+            while pending:
+                ready = [step for step in pending
+                         if all(resource in available for resource in step.inputs)]
+                step = shuffle.choice(ready) if shuffle else ready[0]
+                pending.remove(step)
+
+                record = StepRecord(step.name)
+                report.records.append(record)
+
+                SCENE_WATCHER.add_listener(record)
+                start = time.perf_counter()
+                try:
+                    with DG_BATCH.transaction(step.name):
+                        step.func(ctx)
+                finally:
+                    record.wall_time = time.perf_counter() - start
+                    SCENE_WATCHER.remove_listener(record)
+
+                available.update(step.outputs)
+        finally:
+            SCENE_WATCHER.release(self)
+
+        report.wall_time = time.perf_counter() - build_start
+
+        return report
+
+
+class RigBuilder:
+
+    last_report = None
+
+    @staticmethod
+    def build_steps(root, spine_mode=None):
+
+        steps = [
+
+            BuildStep("SkeletonRig.register_deform_skeleton",
+                      lambda ctx: SkeletonRig.register_deform_skeleton(ctx, root),
+                      outputs=("deform_joints",)),
+
+            BuildStep("ControlBuilder.build_root_fK_controls",
+                      ControlBuilder.build_root_fK_controls,
+                      inputs=("deform_joints",),
+                      outputs=("root_ctrl",)),
+
+            # limb
+
+            BuildStep("SkeletonRig.build_limb_ikfk_skeletons",
+                      SkeletonRig.build_limb_ikfk_skeletons,
+                      inputs=("deform_joints",),
+                      outputs=("limb_fk_joints", "limb_ik_joints")),
+
+            BuildStep("ControlBuilder.build_limb_fK_controls",
+                      ControlBuilder.build_limb_fK_controls,
+                      inputs=("deform_joints",),
+                      outputs=("limb_fk_ctrls", "fk_ctrl_shapes")),
+
+            BuildStep("ControlBuilder.build_limb_iK_controls",
+                      ControlBuilder.build_limb_iK_controls,
+                      inputs=("deform_joints",),
+                      outputs=("limb_ik_ctrls",)),
+
+            BuildStep("ControlBuilder.build_limb_ikfk_controls",
+                      ControlBuilder.build_limb_ikfk_controls,
+                      inputs=("deform_joints",),
+                      outputs=("limb_ikfk_ctrls", "ikfk_ctrl_shapes")),
+
+            BuildStep("LimbRig.build_limb_ikfk_deform_drivers",
+                      LimbRig.build_limb_ikfk_deform_drivers,
+                      inputs=("limb_fk_joints", "limb_ik_joints",
+                              "limb_fk_ctrls", "limb_ik_ctrls", "limb_ikfk_ctrls"),
+                      outputs=("limb_ikfk_blend",)),
+
+            BuildStep("LimbRig.build_limb_fk_ctrl_joint_drivers",
+                      LimbRig.build_limb_fk_ctrl_joint_drivers,
+                      inputs=("limb_fk_joints", "limb_fk_ctrls")),
+
+            BuildStep("LimbRig.build_limb_ik_ctrl_joint_drivers",
+                      LimbRig.build_limb_ik_ctrl_joint_drivers,
+                      inputs=("limb_ik_joints", "limb_ik_ctrls"),
+                      outputs=("limb_ik_handles",)),
+
+            BuildStep("LimbRig.build_clavicle_fk_ctrl_joint_drivers",
+                      LimbRig.build_clavicle_fk_ctrl_joint_drivers,
+                      inputs=("limb_fk_joints", "limb_ik_joints", "limb_fk_ctrls")),
+
+            # spine
+
+            BuildStep("SkeletonRig.build_spine_ikfk_skeletons",
+                      SkeletonRig.build_spine_ikfk_skeletons,
+                      inputs=("deform_joints",),
+                      outputs=("spine_fk_joints", "spine_ik_joints")),
+
+            BuildStep("ControlBuilder.build_spine_fK_controls",
+                      ControlBuilder.build_spine_fK_controls,
+                      inputs=("deform_joints", "fk_ctrl_shapes"),
+                      outputs=("spine_fk_ctrls",)),
+
+            BuildStep("ControlBuilder.build_spine_iK_controls",
+                      ControlBuilder.build_spine_iK_controls,
+                      inputs=("deform_joints",),
+                      outputs=("spine_ik_ctrls",)),
+
+            BuildStep("ControlBuilder.build_spine_ikfk_controls",
+                      ControlBuilder.build_spine_ikfk_controls,
+                      inputs=("deform_joints", "ikfk_ctrl_shapes"),
+                      outputs=("spine_ikfk_ctrls",)),
+
+            BuildStep("ControlBuilder.build_hip_controls",
+                      ControlBuilder.build_hip_controls,
+                      inputs=("deform_joints", "spine_fk_ctrls"),
+                      outputs=("hip_groups",)),
+
+            BuildStep("SpineRig.build_spine_ik_curve",
+                      SpineRig.build_spine_ik_curve,
+                      inputs=("spine_ik_joints",),
+                      outputs=("spine_curve",)),
+
+            BuildStep("SpineRig.build_spine_curve_driver_joints",
+                      SpineRig.build_spine_curve_driver_joints,
+                      inputs=("spine_curve", "spine_ik_joints"),
+                      outputs=("spine_driver_joints",)),
+
+            BuildStep("SpineRig.build_spine_ik_ctrl_follow_joints",
+                      SpineRig.build_spine_ik_ctrl_follow_joints,
+                      inputs=("spine_curve", "spine_ik_joints"),
+                      outputs=("spine_follow_joints",)),
+
+            BuildStep("SpineRig.build_spine_ikfk_deform_drivers",
+                      SpineRig.build_spine_ikfk_deform_drivers,
+                      inputs=("spine_fk_joints", "spine_ik_joints",
+                              "spine_fk_ctrls", "spine_ik_ctrls", "spine_ikfk_ctrls"),
+                      outputs=("spine_ikfk_blend",)),
+
+            BuildStep("SpineRig.build_spine_fk_ctrl_joint_drivers",
+                      SpineRig.build_spine_fk_ctrl_joint_drivers,
+                      inputs=("spine_fk_joints", "spine_fk_ctrls")),
+
+            BuildStep("SpineRig.build_spine_ik_ctrl_groups",
+                      SpineRig.build_spine_ik_ctrl_groups,
+                      inputs=("spine_follow_joints", "spine_ik_ctrls"),
+                      outputs=("spine_ik_ctrl_groups",)),
+
+            BuildStep("SpineRig.build_spine_ik_ctrl_curve_drivers",
+                      SpineRig.build_spine_ik_ctrl_curve_drivers,
+                      inputs=("spine_curve", "spine_ik_ctrl_groups")),
+
+            BuildStep("SpineRig.build_spine_ik_ctrl_curve_orient_drivers",
+                      SpineRig.build_spine_ik_ctrl_curve_orient_drivers,
+                      inputs=("spine_driver_joints", "spine_ik_ctrl_groups")),
+
+            BuildStep("SpineRig.build_spine_curve_ik_joint_drivers",
+                      SpineRig.build_spine_curve_ik_joint_drivers,
+                      inputs=("spine_driver_joints", "spine_ik_joints")),
+
+            BuildStep("MatrixSpineRig.build_spine_matrix_drivers",
+                      MatrixSpineRig.build_spine_matrix_drivers,
+                      inputs=("spine_curve", "spine_ik_joints", "spine_ik_ctrl_groups")),
+
+            BuildStep("SpineRig.build_spine_hip_ctrl_drivers",
+                      SpineRig.build_spine_hip_ctrl_drivers,
+                      inputs=("hip_groups", "spine_fk_joints", "spine_fk_ctrls")),
+
+            # hand
+
+            BuildStep("ControlBuilder.build_hand_controls",
+                      ControlBuilder.build_hand_controls,
+                      inputs=("deform_joints", "fk_ctrl_shapes"),
+                      outputs=("hand_ctrls", "finger_fk_ctrls")),
+
+            BuildStep("HandRig.build_hand_spread_attributes",
+                      HandRig.build_hand_spread_attributes,
+                      inputs=("hand_ctrls", "finger_fk_ctrls")),
+
+            BuildStep("HandRig.build_hand_curl_attributes",
+                      HandRig.build_hand_curl_attributes,
+                      inputs=("hand_ctrls", "finger_fk_ctrls")),
+
+            BuildStep("HandRig.build_finger_fk_deform_drivers",
+                      HandRig.build_finger_fk_deform_drivers,
+                      inputs=("finger_fk_ctrls",),
+                      outputs=("hand_constraint_groups",)),
+
+            # foot
+
+            BuildStep("FootRig.build_roll_bank_skeleton",
+                      FootRig.build_roll_bank_skeleton,
+                      inputs=("limb_ik_joints", "limb_ik_ctrls"),
+                      outputs=("foot_pivots",)),
+
+            BuildStep("FootRig.build_roll_bank_iK_driver",
+                      FootRig.build_roll_bank_iK_driver,
+                      inputs=("foot_pivots", "limb_ik_handles"),
+                      outputs=("foot_ik_handles",)),
+
+            BuildStep("FootRig.build_roll_driver",
+                      FootRig.build_roll_driver,
+                      inputs=("foot_pivots", "foot_ik_handles")),
+
+            BuildStep("FootRig.build_bank_driver",
+                      FootRig.build_bank_driver,
+                      inputs=("foot_pivots", "foot_ik_handles")),
+
+            # head
+
+            BuildStep("ControlBuilder.build_head_controls",
+                      ControlBuilder.build_head_controls,
+                      inputs=("deform_joints", "fk_ctrl_shapes"),
+                      outputs=("head_fk_ctrls",)),
+
+            BuildStep("HeadRig.build_head_fk_deform_drivers",
+                      HeadRig.build_head_fk_deform_drivers,
+                      inputs=("head_fk_ctrls",)),
+
+            # twist
+
+            # BuildStep("TwistRig.build_twist_driver",
+            #           TwistRig.build_twist_driver,
+            #           inputs=("deform_joints",),
+            #           outputs=("twist_drivers",)),
+
+            # BuildStep("TwistRig.build_twist_system",
+            #           TwistRig.build_twist_system,
+            #           inputs=("twist_drivers",)),
+
+            # space
+
+            BuildStep("SpaceSystem.build_clavicle_follow_spine_driver",
+                      SpaceSystem.build_clavicle_follow_spine_driver,
+                      inputs=("limb_fk_ctrls", "spine_fk_joints",
+                              "spine_ik_joints", "spine_ikfk_blend")),
+
+            BuildStep("SpaceSystem.build_thigh_follow_pelvis_drivers",
+                      SpaceSystem.build_thigh_follow_pelvis_drivers,
+                      inputs=("limb_fk_ctrls", "limb_ik_joints", "hip_groups",
+                              "spine_ik_joints", "spine_ikfk_blend")),
+
+            BuildStep("SpaceSystem.build_head_follow_spine_driver",
+                      SpaceSystem.build_head_follow_spine_driver,
+                      inputs=("head_fk_ctrls", "spine_fk_joints",
+                              "spine_ik_joints", "spine_ikfk_blend")),
+
+            BuildStep("SpaceSystem.build_spine_start_end_mid_ctrl_driver",
+                      SpaceSystem.build_spine_start_end_mid_ctrl_driver,
+                      inputs=("spine_ik_ctrl_groups",)),
+
+            BuildStep("SpaceSystem.build_ik_fk_hand_ctrl_drivers",
+                      SpaceSystem.build_ik_fk_hand_ctrl_drivers,
+                      inputs=("hand_ctrls", "limb_fk_joints", "limb_ik_joints",
+                              "limb_ikfk_ctrls", "limb_ikfk_blend",
+                              "hand_constraint_groups")),
+
+            BuildStep("SpaceSystem.build_root_ik_fk_ctrl_drivers",
+                      SpaceSystem.build_root_ik_fk_ctrl_drivers,
+                      inputs=("root_ctrl", "limb_fk_ctrls", "limb_ik_ctrls",
+                              "limb_ikfk_ctrls", "spine_fk_ctrls", "spine_ik_ctrls",
+                              "spine_ikfk_ctrls", "hand_ctrls", "head_fk_ctrls")),
+        ]
+
+        skipped = set()
+        for mode, names in SPINE_MODE_STEPS.items():
+            if mode != (spine_mode or SPINE_CURVE):
+                skipped.update(names)
+
+        return [step for step in steps if step.name not in skipped]
+
+    @staticmethod
+    def build_auto_rig(root, ctx=None, blend_mode=None, spine_mode=None, seed=None):
+
+        ctx = ctx or RIG_CTX
+        if blend_mode is not None:
+            if blend_mode not in BLEND_MODES:
+                raise RuntimeError(f"Unknown IK/FK blend mode: {blend_mode}")
+            ctx.blend_mode = blend_mode
+        if spine_mode is not None:
+            if spine_mode not in SPINE_MODES:
+                raise RuntimeError(f"Unknown spine mode: {spine_mode}")
+            ctx.spine_mode = spine_mode
+        ctx.clear()
+
+        with ctx.scope():
+            graph = BuildGraph(RigBuilder.build_steps(root, ctx.spine_mode))
+            RigBuilder.last_report = graph.run(ctx, seed)
+
+        ctx.build_tags = RigBuilder.last_report.build_tags()
+        ctx.mark_synced()
+
+        report = ctx.node_index.report()
+
+        print("\n" + "=" * 60)
+        print("AUTO RIG LITE UE5 BUILD SUCCESS")
+        print(f"namespace: {ctx.namespace or ':'}, "
+              f"skeleton profile: {ctx.skeleton_profile.name}, "
+              f"blend mode: {ctx.blend_mode}, spine mode: {ctx.spine_mode}")
+        print(RigBuilder.last_report.format())
+        print(f"node index: {report['entries']} entries, "
+              f"{report['saved_ls_calls']} cmds.ls calls saved")
+        batch = DG_BATCH.report()
+        print(f"dg batch: {batch['batched_ops']} ops in {batch['commits']} commits")
+        matrices = ctx.world_matrices.report()
+        print(f"world matrices: {matrices['joints']} joints, "
+              f"{matrices['hits']} matrix queries saved")
+        print("=" * 60 + "\n")
+
+        return RigBuilder.last_report
+
+
+SCENE_WATCHER = rig_builders_registry.SCENE_WATCHER
+PathCache = rig_builders_registry.PathCache
+RIG_CTX = rig_builders_runtime.RIG_CTX
+DG_BATCH = rig_builders_runtime.DG_BATCH
+BLEND_MODES = rig_builders_runtime.BLEND_MODES
+SPINE_CURVE = rig_builders_runtime.SPINE_CURVE
+SPINE_MATRIX = rig_builders_runtime.SPINE_MATRIX
+SPINE_MODES = rig_builders_runtime.SPINE_MODES
+
+ControlBuilder = rig_builders_ctrl.ControlBuilder
+
+SkeletonRig = rig_builders_body.SkeletonRig
+SpineRig = rig_builders_body.SpineRig
+MatrixSpineRig = rig_builders_body.MatrixSpineRig
+LimbRig = rig_builders_body.LimbRig
+HandRig = rig_builders_hand_foot.HandRig
+FootRig = rig_builders_hand_foot.FootRig
+HeadRig = rig_builders_hand_foot.HeadRig
+TwistRig = rig_builders_deformation.TwistRig
+
+SpaceSystem = rig_builders_space.SpaceSystem
+
+PROFILER = rig_builders_profiler.PROFILER
+PROFILER.add_targets(RigBuilder, ControlBuilder, SkeletonRig, LimbRig, SpineRig,
+                     MatrixSpineRig, HandRig, FootRig, HeadRig, TwistRig, SpaceSystem)
+
+SPINE_MODE_STEPS = {
+    SPINE_CURVE: ("SpineRig.build_spine_curve_driver_joints",
+                  "SpineRig.build_spine_ik_ctrl_curve_drivers",
+                  "SpineRig.build_spine_ik_ctrl_curve_orient_drivers",
+                  "SpineRig.build_spine_curve_ik_joint_drivers"),
+    SPINE_MATRIX: ("MatrixSpineRig.build_spine_matrix_drivers",),
+}
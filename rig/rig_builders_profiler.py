@@ -0,0 +1,425 @@
+
+
+import json
+import time
+import inspect
+import functools
+from contextlib import contextmanager
+
+import maya.cmds as cmds
+
+from rig import rig_builders_registry
+
+
+class StageRecord:
+
+    def __init__(self, name, depth):
+
+        self.name = name
+        self.depth = depth
+        self.calls = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.cmds_calls = 0
+        self.nodes_created = 0
+
+    def as_dict(self):
+
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "calls": self.calls,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "cmds_calls": self.cmds_calls,
+            "nodes_created": self.nodes_created,
+        }
+
+
+class StageProfiler:
+
+    METRICS = ("wall_time", "cpu_time", "cmds_calls", "nodes_created")
+
+    def __init__(self):
+
+        self.targets = []
+        self.enabled = False
+        self.records = {}
+        self.stack = []
+        self.cmds_calls = 0
+        self.nodes_created = 0
+        self.last_report = None
+
+        self._patched_stages = []
+        self._patched_cmds = {}
+
+    def add_targets(self, *classes):
+
+        for cls in classes:
+            if cls not in self.targets:
+                self.targets.append(cls)
+
+    def reset(self):
+
+        self.records = {}
+        self.stack = []
+        self.cmds_calls = 0
+        self.nodes_created = 0
+
+    def enable(self):
+
+        if self.enabled:
+            return
+
+        self.reset()
+        for cls in self.targets:
+            self._instrument_class(cls)
+        self._instrument_cmds()
+
+        SCENE_WATCHER.add_listener(self)
+        SCENE_WATCHER.acquire(self)
+
+        self.enabled = True
+
+    def disable(self):
+
+        if not self.enabled:
+            return
+
+        for cls, name, original in reversed(self._patched_stages):
+            setattr(cls, name, original)
+        for name, original in self._patched_cmds.items():
+            setattr(cmds, name, original)
+
+        self._patched_stages = []
+        self._patched_cmds = {}
+        SCENE_WATCHER.remove_listener(self)
+        SCENE_WATCHER.release(self)
+
+        self.enabled = False
+
+    @contextmanager
+    def session(self, label="session", path=None):
+
+        self.enable()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            wall_time = time.perf_counter() - start
+            self.disable()
+            self.last_report = self.report(label, wall_time)
+            if path:
+                StageProfiler.save(self.last_report, path)
+
+    def on_node_added(self, node):
+
+        self.nodes_created += 1
+
+    def _instrument_class(self, cls):
+
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+
+            if isinstance(member, staticmethod):
+                wrapped = staticmethod(
+                    self._wrap_stage(f"{cls.__name__}.{name}", member.__func__))
+            elif inspect.isfunction(member):
+                wrapped = self._wrap_stage(f"{cls.__name__}.{name}", member)
+            else:
+                continue
+
+            self._patched_stages.append((cls, name, member))
+            setattr(cls, name, wrapped)
+
+    def _wrap_stage(self, stage, func):
+
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+
+            record = profiler.records.get(stage)
+            if record is None:
+                record = StageRecord(stage, len(profiler.stack))
+                profiler.records[stage] = record
+
+            profiler.stack.append(stage)
+            cmds_start = profiler.cmds_calls
+            nodes_start = profiler.nodes_created
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record.calls += 1
+                record.wall_time += time.perf_counter() - wall_start
+                record.cpu_time += time.process_time() - cpu_start
+                record.cmds_calls += profiler.cmds_calls - cmds_start
+                record.nodes_created += profiler.nodes_created - nodes_start
+                profiler.stack.pop()
+
+        return wrapper
+
+    def _instrument_cmds(self):
+
+        for name in dir(cmds):
+            if name.startswith("_"):
+                continue
+            original = getattr(cmds, name)
+            if not callable(original) or inspect.isclass(original):
+                continue
+
+            self._patched_cmds[name] = original
+            setattr(cmds, name, self._wrap_cmd(original))
+
+    def _wrap_cmd(self, func):
+
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+
+            profiler.cmds_calls += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    def report(self, label="session", wall_time=None):
+
+        stages = [record.as_dict() for record in self.records.values()]
+
+        return {
+            "label": label,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "wall_time": wall_time,
+            "cmds_calls": self.cmds_calls,
+            "nodes_created": self.nodes_created,
+            "stages": stages,
+        }
+
+    @staticmethod
+    def save(report, path):
+
+        with open(path, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+        return path
+
+    @staticmethod
+    def load(path):
+
+        with open(path) as handle:
+            return json.load(handle)
+
+    @staticmethod
+    def compare(base, current):
+
+        base_stages = {stage["name"]: stage for stage in base["stages"]}
+        current_stages = {stage["name"]: stage for stage in current["stages"]}
+
+        rows = []
+        for name in list(base_stages) + [n for n in current_stages if n not in base_stages]:
+            before = base_stages.get(name, {})
+            after = current_stages.get(name, {})
+            row = {"name": name}
+            for metric in StageProfiler.METRICS:
+                old = before.get(metric, 0)
+                new = after.get(metric, 0)
+                row[metric] = (old, new, new - old)
+            rows.append(row)
+
+        return rows
+
+    @staticmethod
+    def format_report(report, limit=None):
+
+        stages = sorted(report["stages"],
+                        key=lambda stage: stage["wall_time"], reverse=True)
+        if limit:
+            stages = stages[:limit]
+
+        lines = [f"{'stage':<60}{'calls':>6}{'wall':>11}{'cpu':>11}"
+                 f"{'cmds':>8}{'nodes':>7}"]
+        for stage in stages:
+            name = "  " * stage["depth"] + stage["name"]
+            lines.append(
+                f"{name:<60}{stage['calls']:>6}"
+                f"{stage['wall_time'] * 1000.0:>9.1f}ms"
+                f"{stage['cpu_time'] * 1000.0:>9.1f}ms"
+                f"{stage['cmds_calls']:>8}{stage['nodes_created']:>7}")
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_comparison(rows, metric="wall_time", limit=None):
+
+        rows = sorted(rows, key=lambda row: abs(row[metric][2]), reverse=True)
+        if limit:
+            rows = rows[:limit]
+
+        lines = [f"{'stage':<60}{'before':>12}{'after':>12}{'delta':>12}"]
+        for row in rows:
+            old, new, delta = row[metric]
+            lines.append(f"{row['name']:<60}{old:>12.4g}{new:>12.4g}{delta:>+12.4g}")
+
+        return "\n".join(lines)
+
+
+class EvaluationProfiler:
+
+    TOP_NODES = 3
+
+    def __init__(self):
+
+        self.last_report = None
+
+    @staticmethod
+    def subsystem_of(step_name):
+
+        return step_name.partition(".")[0]
+
+    @staticmethod
+    def tagged_nodes(ctx):
+
+        tags = {}
+        for step_name, uuids in ctx.build_tags.items():
+            subsystem = EvaluationProfiler.subsystem_of(step_name)
+            for uuid in uuids:
+                node = PATH_CACHE.resolve(uuid)
+                if node:
+                    tags[node] = subsystem
+
+        return tags
+
+    @staticmethod
+    @contextmanager
+    def dg_evaluation():
+
+        # dgtimer only sees nodes computed by the DG, not by the parallel
+        # evaluation manager, so playback is profiled in DG mode.
+        mode = cmds.evaluationManager(query=True, mode=True)[0]
+        if mode != "off":
+            cmds.evaluationManager(mode="off")
+        try:
+            yield
+        finally:
+            if mode != "off":
+                cmds.evaluationManager(mode=mode)
+
+    def run(self, ctx, start=None, end=None, label="playback", path=None):
+
+        if start is None:
+            start = int(cmds.playbackOptions(query=True, minTime=True))
+        if end is None:
+            end = int(cmds.playbackOptions(query=True, maxTime=True))
+
+        tags = EvaluationProfiler.tagged_nodes(ctx)
+        deform_joints = list(ctx.joint_registry.get("deform", {}).values())
+        current = cmds.currentTime(query=True)
+
+        with EvaluationProfiler.dg_evaluation():
+            cmds.dgtimer(on=True, reset=True)
+            begin = time.perf_counter()
+            try:
+                for frame in range(start, end + 1):
+                    cmds.currentTime(frame, update=True)
+                    for joint in deform_joints:
+                        cmds.getAttr(f"{joint}.worldMatrix[0]")
+            finally:
+                seconds = time.perf_counter() - begin
+                cmds.dgtimer(off=True)
+                cmds.currentTime(current, update=True)
+
+        subsystems = {}
+        for node, subsystem in tags.items():
+            node_time = cmds.dgtimer(
+                node, query=True, timerType="self", returnType="total") or 0.0
+            entry = subsystems.setdefault(
+                subsystem, {"name": subsystem, "nodes": 0, "dg_time": 0.0, "top": []})
+            entry["nodes"] += 1
+            entry["dg_time"] += node_time
+            entry["top"].append((node_time, node))
+
+        self.last_report = EvaluationProfiler.report(
+            label, end - start + 1, seconds,
+            cmds.dgtimer(query=True, returnType="total") or 0.0,
+            subsystems.values())
+        if path:
+            StageProfiler.save(self.last_report, path)
+
+        return self.last_report
+
+    @staticmethod
+    def report(label, frames, seconds, dg_time, subsystems):
+
+        tagged = sum(entry["dg_time"] for entry in subsystems)
+        total = max(dg_time, tagged) or 1.0
+
+        rows = []
+        for entry in sorted(subsystems, key=lambda e: e["dg_time"], reverse=True):
+            top = sorted(entry["top"], reverse=True)[:EvaluationProfiler.TOP_NODES]
+            rows.append({
+                "name": entry["name"],
+                "nodes": entry["nodes"],
+                "dg_time": entry["dg_time"],
+                "per_frame": entry["dg_time"] / frames,
+                "share": entry["dg_time"] / total,
+                "top": [[node, node_time] for node_time, node in top],
+            })
+
+        return {
+            "label": label,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "frames": frames,
+            "wall_time": seconds,
+            "fps": frames / seconds if seconds else 0.0,
+            "dg_time": dg_time,
+            "untagged_time": max(dg_time - tagged, 0.0),
+            "subsystems": rows,
+        }
+
+    @staticmethod
+    def format_report(report, limit=None):
+
+        rows = report["subsystems"][:limit] if limit else report["subsystems"]
+
+        lines = [f"{report['label']}: {report['frames']} frames, "
+                 f"{report['fps']:.1f} fps, "
+                 f"{report['wall_time'] * 1000.0 / report['frames']:.2f}ms/frame, "
+                 f"{report['dg_time']:.1f}ms in the DG",
+                 f"{'subsystem':<24}{'nodes':>7}{'dg ms':>11}{'ms/frame':>10}"
+                 f"{'share':>8}  top nodes"]
+        for row in rows:
+            top = ", ".join(node.split("|")[-1] for node, _ in row["top"])
+            lines.append(
+                f"{row['name']:<24}{row['nodes']:>7}{row['dg_time']:>11.2f}"
+                f"{row['per_frame']:>10.3f}{row['share'] * 100.0:>7.1f}%  {top}")
+        lines.append(f"{'untagged':<24}{'':>7}{report['untagged_time']:>11.2f}")
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def check_budget(report, budget):
+
+        failures = []
+        if report["fps"] < budget.get("fps", 0.0):
+            failures.append(f"{report['label']}: {report['fps']:.1f} fps "
+                            f"(budget {budget['fps']:.1f} fps)")
+
+        rows = {row["name"]: row for row in report["subsystems"]}
+        for name, allowed in sorted(budget.get("subsystems", {}).items()):
+            row = rows.get(name)
+            if row is not None and row["per_frame"] > allowed:
+                failures.append(f"{report['label']}: {name} took "
+                                f"{row['per_frame']:.3f}ms/frame (budget {allowed:.3f})")
+
+        return failures
+
+
+SCENE_WATCHER = rig_builders_registry.SCENE_WATCHER
+PATH_CACHE = rig_builders_registry.PATH_CACHE
+
+PROFILER = StageProfiler()
+EVAL_PROFILER = EvaluationProfiler()
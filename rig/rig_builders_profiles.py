@@ -0,0 +1,243 @@
+
+
+MIN_PROFILE_SCORE = 0.75
+
+PROXY_SUFFIX = "_proxy"
+
+MIXAMO_SIDES = {"l": "Left", "r": "Right"}
+
+MIXAMO_LIMBS = {
+    "clavicle": "Shoulder",
+    "upperarm": "Arm",
+    "lowerarm": "ForeArm",
+    "hand": "Hand",
+    "thigh": "UpLeg",
+    "calf": "Leg",
+    "foot": "Foot",
+    "ball": "ToeBase",
+}
+
+MIXAMO_FINGERS = {
+    "thumb": "Thumb",
+    "index": "Index",
+    "middle": "Middle",
+    "ring": "Ring",
+    "pinky": "Pinky",
+}
+
+TWIST_LIMBS = {
+    "upperarm": "lowerarm",
+    "lowerarm": "hand",
+    "thigh": "calf",
+    "calf": "foot",
+}
+
+
+def ue4_aliases():
+
+    aliases = {
+        "root": "root",
+        "pelvis": "pelvis",
+        "spine_01": "spine_01",
+        "spine_03": "spine_02",
+        "spine_05": "spine_03",
+        "neck_01": "neck_01",
+        "head": "head",
+    }
+    for side in ("l", "r"):
+        for limb in MIXAMO_LIMBS:
+            aliases[f"{limb}_{side}"] = f"{limb}_{side}"
+        for finger in MIXAMO_FINGERS:
+            for i in range(1, 4):
+                aliases[f"{finger}_0{i}_{side}"] = f"{finger}_0{i}_{side}"
+        for limb in ("upperarm", "lowerarm", "thigh", "calf"):
+            aliases[f"{limb}_twist_01_{side}"] = f"{limb}_twist_01_{side}"
+
+    return aliases
+
+
+def ue4_proxies():
+
+    proxies = {
+        "spine_02": ("spine_01", "spine_03", 0.5),
+        "spine_04": ("spine_03", "spine_05", 0.5),
+        "neck_02": ("neck_01", "head", 0.5),
+    }
+    for side in ("l", "r"):
+        for limb, end in TWIST_LIMBS.items():
+            proxies[f"{limb}_twist_02_{side}"] = (
+                f"{limb}_{side}", f"{end}_{side}", 2.0 / 3.0)
+
+    return proxies
+
+
+def mixamo_aliases():
+
+    aliases = {
+        "pelvis": "Hips",
+        "spine_01": "Spine",
+        "spine_03": "Spine1",
+        "spine_05": "Spine2",
+        "neck_01": "Neck",
+        "head": "Head",
+    }
+    for side, prefix in MIXAMO_SIDES.items():
+        for limb, name in MIXAMO_LIMBS.items():
+            aliases[f"{limb}_{side}"] = f"{prefix}{name}"
+        for finger, name in MIXAMO_FINGERS.items():
+            for i in range(1, 4):
+                aliases[f"{finger}_0{i}_{side}"] = f"{prefix}Hand{name}{i}"
+
+    return aliases
+
+
+def mixamo_proxies():
+
+    proxies = ue4_proxies()
+    for side in ("l", "r"):
+        for limb, end in TWIST_LIMBS.items():
+            proxies[f"{limb}_twist_01_{side}"] = (
+                f"{limb}_{side}", f"{end}_{side}", 1.0 / 3.0)
+
+    return proxies
+
+
+class SkeletonProfile:
+
+    __slots__ = ("name", "aliases", "proxies", "sources", "signature")
+
+    def __init__(self, name, aliases, proxies=None):
+
+        self.name = name
+        self.aliases = dict(aliases)
+        # Rig joints the source skeleton lacks, placed between two mapped
+        # joints as (start, end, blend) so every builder still finds them.
+        self.proxies = dict(proxies or {})
+        self.sources = {}
+        for canonical, source in self.aliases.items():
+            if source in self.sources:
+                raise RuntimeError(
+                    f"Skeleton profile {name} maps {source} to both "
+                    f"{self.sources[source]} and {canonical}")
+            self.sources[source] = canonical
+        self.signature = frozenset(self.sources)
+
+        for canonical, (start, end, _) in self.proxies.items():
+            if canonical in self.aliases:
+                raise RuntimeError(
+                    f"Skeleton profile {name} maps and proxies {canonical}")
+            if start not in self.aliases or end not in self.aliases:
+                raise RuntimeError(
+                    f"Skeleton profile {name} places {canonical} between "
+                    f"unmapped joints {start} and {end}")
+            self.sources[SkeletonProfile.proxy_name(canonical)] = canonical
+
+    def __repr__(self):
+
+        return f"SkeletonProfile({self.name}, {len(self.aliases)} joints)"
+
+    def canonical(self, source_name):
+
+        return self.sources.get(source_name)
+
+    @staticmethod
+    def proxy_name(canonical_name):
+
+        return f"{canonical_name}{PROXY_SUFFIX}"
+
+    @staticmethod
+    def identity(name, joints):
+
+        return SkeletonProfile(name, {joint: joint for joint in joints})
+
+
+class ProfileRegistry:
+
+    def __init__(self):
+
+        self.profiles = {}
+        self.index = {}
+        self.detected = {}
+
+    def register(self, profile):
+
+        self.unregister(profile.name)
+        self.profiles[profile.name] = profile
+        for source in profile.signature:
+            self.index.setdefault(source, []).append(profile)
+        self.detected.clear()
+
+        return profile
+
+    def unregister(self, name):
+
+        profile = self.profiles.pop(name, None)
+        if profile is None:
+            return
+
+        for source in profile.signature:
+            owners = self.index.get(source, [])
+            owners.remove(profile)
+            if not owners:
+                del self.index[source]
+        self.detected.clear()
+
+    def get(self, name):
+
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise RuntimeError(f"Unknown skeleton profile: {name}")
+        return profile
+
+    def detect(self, joint_names):
+
+        names = frozenset(ProfileRegistry.short_name(name) for name in joint_names)
+        profile = self.detected.get(names)
+        if profile is not None:
+            return profile
+
+        hits = {}
+        for name in names:
+            for owner in self.index.get(name, ()):
+                hits[owner] = hits.get(owner, 0) + 1
+
+        best, best_score = None, (0.0, 0)
+        for owner, count in hits.items():
+            score = (count / len(owner.signature), count)
+            if score > best_score:
+                best, best_score = owner, score
+
+        if best is None or best_score[0] < MIN_PROFILE_SCORE:
+            raise RuntimeError(
+                f"No skeleton profile matches {len(names)} joints "
+                f"(best {best.name if best else None}, {best_score[0]:.0%})")
+
+        self.detected[names] = best
+        return best
+
+    def map_joints(self, joints, profile=None):
+
+        short_names = {joint: ProfileRegistry.short_name(joint) for joint in joints}
+        if profile is None:
+            profile = self.detect(short_names.values())
+
+        mapped = {}
+        for joint, short_name in short_names.items():
+            mapped[profile.canonical(short_name) or short_name] = joint
+
+        return profile, mapped
+
+    @staticmethod
+    def short_name(joint):
+
+        return joint.split("|")[-1].split(":")[-1]
+
+    @staticmethod
+    def with_defaults(joints):
+
+        registry = ProfileRegistry()
+        registry.register(SkeletonProfile.identity("ue5", joints))
+        registry.register(SkeletonProfile("ue4", ue4_aliases(), ue4_proxies()))
+        registry.register(SkeletonProfile("mixamo", mixamo_aliases(), mixamo_proxies()))
+
+        return registry
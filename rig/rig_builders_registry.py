@@ -0,0 +1,493 @@
+
+
+import sys
+from contextlib import contextmanager
+from collections.abc import MutableMapping
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+class SceneWatcher:
+
+    def __init__(self):
+
+        self.listeners = []
+        self.holders = []
+        self.suspended = False
+        self._callback_ids = []
+
+    @property
+    def installed(self):
+
+        return bool(self._callback_ids)
+
+    def add_listener(self, listener):
+
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def acquire(self, holder):
+
+        # Callbacks stay installed while any holder still relies on them.
+        if holder not in self.holders:
+            self.holders.append(holder)
+        self.install()
+
+    def release(self, holder):
+
+        if holder in self.holders:
+            self.holders.remove(holder)
+        if not self.holders:
+            self.uninstall()
+
+    def install(self):
+
+        if self.installed:
+            return
+
+        self._callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(
+                self._node_added, "dependNode"),
+            om.MDGMessage.addNodeRemovedCallback(
+                self._node_removed, "dependNode"),
+            om.MNodeMessage.addNameChangedCallback(
+                om.MObject.kNullObj, self._node_renamed),
+            om.MDagMessage.addAllDagChangesCallback(self._dag_changed),
+            om.MDGMessage.addConnectionCallback(self._connection_changed),
+            om.MAnimMessage.addAnimCurveEditedCallback(self._anim_curve_edited),
+            om.MSceneMessage.addCallback(
+                om.MSceneMessage.kBeforeOpen, self._suspend),
+            om.MSceneMessage.addCallback(
+                om.MSceneMessage.kBeforeNew, self._suspend),
+            om.MSceneMessage.addCallback(
+                om.MSceneMessage.kAfterOpen, self._scene_reset),
+            om.MSceneMessage.addCallback(
+                om.MSceneMessage.kAfterNew, self._scene_reset),
+        ]
+
+    def uninstall(self):
+
+        if self._callback_ids:
+            om.MMessage.removeCallbacks(self._callback_ids)
+            # Listeners can no longer see edits, so they drop what the
+            # callbacks kept valid.
+            self._notify("on_unwatched")
+        self._callback_ids = []
+        self.suspended = False
+
+    def _notify(self, method, *args):
+
+        for listener in self.listeners:
+            handler = getattr(listener, method, None)
+            if handler:
+                handler(*args)
+
+    def _dispatch(self, node, *names):
+
+        if not node.hasFn(om.MFn.kTransform):
+            return
+
+        is_joint = node.hasFn(om.MFn.kJoint)
+        for name in names:
+            if not name:
+                continue
+            short_name = name.split("|")[-1].split(":")[-1]
+            self._notify("on_node_changed", short_name, is_joint)
+
+    def _node_added(self, node, client_data):
+
+        if self.suspended:
+            return
+        self._notify("on_node_added", node)
+        self._dispatch(node, om.MFnDependencyNode(node).name())
+
+    def _node_removed(self, node, client_data):
+
+        if self.suspended:
+            return
+        self._notify("on_node_removed", node)
+        self._dispatch(node, om.MFnDependencyNode(node).name())
+
+    def _node_renamed(self, node, prev_name, client_data):
+
+        if self.suspended:
+            return
+        self._notify("on_node_renamed", node, prev_name)
+        self._dispatch(node, prev_name, om.MFnDependencyNode(node).name())
+
+    def _dag_changed(self, message, child, parent, client_data):
+
+        if self.suspended:
+            return
+        self._notify("on_dag_changed", child.node())
+
+    def _connection_changed(self, source, destination, made, client_data):
+
+        if self.suspended:
+            return
+        self._notify("on_connection_changed", source, destination, made)
+
+    def _anim_curve_edited(self, curves, client_data):
+
+        if self.suspended:
+            return
+        self._notify("on_anim_curve_edited", curves)
+
+    def _suspend(self, client_data):
+
+        self.suspended = True
+
+    def _scene_reset(self, client_data):
+
+        self.suspended = False
+        self._notify("on_scene_reset")
+
+
+class PathCache:
+
+    def __init__(self):
+
+        self.paths = {}
+        self.namespaces = {}
+
+    @staticmethod
+    def uuid_of(node):
+
+        return sys.intern(om.MFnDependencyNode(node).uuid().asString())
+
+    def register(self, node):
+
+        if node is None:
+            return None
+        if isinstance(node, (list, tuple)):
+            return tuple(self.register(n) for n in node)
+
+        sel = om.MSelectionList()
+        sel.add(node)
+        obj = sel.getDependNode(0)
+        uuid = PathCache.uuid_of(obj)
+        self.namespaces[uuid] = ContextRegistry.namespace_of(
+            om.MFnDependencyNode(obj).name())
+
+        # Paths are only cached while the watcher can invalidate them; the
+        # build, the sampler and the UI each hold it for as long as they run.
+        if SCENE_WATCHER.installed:
+            if obj.hasFn(om.MFn.kDagNode):
+                path = sel.getDagPath(0).fullPathName()
+            else:
+                path = om.MFnDependencyNode(obj).name()
+            self.paths[uuid] = sys.intern(path)
+
+        return uuid
+
+    def seed(self, paths):
+
+        for uuid, path in paths.items():
+            uuid = sys.intern(uuid)
+            self.namespaces[uuid] = ContextRegistry.namespace_of(path)
+            if SCENE_WATCHER.installed:
+                self.paths[uuid] = sys.intern(path)
+
+    def resolve(self, uuid):
+
+        if uuid is None:
+            return None
+        if isinstance(uuid, tuple):
+            return [self.resolve(u) for u in uuid]
+
+        path = self.paths.get(uuid)
+        if path is None:
+            found = cmds.ls(uuid, long=True)
+            if len(found) > 1:
+                # Referencing one file twice repeats its UUIDs, so only the
+                # copy in the namespace the node was registered from counts.
+                namespace = self.namespaces.get(uuid)
+                found = [path for path in found
+                         if ContextRegistry.namespace_of(path) == namespace]
+            if len(found) != 1:
+                return None
+            path = sys.intern(found[0])
+            if SCENE_WATCHER.installed:
+                self.paths[uuid] = path
+
+        return path
+
+    def invalidate(self, node):
+
+        # A rename or reparent changes the path of the node and of everything
+        # below it, so walk that subtree instead of matching cached strings.
+        stack = [node]
+        while stack and self.paths:
+            obj = stack.pop()
+            self.paths.pop(PathCache.uuid_of(obj), None)
+            if obj.hasFn(om.MFn.kDagNode):
+                fn = om.MFnDagNode(obj)
+                stack.extend(fn.child(i) for i in range(fn.childCount()))
+
+    def on_node_renamed(self, node, prev_name):
+
+        self.invalidate(node)
+
+    def on_dag_changed(self, node):
+
+        self.invalidate(node)
+
+    def on_node_removed(self, node):
+
+        self.paths.pop(PathCache.uuid_of(node), None)
+
+    def on_scene_reset(self):
+
+        self.paths = {}
+        self.namespaces = {}
+
+    def on_unwatched(self):
+
+        self.paths = {}
+
+
+class NodeMap(MutableMapping):
+
+    __slots__ = ("cache", "uuids")
+
+    def __init__(self, cache, entries=None):
+
+        self.cache = cache
+        self.uuids = {}
+        if entries:
+            self.update(entries)
+
+    def __getitem__(self, key):
+
+        return self.cache.resolve(self.uuids[key])
+
+    def __setitem__(self, key, node):
+
+        self.uuids[sys.intern(key)] = self.cache.register(node)
+
+    def __delitem__(self, key):
+
+        del self.uuids[key]
+
+    def __iter__(self):
+
+        return iter(self.uuids)
+
+    def __len__(self):
+
+        return len(self.uuids)
+
+    def __repr__(self):
+
+        return f"NodeMap({dict(self.items())!r})"
+
+
+class NodeRegistry(dict):
+
+    def __init__(self, cache, entries=None):
+
+        super().__init__()
+        self.cache = cache
+        for key, value in (entries or {}).items():
+            self[key] = value
+
+    def __setitem__(self, key, value):
+
+        if not isinstance(value, NodeMap):
+            value = NodeMap(self.cache, value)
+        super().__setitem__(key, value)
+
+    def setdefault(self, key, default=None):
+
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def to_handles(self):
+
+        return {key: dict(node_map.uuids) for key, node_map in self.items()}
+
+    def load_handles(self, handles):
+
+        for key, uuids in handles.items():
+            node_map = NodeMap(self.cache)
+            node_map.uuids = {
+                sys.intern(name): tuple(uuid) if isinstance(uuid, list) else uuid
+                for name, uuid in uuids.items()}
+            self[key] = node_map
+
+
+class NodeIndex:
+
+    def __init__(self, cache, namespace=""):
+
+        self.cache = cache
+        self.namespace = namespace
+        self.handles = {}
+        self.keys = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+
+        self.handles = {}
+        self.keys = {}
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, node, key=None):
+
+        if key is None:
+            key = self.unqualify(node.split("|")[-1])
+
+        uuid = self.cache.register(node)
+        self.discard(key)
+        self.handles[key] = uuid
+        self.keys.setdefault(uuid, set()).add(key)
+
+        return node
+
+    def get(self, key):
+
+        uuid = self.handles.get(key)
+        if uuid is None:
+            return None
+
+        path = self.cache.resolve(uuid)
+        if path:
+            self.hits += 1
+            return path
+
+        self.discard(key)
+        return None
+
+    def lookup(self, key, **ls_flags):
+
+        path = self.get(key)
+        if path:
+            return path
+
+        self.misses += 1
+        found = cmds.ls(self.qualify(key), long=True, **ls_flags)
+        if not found:
+            return None
+
+        self.record(found[0], key)
+        return self.cache.resolve(self.handles[key])
+
+    def qualify(self, name):
+
+        return f"{self.namespace}:{name}" if self.namespace else name
+
+    def unqualify(self, name):
+
+        prefix = f"{self.namespace}:"
+        if self.namespace and name.startswith(prefix):
+            return name[len(prefix):]
+        return name
+
+    def load_handles(self, handles):
+
+        self.clear()
+        for key, uuid in handles.items():
+            self.handles[key] = uuid
+            self.keys.setdefault(uuid, set()).add(key)
+
+    def discard(self, key):
+
+        uuid = self.handles.pop(key, None)
+        keys = self.keys.get(uuid)
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self.keys[uuid]
+
+    def forget(self, node):
+
+        for key in self.keys.pop(PathCache.uuid_of(node), ()):
+            self.handles.pop(key, None)
+
+    def on_node_renamed(self, node, prev_name):
+
+        self.forget(node)
+
+    def on_node_removed(self, node):
+
+        self.forget(node)
+
+    def on_scene_reset(self):
+
+        self.clear()
+
+    def report(self):
+
+        return {
+            "entries": len(self.handles),
+            "hits": self.hits,
+            "misses": self.misses,
+            "saved_ls_calls": self.hits,
+        }
+
+
+class ContextRegistry:
+
+    def __init__(self, factory):
+
+        self.factory = factory
+        self.contexts = {}
+
+    def __iter__(self):
+
+        return iter(self.contexts.values())
+
+    def __len__(self):
+
+        return len(self.contexts)
+
+    def get(self, namespace=""):
+
+        namespace = namespace.strip(":")
+        context = self.contexts.get(namespace)
+        if context is None:
+            context = self.contexts[namespace] = self.factory(namespace)
+        return context
+
+    def remove(self, namespace):
+
+        context = self.contexts.pop(namespace.strip(":"), None)
+        if context is not None:
+            context.detach()
+
+    @staticmethod
+    def namespace_of(node):
+
+        short_name = node.split("|")[-1]
+        return short_name.rpartition(":")[0]
+
+    @staticmethod
+    @contextmanager
+    def scope(namespace):
+
+        if not namespace:
+            yield
+            return
+
+        previous = cmds.namespaceInfo(currentNamespace=True, absoluteName=True)
+        if not cmds.namespace(exists=f":{namespace}"):
+            cmds.namespace(add=f":{namespace}")
+        cmds.namespace(set=f":{namespace}")
+        try:
+            yield
+        finally:
+            cmds.namespace(set=previous)
+
+
+SCENE_WATCHER = SceneWatcher()
+PATH_CACHE = PathCache()
+SCENE_WATCHER.add_listener(PATH_CACHE)
@@ -1,6 +1,15 @@
 
 
+import numpy as np
+
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+from rig import rig_builders_matrix
+from rig import rig_builders_registry
+from rig import rig_builders_profiles
+from rig import rig_builders_schema
+from rig import rig_builders_transaction
 
 
 UE5_SCHEMA = {
@@ -71,104 +80,277 @@ UE5_SCHEMA = {
 
 }
 
+BLEND_CONSTRAINT = "constraint"
+BLEND_MATRIX = "matrix"
+BLEND_MODES = (BLEND_CONSTRAINT, BLEND_MATRIX)
 
-class RigBuildContext:
+SPINE_CURVE = "curve"
+SPINE_MATRIX = "matrix"
+SPINE_MODES = (SPINE_CURVE, SPINE_MATRIX)
+
+
+class WorldMatrixSnapshot:
 
     def __init__(self):
 
-        self.skeleton_root = None
-        self.control_registry = {}
-        self.joint_registry = {}
-        self.group_registry = {}
+        self.clear()
+
+    def clear(self):
+
+        self.matrices = np.empty((0, 4, 4))
+        self.index = {}
+        self.hits = 0
+        self.misses = 0
+
+    def capture(self, joints):
+
+        names = list(joints)
+        sel = om.MSelectionList()
+        for name in names:
+            sel.add(joints[name])
+
+        world = np.empty((len(names), 16))
+        for i in range(len(names)):
+            world[i] = list(sel.getDagPath(i).inclusiveMatrix())
+
+        self.matrices = world.reshape(-1, 4, 4)
+        self.index = {joints[name]: i for i, name in enumerate(names)}
+
+    def alias(self, node, joint):
+
+        if joint in self.index:
+            self.index[node] = self.index[joint]
+
+    def matrix(self, node):
+
+        i = self.index.get(node)
+        if i is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.matrices[i]
+
+    def on_scene_reset(self):
+
+        self.clear()
+
+    def report(self):
+
+        return {
+            "joints": len(self.matrices),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class RigBuildContext:
+
+    SCAN_GROUPS = {
+        "MainSystem":    ("control_registry", "transform", ()),
+        "FKSystem":      ("control_registry", "transform", (("_fk_CTRL", "fk"),)),
+        "IKSystem":      ("control_registry", "transform", (("_ik_CTRL", "ik"),
+                                                            ("_pole_CTRL", "ik"))),
+        "IKFKSystem":    ("control_registry", "transform", (("_ikfk_CTRL", "ikfk"),)),
+        "fk_joints":     ("joint_registry", "joint", (("_fk_JNT", "fk"),)),
+        "ik_joints":     ("joint_registry", "joint", (("_ik_JNT", "ik"),)),
+        "deform_joints": ("joint_registry", "joint", (("", "deform"),)),
+    }
+
+    def __init__(self, namespace=""):
+
+        self.namespace = namespace
+        self.blend_mode = BLEND_CONSTRAINT
+        self.spine_mode = SPINE_CURVE
+        self._skeleton_root = None
+        self.skeleton_profile = None
+        self.control_registry = NodeRegistry(PATH_CACHE)
+        self.joint_registry = NodeRegistry(PATH_CACHE)
+        self.group_registry = NodeRegistry(PATH_CACHE)
+        self.blend_pairs = {}
+        self.build_tags = {}
+
+        self.node_index = NodeIndex(PATH_CACHE, namespace)
+        SCENE_WATCHER.add_listener(self.node_index)
+
+        self.world_matrices = WorldMatrixSnapshot()
+        SCENE_WATCHER.add_listener(self.world_matrices)
+
+        self.dirty_groups = set(RigBuildContext.SCAN_GROUPS)
+
+    @property
+    def skeleton_root(self):
+
+        return PATH_CACHE.resolve(self._skeleton_root)
+
+    @skeleton_root.setter
+    def skeleton_root(self, node):
+
+        self._skeleton_root = PATH_CACHE.register(node)
 
     def clear(self):
 
         self.skeleton_root = None
-        self.control_registry = {}
-        self.joint_registry = {}
-        self.group_registry = {}
+        self.skeleton_profile = None
+        self.control_registry = NodeRegistry(PATH_CACHE)
+        self.joint_registry = NodeRegistry(PATH_CACHE)
+        self.group_registry = NodeRegistry(PATH_CACHE)
+        self.blend_pairs = {}
+        self.build_tags = {}
+
+        self.node_index.clear()
+        self.world_matrices.clear()
+
+        self.dirty_groups = set(RigBuildContext.SCAN_GROUPS)
+
+    def scope(self):
+
+        return ContextRegistry.scope(self.namespace)
+
+    def detach(self):
+
+        self.unwatch_scene()
+        SCENE_WATCHER.remove_listener(self.node_index)
+        SCENE_WATCHER.remove_listener(self.world_matrices)
+
+    def watch_scene(self):
+
+        SCENE_WATCHER.add_listener(self)
+        SCENE_WATCHER.acquire(self)
+
+    def unwatch_scene(self):
+
+        # Unwatched edits are not tracked, so the next sync rescans everything.
+        SCENE_WATCHER.remove_listener(self)
+        SCENE_WATCHER.release(self)
+        self.dirty_groups = set(RigBuildContext.SCAN_GROUPS)
+
+    def fully_dirty(self):
+
+        return self.dirty_groups >= set(RigBuildContext.SCAN_GROUPS)
+
+    def mark_synced(self):
+
+        self.dirty_groups = set()
+
+    def to_manifest(self):
+
+        return {
+            "handles": {
+                "skeleton_root": self._skeleton_root,
+                "control_registry": self.control_registry.to_handles(),
+                "joint_registry": self.joint_registry.to_handles(),
+                "group_registry": self.group_registry.to_handles(),
+                "node_index": dict(self.node_index.handles),
+            },
+            "data": {
+                "skeleton_profile": (self.skeleton_profile.name
+                                     if self.skeleton_profile else None),
+                "blend_mode": self.blend_mode,
+                "spine_mode": self.spine_mode,
+                # Kept out of the handles so nodes deleted after the build
+                # do not invalidate the manifest.
+                "build_tags": {step: list(nodes)
+                               for step, nodes in self.build_tags.items()},
+            },
+        }
+
+    def load_manifest(self, manifest):
+
+        handles = manifest["handles"]
+        profile_name = manifest["data"].get("skeleton_profile")
+
+        self.clear()
+        self._skeleton_root = handles["skeleton_root"]
+        if profile_name:
+            self.skeleton_profile = PROFILES.get(profile_name)
+        self.blend_mode = manifest["data"].get("blend_mode", BLEND_CONSTRAINT)
+        self.spine_mode = manifest["data"].get("spine_mode", SPINE_CURVE)
+        self.control_registry.load_handles(handles["control_registry"])
+        self.joint_registry.load_handles(handles["joint_registry"])
+        self.group_registry.load_handles(handles["group_registry"])
+        self.node_index.load_handles(handles["node_index"])
+        self.build_tags = {step: list(nodes) for step, nodes
+                           in manifest["data"].get("build_tags", {}).items()}
+
+        self.mark_synced()
+
+    def on_node_changed(self, name, is_joint):
+
+        group = RigBuildContext.scan_group_for(name, is_joint)
+        if group:
+            self.dirty_groups.add(group)
+
+    def on_scene_reset(self):
+
+        self.dirty_groups = set(RigBuildContext.SCAN_GROUPS)
+
+    @staticmethod
+    def scan_group_for(name, is_joint):
+
+        if is_joint:
+            if name.endswith("_fk_JNT"):
+                return "fk_joints"
+            if name.endswith("_ik_JNT"):
+                return "ik_joints"
+            if not name.endswith("_JNT"):
+                return "deform_joints"
+            return None
+
+        if name == "root":
+            return "MainSystem"
+        if name.endswith("_ikfk_CTRL"):
+            return "IKFKSystem"
+        if name.endswith(("_ik_CTRL", "_pole_CTRL")):
+            return "IKSystem"
+        if name.endswith("_fk_CTRL"):
+            return "FKSystem"
+        return None
 
     def rebuild(self):
 
-        self.rebuild_controls()
-        self.rebuild_joints()
+        if not SCENE_WATCHER.installed:
+            self.dirty_groups = set(RigBuildContext.SCAN_GROUPS)
+        if not self.dirty_groups:
+            return
 
-    def rebuild_controls(self):
+        for group in RigBuildContext.SCAN_GROUPS:
+            if group in self.dirty_groups:
+                self.rescan_group(group)
 
-        self.control_registry = {}
+        self.mark_synced()
 
-        root_ctrl_group = cmds.ls("MainSystem", long=True)
-        fk_ctrls_group = cmds.ls("FKSystem", long=True)
-        ik_ctrls_group = cmds.ls("IKSystem", long=True)
-        ikfk_ctrls_group = cmds.ls("IKFKSystem", long=True)
+    def rescan_group(self, group):
 
-        if root_ctrl_group:
-            root_ctrl = cmds.listRelatives(
-                root_ctrl_group, allDescendents=True, type="transform", fullPath=True)[0]
-        else:
-            root_ctrl = None
-        self.control_registry.setdefault("fk", {})["root"] = root_ctrl
-
-        fk_ctrls = cmds.listRelatives(
-            fk_ctrls_group, allDescendents=True, type="transform", fullPath=True)
-        ik_ctrls = cmds.listRelatives(
-            ik_ctrls_group, allDescendents=True, type="transform", fullPath=True)
-        ikfk_ctrls = cmds.listRelatives(
-            ikfk_ctrls_group, allDescendents=True, type="transform", fullPath=True)
-
-        if fk_ctrls:
-            for node in fk_ctrls:
-                name = node.split("|")[-1]
-                if name.endswith("_fk_CTRL"):
-                    name = name[:-8]
-                    self.control_registry.setdefault("fk", {})[name] = node
-        if ik_ctrls:
-            for node in ik_ctrls:
-                name = node.split("|")[-1]
-                if name.endswith("_ik_CTRL"):
-                    name = name[:-8]
-                    self.control_registry.setdefault("ik", {})[name] = node
-                elif name.endswith("_pole_CTRL"):
-                    name = name[:-10]
-                    self.control_registry.setdefault("ik", {})[name] = node
-        if ikfk_ctrls:
-            for node in ikfk_ctrls:
-                name = node.split("|")[-1]
-                if name.endswith("_ikfk_CTRL"):
-                    name = name[:-10]
-                    self.control_registry.setdefault("ikfk", {})[name] = node
-
-    def rebuild_joints(self):
-
-        self.joint_registry = {}
-
-        fk_joints_group = cmds.ls("fk_joints", long=True)
-        ik_joints_group = cmds.ls("ik_joints", long=True)
-        deform_joints_group = cmds.ls("deform_joints", long=True)
-
-        fk_joints = cmds.listRelatives(
-            fk_joints_group, allDescendents=True, type="joint", fullPath=True)
-        ik_joints = cmds.listRelatives(
-            ik_joints_group, allDescendents=True, type="joint", fullPath=True)
-        deform_joints = cmds.listRelatives(
-            deform_joints_group, allDescendents=True, type="joint", fullPath=True)
-
-        if fk_joints:
-            for node in fk_joints:
-                name = node.split("|")[-1]
-                if name.endswith("_fk_JNT"):
-                    name = name[:-7]
-                    self.joint_registry.setdefault("fk", {})[name] = node
-        if ik_joints:
-            for node in ik_joints:
-                name = node.split("|")[-1]
-                if name.endswith("_ik_JNT"):
-                    name = name[:-7]
-                    self.joint_registry.setdefault("ik", {})[name] = node
-        if deform_joints:
-            for node in deform_joints:
-                name = node.split("|")[-1]
-                self.joint_registry.setdefault("deform", {})[name] = node
+        registry_name, node_type, suffixes = RigBuildContext.SCAN_GROUPS[group]
+        registry = getattr(self, registry_name)
+
+        marker = f"|{group}|"
+        for _, category in suffixes:
+            entries = registry.get(category, {})
+            for name, node in list(entries.items()):
+                if node and marker in node:
+                    del entries[name]
+
+        group_node = cmds.ls(self.node_index.qualify(group), long=True)
+        nodes = cmds.listRelatives(
+            group_node, allDescendents=True, type=node_type, fullPath=True) if group_node else None
+
+        if group == "MainSystem":
+            root_ctrl = nodes[0] if nodes else None
+            registry.setdefault("fk", {})["root"] = root_ctrl
+            return
+
+        for node in nodes or []:
+            name = self.node_index.unqualify(node.split("|")[-1])
+            for suffix, category in suffixes:
+                if name.endswith(suffix):
+                    if suffix:
+                        name = name[:-len(suffix)]
+                    elif self.skeleton_profile:
+                        name = self.skeleton_profile.canonical(name) or name
+                    registry.setdefault(category, {})[name] = node
+                    break
 
 
 class RigHelpers:
@@ -190,17 +372,17 @@ class RigHelpers:
         return joint
 
     @staticmethod
-    def get_or_create_group_chain(*names):
+    def get_or_create_group_chain(ctx, *names):
 
         parent = None
         for name in names:
-            if cmds.objExists(name):
-                node = name
-            else:
+            node = ctx.node_index.lookup(name)
+            if node is None:
                 if parent is None:
                     node = cmds.group(empty=True, name=name)
                 else:
                     node = cmds.group(empty=True, name=name, parent=parent)
+                ctx.node_index.record(node, name)
 
             parent = node
 
@@ -209,58 +391,74 @@ class RigHelpers:
     @staticmethod
     def bake_transform_to_opm(node):
 
-        m = cmds.xform(node, q=True, m=True, objectSpace=True)
-        old_opm = cmds.getAttr(node + ".offsetParentMatrix")
+        RigHelpers.bake_transforms_to_opm([node])
 
-        new_m = [0] * 16
+    @staticmethod
+    def bake_transforms_to_opm(nodes):
 
-        for row in range(4):
-            for col in range(4):
-                new_m[row * 4 + col] = sum(
-                    m[row * 4 + k] * old_opm[k * 4 + col]for k in range(4))
+        nodes = list(nodes)
+        if not nodes:
+            return
 
-        cmds.setAttr(node + ".offsetParentMatrix",
-                     *new_m, type="matrix")
+        local_m, opm = RigHelpers.read_local_and_opm_matrices(nodes)
+        baked = np.matmul(local_m, opm).reshape(-1, 16)
 
-        cmds.setAttr(node + ".translate", 0, 0, 0)
-        cmds.setAttr(node + ".rotate", 0, 0, 0)
-        cmds.setAttr(node + ".scale", 1, 1, 1)
+        with DG_BATCH.transaction("bake_transforms_to_opm"):
+            for node, m in zip(nodes, baked.tolist()):
+                DG_BATCH.set_matrix(node + ".offsetParentMatrix", m)
+                DG_BATCH.set_attr(node + ".translate", 0, 0, 0)
+                DG_BATCH.set_attr(node + ".rotate", 0, 0, 0)
+                DG_BATCH.set_attr(node + ".scale", 1, 1, 1)
+
+    @staticmethod
+    def find_plugs(nodes, *attrs):
+
+        plugs = []
+        for node in nodes:
+            fn = om.MFnDependencyNode(om.MSelectionList().add(node).getDependNode(0))
+            plugs.append([fn.findPlug(attr, False) for attr in attrs])
+
+        return plugs
+
+    @staticmethod
+    def read_local_and_opm_matrices(nodes):
+
+        # The matrix attribute is the local transform without offsetParentMatrix.
+        plugs = RigHelpers.find_plugs(nodes, "matrix", "offsetParentMatrix")
+        values = np.array([[list(om.MFnMatrixData(plug.asMObject()).matrix())
+                            for plug in row] for row in plugs]).reshape(-1, 2, 4, 4)
+
+        return values[:, 0], values[:, 1]
 
     @staticmethod
     def bake_opm_to_transform(node):
 
-        local_m = cmds.xform(node, q=True, m=True, os=True)
-        opm = cmds.getAttr(node + ".offsetParentMatrix")
+        RigHelpers.bake_opms_to_transforms([node])
 
-        baked = [0] * 16
-        for row in range(4):
-            for col in range(4):
-                baked[row * 4 + col] = sum(
-                    local_m[row * 4 + k] * opm[k * 4 + col]
-                    for k in range(4)
-                )
+    @staticmethod
+    def bake_opms_to_transforms(nodes):
 
-        dcm = cmds.createNode("decomposeMatrix", n="__opmBake_DCM__")
-        cmds.setAttr(dcm + ".inputMatrix", *baked, type="matrix")
+        nodes = list(nodes)
+        if not nodes:
+            return
 
-        t = cmds.getAttr(dcm + ".outputTranslate")[0]
-        r = cmds.getAttr(dcm + ".outputRotate")[0]
-        s = cmds.getAttr(dcm + ".outputScale")[0]
-        sh = cmds.getAttr(dcm + ".outputShear")[0]
+        local_m, opm = RigHelpers.read_local_and_opm_matrices(nodes)
+        rotate_orders = [row[0].asInt() for row in RigHelpers.find_plugs(nodes, "rotateOrder")]
 
-        cmds.delete(dcm)
+        translate, rotate, scale, shear = rig_builders_matrix.decompose_matrices(
+            np.matmul(local_m, opm), rotate_orders)
 
         identity = [1, 0, 0, 0,
                     0, 1, 0, 0,
                     0, 0, 1, 0,
                     0, 0, 0, 1]
-        cmds.setAttr(node + ".offsetParentMatrix",
-                     *identity, type="matrix")
-
-        cmds.setAttr(node + ".translate", *t)
-        cmds.setAttr(node + ".rotate", *r)
-        cmds.setAttr(node + ".scale", *s)
-        cmds.setAttr(node + ".shear", *sh)
+        with DG_BATCH.transaction("bake_opms_to_transforms"):
+            for i, node in enumerate(nodes):
+                DG_BATCH.set_matrix(node + ".offsetParentMatrix", identity)
+                DG_BATCH.set_attr(node + ".translate", *translate[i].tolist())
+                DG_BATCH.set_attr(node + ".rotate", *rotate[i].tolist())
+                DG_BATCH.set_attr(node + ".scale", *scale[i].tolist())
+                DG_BATCH.set_attr(node + ".shear", *shear[i].tolist())
 
     @staticmethod
     def bake_joint_to_attributes(joint):
@@ -278,13 +476,204 @@ class RigHelpers:
         cmds.xform(joint, m=world_mtx, ws=True)
 
     @staticmethod
-    def create_group_parented_matched(name, parent, match):
+    def create_group_parented_matched(ctx, name, parent, match):
 
         grp = cmds.group(empty=True, name=name, parent=parent)
-        cmds.matchTransform(grp, match)
-        RigHelpers.bake_transform_to_opm(grp)
+        if not RigHelpers.place_with_opm(ctx, grp, parent, match):
+            cmds.matchTransform(grp, match)
+            RigHelpers.bake_transform_to_opm(grp)
+        ctx.node_index.record(grp, name)
 
         return grp
 
+    @staticmethod
+    def match_transform(ctx, node, target, **flags):
+
+        matrix = ctx.world_matrices.matrix(target)
+        if matrix is None:
+            cmds.matchTransform(node, target, **flags)
+        elif not flags:
+            cmds.xform(node, matrix=matrix.ravel().tolist(), worldSpace=True)
+        elif flags == {"position": True, "rotation": False, "scale": False}:
+            cmds.xform(node, translation=matrix[3, :3].tolist(), worldSpace=True)
+        else:
+            cmds.matchTransform(node, target, **flags)
+
+    @staticmethod
+    def world_matrix(ctx, node):
+
+        matrix = ctx.world_matrices.matrix(node)
+        if matrix is None:
+            return np.array(cmds.xform(node, q=True, m=True, ws=True)).reshape(4, 4)
+        return matrix
+
+    @staticmethod
+    def world_position(ctx, node):
+
+        matrix = ctx.world_matrices.matrix(node)
+        if matrix is None:
+            return cmds.xform(node, q=True, translation=True, ws=True)
+        return matrix[3, :3].tolist()
+
+    @staticmethod
+    def place_with_opm(ctx, node, parent, target):
+
+        matrix = ctx.world_matrices.matrix(target)
+        if matrix is None:
+            return False
+
+        parent_matrix = ctx.world_matrices.matrix(parent)
+        if parent_matrix is None:
+            parent_matrix = np.array(
+                cmds.xform(parent, q=True, m=True, ws=True)).reshape(4, 4)
+
+        RigHelpers.set_offset_parent_matrix(
+            node, matrix @ np.linalg.inv(parent_matrix))
+        return True
+
+    @staticmethod
+    def set_offset_parent_matrix(node, matrix):
+
+        RigHelpers.set_matrix_attr(node, "offsetParentMatrix", matrix)
+
+    @staticmethod
+    def set_matrix_attr(node, attr, matrix):
+
+        cmds.setAttr(f"{node}.{attr}", *np.ravel(matrix).tolist(), type="matrix")
+
+    @staticmethod
+    def create_ikfk_blend_pair(ctx, key, ikfk_ctrl, name):
+
+        md = DG_BATCH.create_node(
+            "multiplyDivide", name=f"{name}_IKFKBlend_MD")
+        DG_BATCH.set_attr(f"{md}.input2X", 0.1)
+        DG_BATCH.connect_attr(f"{ikfk_ctrl}.IKFKBlend",
+                              f"{md}.input1X")
+
+        rev = DG_BATCH.create_node(
+            "reverse", name=f"{name}_IKFKBlend_REV")
+        DG_BATCH.connect_attr(f"{md}.outputX",
+                              f"{rev}.inputX")
+
+        ctx.blend_pairs[key] = (md, rev)
+        DG_BATCH.defer(RigHelpers.register_ikfk_blend_pair, ctx, key, md, rev)
+
+        return md, rev
+
+    @staticmethod
+    def register_ikfk_blend_pair(ctx, key, md, rev):
+
+        ctx.blend_pairs[key] = (md, rev)
+        ctx.node_index.record(md)
+        ctx.node_index.record(rev)
+
+    @staticmethod
+    def ikfk_blend_pair(ctx, key):
+
+        pair = ctx.blend_pairs.get(key)
+        if pair is None:
+            raise RuntimeError(f"No IK/FK blend pair built for {key}")
+        return pair
+
+    @staticmethod
+    def blend_ikfk(ctx, fk_driver, ik_driver, target, md, rev, group=None):
+
+        if ctx.blend_mode == BLEND_MATRIX:
+            return RigHelpers.blend_ikfk_matrix(ctx, fk_driver, ik_driver, target, rev)
+
+        constraint, _ = ConstraintFactory.blend(
+            (fk_driver, ik_driver), target,
+            (f"{md}.outputX", f"{rev}.outputX"), group=group)
+
+        return constraint
+
+    @staticmethod
+    def blend_ikfk_matrix(ctx, fk_driver, ik_driver, target, rev):
+
+        # The target keeps only its joint orient locally; everything else moves
+        # into offsetParentMatrix, which the blendMatrix drives from then on.
+        orient = np.eye(4)
+        if cmds.nodeType(target) == "joint":
+            orient[:3, :3] = rig_builders_matrix.euler_to_matrices(
+                cmds.getAttr(f"{target}.jointOrient")[0])[0]
+        inverse_orient = np.linalg.inv(orient)
+
+        local_m, opm = RigHelpers.read_local_and_opm_matrices([target])
+        RigHelpers.set_offset_parent_matrix(
+            target, inverse_orient @ local_m[0] @ opm[0])
+        cmds.xform(target, objectSpace=True, translation=(0, 0, 0),
+                   rotation=(0, 0, 0), scale=(1, 1, 1), shear=(0, 0, 0))
+
+        target_short = ctx.node_index.unqualify(target.split("|")[-1])
+
+        blend = DG_BATCH.create_node(
+            "blendMatrix", name=f"{target_short}_IKFKBlend_BM")
+        DG_BATCH.connect_attr(f"{fk_driver}.worldMatrix[0]",
+                              f"{blend}.inputMatrix")
+        DG_BATCH.connect_attr(f"{ik_driver}.worldMatrix[0]",
+                              f"{blend}.target[0].targetMatrix")
+        DG_BATCH.connect_attr(f"{rev}.outputX",
+                              f"{blend}.target[0].weight")
+
+        mult = DG_BATCH.create_node(
+            "multMatrix", name=f"{target_short}_IKFKBlend_MM")
+        index = 0
+        if not np.allclose(orient, np.eye(4)):
+            DG_BATCH.defer(RigHelpers.set_matrix_attr,
+                           mult, "matrixIn[0]", inverse_orient)
+            index = 1
+        DG_BATCH.connect_attr(f"{blend}.outputMatrix",
+                              f"{mult}.matrixIn[{index}]")
+        DG_BATCH.connect_attr(f"{target}.parentInverseMatrix[0]",
+                              f"{mult}.matrixIn[{index + 1}]")
+        DG_BATCH.connect_attr(f"{mult}.matrixSum",
+                              f"{target}.offsetParentMatrix")
+
+        return blend
+
+
+class ConstraintFactory:
+
+    @staticmethod
+    def weight_attr(target, index):
+
+        # Maya names each target weight after the target's short name, without
+        # its namespace, so the plugs are known without querying the constraint.
+        return f"{target.split('|')[-1].rpartition(':')[2]}W{index}"
+
+    @staticmethod
+    def create(kind, targets, node, **flags):
+
+        constraint = getattr(cmds, kind)(*targets, node, **flags)[0]
+        plugs = [f"{constraint}.{ConstraintFactory.weight_attr(target, index)}"
+                 for index, target in enumerate(targets)]
+
+        return constraint, plugs
+
+    @staticmethod
+    def blend(targets, node, drivers, kind="parentConstraint", group=None, **flags):
+
+        constraint, plugs = ConstraintFactory.create(kind, targets, node, **flags)
+        for driver, plug in zip(drivers, plugs):
+            DG_BATCH.connect_attr(driver, plug)
+
+        if group:
+            parented = cmds.parent(constraint, group)[0]
+            plugs = [parented + plug[len(constraint):] for plug in plugs]
+            constraint = parented
+
+        return constraint, plugs
+
+
+NodeRegistry = rig_builders_registry.NodeRegistry
+NodeIndex = rig_builders_registry.NodeIndex
+ContextRegistry = rig_builders_registry.ContextRegistry
+SCENE_WATCHER = rig_builders_registry.SCENE_WATCHER
+PATH_CACHE = rig_builders_registry.PATH_CACHE
+DG_BATCH = rig_builders_transaction.DG_BATCH
+SCHEMA = rig_builders_schema.CompiledSchema(UE5_SCHEMA)
+PROFILES = rig_builders_profiles.ProfileRegistry.with_defaults(
+    ("root",) + SCHEMA.all_joints())
 
-RIG_CTX = RigBuildContext()
+RIG_CONTEXTS = ContextRegistry(RigBuildContext)
+RIG_CTX = RIG_CONTEXTS.get()
@@ -0,0 +1,141 @@
+
+
+MIRROR_SIDES = {"l": "r", "r": "l", "c": "c"}
+
+CLAVICLE_CHAINS = ("upperarm",)
+
+MIN_CHAIN_LENGTH = {
+    "limb": 3,
+    "spine": 5,
+    "twist": 3,
+}
+
+
+class ChainRecord:
+
+    __slots__ = ("category", "side", "name", "key", "joints", "start", "mid",
+                 "end", "pole", "clavicle", "ikfk", "ik_targets", "drivers")
+
+    def __init__(self, category, side, name, joints):
+
+        self.category = category
+        self.side = side
+        self.name = name
+        self.key = f"{name}_{side}"
+        self.joints = tuple(joints)
+
+        self.clavicle = None
+        self.start = self.joints[0]
+        self.mid = self.joints[len(self.joints) // 2]
+        self.end = self.joints[-1]
+        self.ikfk = self.start
+        self.ik_targets = ()
+        self.drivers = self.joints
+
+        if category == "limb":
+            if name in CLAVICLE_CHAINS:
+                self.clavicle = self.joints[0]
+                self.start, self.mid, self.end = self.joints[1:4]
+            else:
+                self.start, self.mid, self.end = self.joints[0:3]
+            self.ikfk = self.start
+            self.ik_targets = (self.start, self.mid, self.end)
+
+        elif category == "spine":
+            self.ik_targets = self.joints[1:4]
+            self.start, self.mid, self.end = self.ik_targets
+            self.ikfk = self.end
+            self.drivers = self.joints[0:-1]
+
+        elif category == "twist":
+            self.start, self.mid, self.end = self.joints[0:3]
+            self.drivers = self.joints[0:2]
+
+        self.pole = self.mid
+
+    def __repr__(self):
+
+        return f"ChainRecord({self.category}, {self.key}, {self.joints})"
+
+
+class CompiledSchema:
+
+    __slots__ = ("source", "categories", "records", "sides", "joints")
+
+    def __init__(self, source):
+
+        self.source = source
+        self.categories = tuple(source)
+        self.records = {}
+        self.sides = {}
+        self.joints = {}
+
+        CompiledSchema.validate(source)
+        self.compile()
+
+    def compile(self):
+
+        for category, side_dict in self.source.items():
+            records = []
+            sides = []
+            for side, chain_dict in side_dict.items():
+                side_records = tuple(
+                    ChainRecord(category, side, name, joints)
+                    for name, joints in chain_dict.items())
+                records.extend(side_records)
+                sides.append((side, side_records))
+
+            self.records[category] = tuple(records)
+            self.sides[category] = tuple(sides)
+            self.joints[category] = tuple(
+                joint_name for record in records for joint_name in record.joints)
+
+    def chains(self, category):
+
+        return self.records.get(category, ())
+
+    def by_side(self, category):
+
+        return self.sides.get(category, ())
+
+    def all_joints(self):
+
+        return tuple(dict.fromkeys(
+            joint_name for category in self.categories
+            for joint_name in self.joints[category]))
+
+    @staticmethod
+    def validate(source):
+
+        for category, side_dict in source.items():
+            if not isinstance(side_dict, dict) or not side_dict:
+                raise RuntimeError(f"Schema category {category} has no sides")
+
+            for side, chain_dict in side_dict.items():
+                if side not in MIRROR_SIDES:
+                    raise RuntimeError(
+                        f"Schema category {category} has unknown side: {side}")
+                if not isinstance(chain_dict, dict) or not chain_dict:
+                    raise RuntimeError(
+                        f"Schema category {category} side {side} has no chains")
+
+                for name, joints in chain_dict.items():
+                    if not joints or not all(
+                            isinstance(j, str) and j for j in joints):
+                        raise RuntimeError(
+                            f"Schema chain {category}.{side}.{name} has invalid joints")
+
+                    length = MIN_CHAIN_LENGTH.get(category, 1)
+                    if category == "limb" and name in CLAVICLE_CHAINS:
+                        length += 1
+                    if len(joints) < length:
+                        raise RuntimeError(
+                            f"Schema chain {category}.{side}.{name} needs at least "
+                            f"{length} joints, got {len(joints)}")
+
+                    mirror_side = MIRROR_SIDES[side]
+                    mirror = source[category].get(mirror_side, {}).get(name)
+                    if mirror is not None and len(mirror) != len(joints):
+                        raise RuntimeError(
+                            f"Schema chain {category}.{side}.{name} does not "
+                            f"mirror {category}.{mirror_side}.{name}")
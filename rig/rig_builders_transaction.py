@@ -0,0 +1,339 @@
+
+
+import os
+import sys
+from contextlib import contextmanager
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+COMMAND_NAME = "autoRigCommitTransaction"
+PLUGIN_PATH = os.path.abspath(__file__)
+
+INT_NUMERIC_TYPES = (
+    om.MFnNumericData.kByte, om.MFnNumericData.kChar,
+    om.MFnNumericData.kShort, om.MFnNumericData.kInt,
+)
+
+
+def maya_useNewAPI():
+
+    pass
+
+
+class DGTransaction:
+
+    def __init__(self, label="autoRig"):
+
+        self.label = label
+        self.creates = []
+        self.sets = []
+        self.matrices = []
+        self.connections = []
+        self.callbacks = []
+        self.created_names = set()
+        self.renamed = {}
+
+    def __len__(self):
+
+        return (len(self.creates) + len(self.sets) + len(self.matrices)
+                + len(self.connections))
+
+    def create_node(self, node_type, name):
+
+        # The node only exists once the transaction commits, and Maya may
+        # rename it then on a clash. The requested name is returned as a
+        # handle: plugs built from it inside this transaction and arguments
+        # passed to defer() are remapped to the actual name at commit. Any
+        # other use, such as a cmds call or storing it in a registry, has to
+        # happen in a defer() callback. The name is the only handle, so two
+        # creates may not ask for the same one.
+        if name in self.created_names:
+            raise RuntimeError(
+                f"Transaction {self.label} already creates a node named {name}")
+        self.creates.append((node_type, name))
+        self.created_names.add(name)
+        return name
+
+    def set_attr(self, plug, *values):
+
+        self.sets.append((self.reference(plug), values))
+
+    def set_matrix(self, plug, matrix):
+
+        self.matrices.append((self.reference(plug), tuple(matrix)))
+
+    def connect_attr(self, source, destination):
+
+        self.connections.append(
+            (self.reference(source), self.reference(destination)))
+
+    def defer(self, func, *args):
+
+        self.callbacks.append((func, args))
+
+    def reference(self, plug):
+
+        node, _, attr = plug.partition(".")
+        if node in self.created_names:
+            return node, attr
+
+        sel = om.MSelectionList()
+        sel.add(node)
+        return om.MObjectHandle(sel.getDependNode(0)), attr
+
+    def resolve(self, reference):
+
+        node, attr = reference
+        if isinstance(node, str):
+            return f"{self.renamed.get(node, node)}.{attr}"
+
+        obj = node.object()
+        if obj.hasFn(om.MFn.kDagNode):
+            name = om.MFnDagNode(obj).fullPathName()
+        else:
+            name = om.MFnDependencyNode(obj).name()
+        return f"{name}.{attr}"
+
+    def apply(self, modifier):
+
+        created = []
+        for node_type, name in self.creates:
+            obj = modifier.createNode(node_type)
+            modifier.renameNode(obj, name)
+            created.append((obj, name))
+        modifier.doIt()
+
+        for obj, name in created:
+            actual = om.MFnDependencyNode(obj).name()
+            if actual != name:
+                self.renamed[name] = actual
+
+        for plug, values in self.sets:
+            plug = DGTransaction.find_plug(self.resolve(plug))
+            if len(values) == 1:
+                DGTransaction.set_plug(modifier, plug, values[0])
+            else:
+                for index, value in enumerate(values):
+                    DGTransaction.set_plug(modifier, plug.child(index), value)
+
+        for plug, values in self.matrices:
+            modifier.newPlugValue(DGTransaction.find_plug(self.resolve(plug)),
+                                  om.MFnMatrixData().create(om.MMatrix(values)))
+
+        for source, destination in self.connections:
+            modifier.connect(DGTransaction.find_plug(self.resolve(source)),
+                             DGTransaction.find_plug(self.resolve(destination)))
+        modifier.doIt()
+
+    def replay(self):
+
+        for node_type, name in self.creates:
+            actual = cmds.createNode(node_type, name=name)
+            if actual != name:
+                self.renamed[name] = actual
+
+        for plug, values in self.sets:
+            cmds.setAttr(self.resolve(plug), *values)
+
+        for plug, values in self.matrices:
+            cmds.setAttr(self.resolve(plug), *values, type="matrix")
+
+        for source, destination in self.connections:
+            cmds.connectAttr(self.resolve(source), self.resolve(destination))
+
+    def run_callbacks(self):
+
+        for func, args in self.callbacks:
+            func(*[self.renamed.get(arg, arg) if isinstance(arg, str) else arg
+                   for arg in args])
+
+    @staticmethod
+    def find_plug(name):
+
+        sel = om.MSelectionList()
+        sel.add(name)
+        return sel.getPlug(0)
+
+    @staticmethod
+    def set_plug(modifier, plug, value):
+
+        attribute = plug.attribute()
+
+        if isinstance(value, str):
+            modifier.newPlugValueString(plug, value)
+        elif isinstance(value, bool):
+            modifier.newPlugValueBool(plug, value)
+        elif attribute.hasFn(om.MFn.kUnitAttribute):
+            unit_type = om.MFnUnitAttribute(attribute).unitType()
+            if unit_type == om.MFnUnitAttribute.kAngle:
+                modifier.newPlugValueMAngle(
+                    plug, om.MAngle(value, om.MAngle.uiUnit()))
+            elif unit_type == om.MFnUnitAttribute.kDistance:
+                modifier.newPlugValueMDistance(
+                    plug, om.MDistance(value, om.MDistance.uiUnit()))
+            else:
+                modifier.newPlugValueDouble(plug, value)
+        elif attribute.hasFn(om.MFn.kEnumAttribute):
+            modifier.newPlugValueInt(plug, int(value))
+        elif attribute.hasFn(om.MFn.kNumericAttribute):
+            numeric_type = om.MFnNumericAttribute(attribute).numericType()
+            if numeric_type == om.MFnNumericData.kBoolean:
+                modifier.newPlugValueBool(plug, bool(value))
+            elif numeric_type in INT_NUMERIC_TYPES:
+                modifier.newPlugValueInt(plug, int(value))
+            else:
+                modifier.newPlugValueDouble(plug, float(value))
+        else:
+            modifier.newPlugValueDouble(plug, float(value))
+
+
+class DGBatch:
+
+    def __init__(self):
+
+        self.stack = []
+        self.pending = None
+        self.plugin_loaded = None
+        self.commits = 0
+        self.batched_ops = 0
+
+    @property
+    def active(self):
+
+        return self.stack[-1] if self.stack else None
+
+    @contextmanager
+    def transaction(self, label="autoRig"):
+
+        transaction = DGTransaction(label)
+        self.stack.append(transaction)
+        try:
+            yield transaction
+        finally:
+            self.stack.pop()
+
+        self.commit(transaction)
+
+    def create_node(self, node_type, name):
+
+        # Outside a transaction this returns the actual node name. Inside one
+        # it returns the requested name, see DGTransaction.create_node.
+        if self.active is None:
+            return cmds.createNode(node_type, name=name)
+        return self.active.create_node(node_type, name)
+
+    def set_attr(self, plug, *values):
+
+        if self.active is None:
+            cmds.setAttr(plug, *values)
+        else:
+            self.active.set_attr(plug, *values)
+
+    def set_matrix(self, plug, matrix):
+
+        if self.active is None:
+            cmds.setAttr(plug, *matrix, type="matrix")
+        else:
+            self.active.set_matrix(plug, matrix)
+
+    def connect_attr(self, source, destination):
+
+        if self.active is None:
+            cmds.connectAttr(source, destination)
+        else:
+            self.active.connect_attr(source, destination)
+
+    def defer(self, func, *args):
+
+        if self.active is None:
+            func(*args)
+        else:
+            self.active.defer(func, *args)
+
+    def commit(self, transaction):
+
+        if len(transaction):
+            if self.load_plugin():
+                self.pending = transaction
+                try:
+                    getattr(cmds, COMMAND_NAME)()
+                finally:
+                    self.pending = None
+            else:
+                transaction.replay()
+
+            self.commits += 1
+            self.batched_ops += len(transaction)
+
+        transaction.run_callbacks()
+
+    def load_plugin(self):
+
+        if self.plugin_loaded is None:
+            try:
+                if not cmds.pluginInfo(PLUGIN_PATH, query=True, loaded=True):
+                    cmds.loadPlugin(PLUGIN_PATH, quiet=True)
+                self.plugin_loaded = bool(
+                    cmds.pluginInfo(PLUGIN_PATH, query=True, loaded=True))
+            except RuntimeError:
+                self.plugin_loaded = False
+
+        return self.plugin_loaded
+
+    def report(self):
+
+        return {
+            "commits": self.commits,
+            "batched_ops": self.batched_ops,
+        }
+
+
+class CommitTransactionCommand(om.MPxCommand):
+
+    def __init__(self):
+
+        super().__init__()
+        self.modifier = None
+
+    @staticmethod
+    def creator():
+
+        return CommitTransactionCommand()
+
+    def doIt(self, args):
+
+        owner = sys.modules.get("rig.rig_builders_transaction")
+        transaction = owner.DG_BATCH.pending if owner else None
+        if transaction is None:
+            raise RuntimeError(f"{COMMAND_NAME} has no pending transaction")
+
+        self.modifier = om.MDGModifier()
+        transaction.apply(self.modifier)
+
+    def redoIt(self):
+
+        self.modifier.doIt()
+
+    def undoIt(self):
+
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+
+        return True
+
+
+def initializePlugin(plugin):
+
+    om.MFnPlugin(plugin, "autoRigLite", "1.0").registerCommand(
+        COMMAND_NAME, CommitTransactionCommand.creator)
+
+
+def uninitializePlugin(plugin):
+
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
+
+
+DG_BATCH = DGBatch()
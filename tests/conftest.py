@@ -0,0 +1,33 @@
+
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import maya_standin
+
+STANDIN = maya_standin.STANDIN.install()
+
+
+@pytest.fixture
+def standin():
+
+    STANDIN.new_scene()
+    return STANDIN
+
+
+@pytest.fixture
+def watched():
+
+    # Holds the scene watcher as the UI does, so caches outlive a single call.
+    from rig import rig_builders_registry
+
+    holder = object()
+    rig_builders_registry.SCENE_WATCHER.acquire(holder)
+    yield rig_builders_registry.SCENE_WATCHER
+    rig_builders_registry.SCENE_WATCHER.release(holder)
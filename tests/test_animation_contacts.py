@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+
+from anim import animation_contacts
+
+
+ContactDetector = animation_contacts.ContactDetector
+ContactThresholds = animation_contacts.ContactThresholds
+
+
+def y_delta_ranges(heights, start_time, threshold=0.5, min_frames=3):
+
+    # The per-frame loop locomotion_get_foot_lock_ranges ran before
+    # ContactDetector, kept verbatim apart from taking plain columns.
+    locs = range(heights.shape[1])
+    end_time = start_time + len(heights) - 1
+
+    result = {loc: [] for loc in locs}
+    current_ranges = {loc: None for loc in locs}
+    prev_y = {loc: None for loc in locs}
+
+    for frame, row in zip(range(start_time, end_time + 1), heights.tolist()):
+        for loc, y in zip(locs, row):
+            if prev_y[loc] is None:
+                prev_y[loc] = y
+                continue
+
+            delta = abs(y - prev_y[loc])
+            if delta < threshold:
+                if current_ranges[loc] is None:
+                    current_ranges[loc] = [frame - 1, frame]
+                else:
+                    current_ranges[loc][1] = frame
+            else:
+                if current_ranges[loc]:
+                    length = current_ranges[loc][1] - \
+                        current_ranges[loc][0] + 1
+                    if length >= min_frames:
+                        result[loc].append(tuple(current_ranges[loc]))
+                    current_ranges[loc] = None
+
+            prev_y[loc] = y
+
+    for loc in locs:
+        if current_ranges[loc]:
+            length = current_ranges[loc][1] - current_ranges[loc][0] + 1
+            if length >= min_frames:
+                result[loc].append(tuple(current_ranges[loc]))
+
+    return [result[loc] for loc in locs]
+
+
+def random_trace(rng, frames, feet):
+
+    # Feet alternate between planted stretches with a little jitter and
+    # swings with large vertical steps, so every threshold sees both.
+    positions = rng.normal(0.0, 0.2, (frames, feet, 3))
+    swinging = rng.random((frames, feet)) < 0.3
+    positions[..., 1] += np.where(swinging, rng.uniform(-3.0, 3.0, (frames, feet)), 0.0)
+    return np.cumsum(positions, axis=0) * [1.0, 0.0, 1.0] + positions * [0.0, 1.0, 0.0]
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("threshold, min_frames", [(0.5, 3), (0.25, 2), (1.0, 5), (0.5, 1)])
+def test_detect_matches_the_y_delta_loop(seed, threshold, min_frames):
+
+    rng = np.random.default_rng(seed)
+    positions = random_trace(rng, int(rng.integers(2, 300)), 2)
+    start_time = int(rng.integers(-50, 50))
+
+    assert ContactDetector.detect(positions, start_time, ContactThresholds(
+        vertical_speed=threshold, min_frames=min_frames)) == y_delta_ranges(
+        positions[..., 1], start_time, threshold, min_frames)
+
+
+def test_default_thresholds_match_the_y_delta_loop():
+
+    positions = random_trace(np.random.default_rng(99), 500, 4)
+
+    assert ContactDetector.detect(positions, 10) == y_delta_ranges(positions[..., 1], 10)
+
+
+def test_detect_needs_two_frames():
+
+    assert ContactDetector.detect(np.zeros((1, 2, 3))) == [[], []]
+    assert ContactDetector.detect(np.zeros((0, 3, 3))) == [[], [], []]
+
+
+def trace(heights, travel=None):
+
+    positions = np.zeros((len(heights), 1, 3))
+    positions[:, 0, 1] = heights
+    if travel is not None:
+        positions[:, 0, 2] = np.cumsum(travel)
+    return positions
+
+
+def test_height_rejects_flat_steps_off_the_ground():
+
+    # Two flat stretches, one on the ground and one held 5 units up.
+    positions = trace([0, 0, 0, 0, 5, 5, 5, 5, 0, 0, 0])
+
+    assert ContactDetector.detect(positions) == [[(0, 3), (4, 7), (8, 10)]]
+    assert ContactDetector.detect(positions, 0, ContactThresholds(height=1.0)) == [
+        [(0, 3), (8, 10)]]
+    assert ContactDetector.detect(positions, 0, ContactThresholds(height=5.0)) == [
+        [(0, 3), (4, 7), (8, 10)]]
+
+
+def test_height_is_measured_from_the_lowest_point_of_each_foot():
+
+    positions = np.concatenate([trace([2, 2, 2, 9, 9, 9]), trace([7, 7, 7, 0, 0, 0])], axis=1)
+
+    assert ContactDetector.detect(positions, 0, ContactThresholds(height=0.5)) == [
+        [(0, 2)], [(3, 5)]]
+
+
+def test_horizontal_speed_rejects_sliding_feet():
+
+    # Flat throughout, but the foot slides 2 units per frame in the middle.
+    positions = trace(np.zeros(10), travel=[0, 0, 0, 0, 2, 2, 2, 0, 0, 0])
+
+    assert ContactDetector.detect(positions) == [[(0, 9)]]
+    assert ContactDetector.detect(positions, 0, ContactThresholds(horizontal_speed=1.0)) == [
+        [(0, 3), (6, 9)]]
+    assert ContactDetector.detect(positions, 0, ContactThresholds(horizontal_speed=2.5)) == [
+        [(0, 9)]]
+
+
+def test_horizontal_speed_uses_the_xz_distance():
+
+    positions = np.zeros((4, 1, 3))
+    positions[:, 0, 0] = [0.0, 0.6, 1.2, 1.8]
+    positions[:, 0, 2] = [0.0, 0.8, 1.6, 2.4]
+
+    assert ContactDetector.detect(positions, 0, ContactThresholds(horizontal_speed=1.01)) == [
+        [(0, 3)]]
+    assert ContactDetector.detect(positions, 0, ContactThresholds(horizontal_speed=0.99)) == [[]]
+
+
+@pytest.mark.parametrize("min_frames, expected", [
+    (1, [(0, 1), (2, 4), (5, 8)]),
+    (2, [(0, 1), (2, 4), (5, 8)]),
+    (3, [(2, 4), (5, 8)]),
+    (4, [(5, 8)]),
+    (5, []),
+])
+def test_min_frames_counts_the_frames_a_range_holds(min_frames, expected):
+
+    # Contacts over 2, 3 and 4 frames separated by single swing steps.
+    positions = trace([0, 0, 5, 5, 5, 0, 0, 0, 0])
+
+    assert ContactDetector.detect(positions, 0, ContactThresholds(min_frames=min_frames)) == [
+        expected]
+
+
+def test_criteria_combine():
+
+    # The raised stretch fails height; the slide splits the last stretch into
+    # two runs too short for min_frames.
+    positions = trace([0, 0, 0, 0, 3, 3, 3, 3, 0, 0, 0, 0],
+                      travel=[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0])
+    thresholds = ContactThresholds(horizontal_speed=1.0, height=1.0, min_frames=3)
+
+    assert ContactDetector.detect(positions, 100, thresholds) == [[(100, 103)]]
+
+
+def test_thresholds_round_trip_through_dicts():
+
+    thresholds = ContactThresholds(0.25, 1.5, 2.0, 4)
+
+    assert ContactThresholds.from_dict(
+        dict(thresholds.as_dict(), unknown=1)).as_dict() == thresholds.as_dict()
+    assert ContactThresholds.from_dict({}).as_dict() == ContactThresholds().as_dict()
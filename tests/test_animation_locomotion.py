@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from anim import animation_locomotion
+
+
+AnimationLocomotion = animation_locomotion.AnimationLocomotion
+RIG_CTX = animation_locomotion.RIG_CTX
+ANIM_CTX = animation_locomotion.ANIM_CTX
+SCHEMA = animation_locomotion.SCHEMA
+SAMPLER = animation_locomotion.SAMPLER
+
+
+def rolling_foot(frames, travel, roll):
+
+    # Row-vector matrices of a foot joint 10 units up that travels along Z
+    # while it rolls about X.
+    matrices = np.tile(np.eye(4), (frames, 1, 1))
+    for frame, t in enumerate(np.linspace(0.0, 1.0, frames)):
+        angle = np.radians(roll * t)
+        c, s = np.cos(angle), np.sin(angle)
+        matrices[frame, 1:3, 1:3] = [[c, s], [-s, c]]
+        matrices[frame, 3, :3] = (0.0, 10.0, travel * t)
+    return matrices
+
+
+def build_walk(cmds, monkeypatch, start, end, travel):
+
+    RIG_CTX.clear()
+    ANIM_CTX.clear()
+
+    feet = [chain for chain in SCHEMA.chains("limb") if not chain.clavicle]
+    for chain in feet:
+        ik_ctrl = cmds.group(empty=True, name=f"{chain.end}_ik_CTRL")
+        cmds.setAttr(f"{ik_ctrl}.translate", 0, 0, 15)
+        RIG_CTX.control_registry.setdefault("ik", {})[chain.end] = ik_ctrl
+        joint = cmds.createNode("joint", name=f"{chain.end}_retarget")
+        ANIM_CTX.retarget_joint_registry.setdefault("walk", {})[chain.end] = (
+            cmds.ls(joint, long=True)[0])
+    ANIM_CTX.retarget_time_registry["walk"] = [start, end]
+
+    # The stand-in does not evaluate world matrices over time, so the sampled
+    # foot matrices are supplied directly.
+    matrices = rolling_foot(end - start + 1, travel, 60.0)
+    monkeypatch.setattr(
+        SAMPLER, "sample_matrices",
+        lambda nodes, start, end: np.stack([matrices] * len(nodes), axis=1))
+
+    return cmds.createNode("network", name="walk_group_animMeta")
+
+
+def test_base_distance_ignores_foot_roll(standin, monkeypatch):
+
+    cmds = standin.cmds
+    meta_node = build_walk(cmds, monkeypatch, 10, 20, 50.0)
+
+    AnimationLocomotion().locomotion_base_distance("walk")
+
+    assert cmds.getAttr(f"{meta_node}.strideL") == pytest.approx(50.0)
+    assert cmds.getAttr(f"{meta_node}.strideR") == pytest.approx(50.0)
+    assert cmds.getAttr(f"{meta_node}.totalTravel") == pytest.approx(100.0)
+    assert cmds.getAttr(f"{meta_node}.perFrameDistance") == pytest.approx(10.0)
+
+
+def test_base_distance_of_single_frame_clip(standin, monkeypatch):
+
+    cmds = standin.cmds
+    meta_node = build_walk(cmds, monkeypatch, 0, 0, 0.0)
+
+    AnimationLocomotion().locomotion_base_distance("walk")
+
+    assert cmds.getAttr(f"{meta_node}.perFrameDistance") == 0.0
+    assert ANIM_CTX.locomotion_registry["per_frame_distance"] == 0.0
@@ -0,0 +1,52 @@
+from anim import animation_sampler
+
+
+SAMPLER = animation_sampler.SAMPLER
+SCENE_WATCHER = animation_sampler.SCENE_WATCHER
+
+
+def sample(standin, ctrl):
+
+    standin.reset_calls()
+    values = SAMPLER.sample([f"{ctrl}.translateX"], 0, 10)
+    return values, standin.calls["listHistory"]
+
+
+def test_fingerprint_is_reused_until_the_scene_changes(standin, watched):
+
+    cmds = standin.cmds
+    ctrl = cmds.group(empty=True, name="ctrl")
+    cmds.setKeyframe(ctrl, attribute="translateX", time=0, value=0)
+    cmds.setKeyframe(ctrl, attribute="translateX", time=10, value=10)
+
+    values, history_calls = sample(standin, ctrl)
+    assert history_calls > 0
+    assert values[10, 0] == 10.0
+
+    _, history_calls = sample(standin, ctrl)
+    assert history_calls == 0
+
+    cmds.setKeyframe(ctrl, attribute="translateX", time=10, value=20)
+    _, history_calls = sample(standin, ctrl)
+    assert history_calls > 0
+
+    driver = cmds.group(empty=True, name="driver")
+    cmds.connectAttr(f"{driver}.translateY", f"{ctrl}.translateZ")
+    _, history_calls = sample(standin, ctrl)
+    assert history_calls > 0
+
+
+def test_sampling_does_not_keep_the_watcher_installed(standin):
+
+    cmds = standin.cmds
+    ctrl = cmds.group(empty=True, name="ctrl")
+    cmds.setKeyframe(ctrl, attribute="translateX", time=0, value=0)
+
+    assert not SCENE_WATCHER.holders
+    _, history_calls = sample(standin, ctrl)
+    assert history_calls > 0
+    assert not SCENE_WATCHER.installed
+
+    # Unwatched, the next sample cannot trust the last fingerprint.
+    _, history_calls = sample(standin, ctrl)
+    assert history_calls > 0
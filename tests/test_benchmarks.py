@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks import run_benchmarks
+
+
+BUDGETS = run_benchmarks.load_budgets(run_benchmarks.BUDGETS_PATH)
+
+
+@pytest.mark.parametrize("benchmark", run_benchmarks.BENCHMARKS,
+                         ids=lambda benchmark: benchmark.name)
+def test_benchmark_within_budget(benchmark):
+
+    result = run_benchmarks.measure(benchmark, 3)
+
+    failures = run_benchmarks.check(
+        result, BUDGETS.get(benchmark.name), run_benchmarks.CALL_TOLERANCE,
+        run_benchmarks.TIME_TOLERANCE, run_benchmarks.TIME_FLOOR)
+
+    assert not failures, "\n".join(failures)
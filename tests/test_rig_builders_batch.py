@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+
+import pytest
+
+from rig import rig_builders_batch
+
+
+BatchJob = rig_builders_batch.BatchJob
+BatchManifest = rig_builders_batch.BatchManifest
+BatchRunner = rig_builders_batch.BatchRunner
+
+STANDIN_WORKER = [sys.executable, "-m", "benchmarks.batch_standin"]
+
+
+@pytest.fixture
+def scenes(tmp_path):
+
+    source_dir = tmp_path / "scenes"
+    source_dir.mkdir()
+    (source_dir / "hero.ma").write_text("{}\n")
+
+    output_dir = tmp_path / "rigged"
+    jobs = BatchJob.collect(str(source_dir), str(output_dir))
+    manifest = BatchManifest(str(output_dir / rig_builders_batch.MANIFEST_NAME))
+
+    return jobs, manifest
+
+
+def test_worker_rigs_scene(scenes):
+
+    jobs, manifest = scenes
+
+    BatchRunner(STANDIN_WORKER, max_workers=1).run(jobs, manifest)
+
+    entry = BatchManifest(manifest.path).jobs["hero.ma"]
+    assert entry["status"] == "ok"
+    assert entry["nodes"] > 0
+    assert [rig["namespace"] for rig in entry["rigs"]] == [""]
+    assert os.path.exists(jobs[0].target)
+
+
+def test_worker_saves_a_manifest_per_character(tmp_path):
+
+    source_dir = tmp_path / "scenes"
+    source_dir.mkdir()
+    (source_dir / "crowd.ma").write_text(json.dumps({"namespaces": ["", "charA"]}))
+    output_dir = tmp_path / "rigged"
+    jobs = BatchJob.collect(str(source_dir), str(output_dir))
+    manifest = BatchManifest(str(output_dir / rig_builders_batch.MANIFEST_NAME))
+
+    BatchRunner(STANDIN_WORKER, max_workers=1).run(jobs, manifest)
+
+    rigs = manifest.jobs["crowd.ma"]["rigs"]
+    assert [rig["manifest"] for rig in rigs] == [
+        "autoRig_manifest", "charA:autoRig_manifest"]
+    with open(jobs[0].target) as handle:
+        saved = json.load(handle)
+    assert all(rig["manifest"] in saved for rig in rigs)
+
+
+def test_up_to_date_scene_is_skipped(scenes):
+
+    jobs, manifest = scenes
+    job = jobs[0]
+    os.makedirs(os.path.dirname(job.target))
+    with open(job.target, "w") as handle:
+        handle.write("[]\n")
+    source_time = os.path.getmtime(job.source)
+    os.utime(job.target, (source_time + 10.0, source_time + 10.0))
+
+    # A worker that always fails proves no job is started.
+    failing = BatchRunner([sys.executable, "-c", "raise SystemExit(1)"])
+
+    failing.run(jobs, manifest)
+    assert manifest.jobs["hero.ma"]["status"] == "skipped"
+
+    manifest.update("hero.ma", {"status": "ok", "nodes": 7})
+    failing.run(jobs, manifest)
+    assert manifest.jobs["hero.ma"] == {"status": "ok", "nodes": 7}
+
+    BatchRunner(STANDIN_WORKER, max_workers=1).run(jobs, manifest, force=True)
+    assert manifest.jobs["hero.ma"]["status"] == "ok"
+    assert manifest.jobs["hero.ma"]["nodes"] > 7
+
+
+def test_failed_worker_is_recorded(scenes):
+
+    jobs, manifest = scenes
+    worker = [sys.executable, "-c", "import sys; sys.exit('worker crashed')"]
+
+    BatchRunner(worker, max_workers=1).run(jobs, manifest)
+
+    entry = manifest.jobs["hero.ma"]
+    assert entry["status"] == "failed"
+    assert entry["returncode"] == 1
+    assert entry["error"] == "worker crashed"
+    assert manifest.summary() == {"failed": 1}
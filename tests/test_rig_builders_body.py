@@ -0,0 +1,102 @@
+import io
+import contextlib
+
+import numpy as np
+
+from rig import rig_builders_body
+from rig import rig_builders_pipeline
+from benchmarks import synthetic_scene
+
+
+RigBuilder = rig_builders_pipeline.RigBuilder
+BSplineCurve = rig_builders_body.BSplineCurve
+SCHEMA = rig_builders_body.SCHEMA
+runtime = rig_builders_pipeline.rig_builders_runtime
+RIG_CTX = runtime.RIG_CTX
+UE5_SCHEMA = runtime.UE5_SCHEMA
+
+
+def build_spine(standin, spine_mode):
+
+    standin.new_scene()
+    RIG_CTX.clear()
+    root = synthetic_scene.build_ue5_skeleton(UE5_SCHEMA)
+    with contextlib.redirect_stdout(io.StringIO()):
+        RigBuilder.build_auto_rig(root, spine_mode=spine_mode)
+
+    return SCHEMA.chains("spine")[0], RIG_CTX.joint_registry["ik"]
+
+
+def aim_rotation(position, target):
+
+    aim = np.asarray(target) - position
+    aim /= np.linalg.norm(aim)
+    up = np.asarray(rig_builders_body.SPINE_WORLD_UP, dtype=float)
+    up = up - aim * (up @ aim)
+    up /= np.linalg.norm(up)
+    world = np.array([aim, up, np.cross(aim, up)])
+    local = np.array([rig_builders_body.SPINE_AIM_VECTOR,
+                      rig_builders_body.SPINE_UP_VECTOR,
+                      np.cross(rig_builders_body.SPINE_AIM_VECTOR,
+                               rig_builders_body.SPINE_UP_VECTOR)], dtype=float)
+    return np.linalg.inv(local) @ world
+
+
+def curve_mode_rest(standin, chain, ik_joints):
+
+    # The stand-in does not evaluate motion paths or constraints, so rebuild
+    # what they give at rest: each driver sits on the curve at its uValue,
+    # the inner ones aim at the next driver, and the ik joints follow.
+    cmds = standin.cmds
+    spline = BSplineCurve.from_node(cmds.ls("spine_IK_EP_CRV", long=True)[0])
+    params = [cmds.getAttr(f"{joint_name}_spine_MP.uValue") for joint_name in chain.drivers]
+    positions = spline.points(np.asarray(params))
+
+    matrices = {}
+    for i, joint_name in enumerate(chain.drivers):
+        matrix = np.array(cmds.xform(ik_joints[joint_name], q=True, m=True, ws=True)).reshape(4, 4)
+        if 0 < i < len(chain.drivers) - 1:
+            matrix[:3, :3] = aim_rotation(positions[i], positions[i + 1])
+        matrix[3, :3] = positions[i]
+        matrices[joint_name] = matrix
+
+    return matrices
+
+
+def matrix_mode_world(standin, ik_joint):
+
+    cmds = standin.cmds
+    assert cmds.getAttr(f"{ik_joint}.inheritsTransform") == 0
+    source = cmds.listConnections(f"{ik_joint}.offsetParentMatrix", plugs=True)[0]
+    offset = np.array(cmds.getAttr(source)).reshape(4, 4)
+    return standin.scene.node(ik_joint).local_matrix() @ offset
+
+
+def test_matrix_spine_matches_curve_spine_at_rest(standin):
+
+    chain, ik_joints = build_spine(standin, runtime.SPINE_CURVE)
+    expected = curve_mode_rest(standin, chain, ik_joints)
+
+    chain, ik_joints = build_spine(standin, runtime.SPINE_MATRIX)
+    for joint_name in chain.drivers:
+        np.testing.assert_allclose(
+            matrix_mode_world(standin, ik_joints[joint_name]),
+            expected[joint_name], atol=1.0e-3, err_msg=joint_name)
+
+
+def test_matrix_spine_twists_the_drivers_curve_spine_twists(standin):
+
+    def twisted(ik_ctrls, chain):
+        plugs = standin.cmds.listConnections(
+            f"{ik_ctrls[chain.mid]}.rotateY", source=False, plugs=True) or []
+        return sorted(plug.split(".")[0].split("|")[-1] for plug in plugs)
+
+    chain, _ = build_spine(standin, runtime.SPINE_CURVE)
+    curve_twisted = twisted(RIG_CTX.control_registry["ik"], chain)
+
+    chain, _ = build_spine(standin, runtime.SPINE_MATRIX)
+    matrix_twisted = twisted(RIG_CTX.control_registry["ik"], chain)
+
+    assert curve_twisted == [f"{name}_spine_driver_JNT_aimConstraint1"
+                             for name in (chain.mid, chain.end)]
+    assert matrix_twisted == [f"{name}_spine_twist_CM" for name in (chain.mid, chain.end)]
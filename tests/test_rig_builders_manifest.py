@@ -0,0 +1,43 @@
+import io
+import contextlib
+
+from rig import rig_builders_manifest
+from rig import rig_builders_pipeline
+from anim import animation_runtime
+from benchmarks import synthetic_scene
+
+
+RigManifest = rig_builders_manifest.RigManifest
+RigBuilder = rig_builders_pipeline.RigBuilder
+RIG_CONTEXTS = rig_builders_pipeline.rig_builders_runtime.RIG_CONTEXTS
+UE5_SCHEMA = rig_builders_pipeline.rig_builders_runtime.UE5_SCHEMA
+ANIM_CONTEXTS = animation_runtime.ANIM_CONTEXTS
+
+
+def test_each_character_keeps_its_own_manifest(standin):
+
+    namespaces = ["", "charA"]
+    for namespace in namespaces:
+        rig_ctx = RIG_CONTEXTS.get(namespace)
+        rig_ctx.clear()
+        with rig_ctx.scope():
+            root = synthetic_scene.build_ue5_skeleton(UE5_SCHEMA)
+        with contextlib.redirect_stdout(io.StringIO()):
+            RigBuilder.build_auto_rig(root, rig_ctx)
+
+    expected = {}
+    for namespace in namespaces:
+        rig_ctx = RIG_CONTEXTS.get(namespace)
+        node = RigManifest.write(rig_ctx, ANIM_CONTEXTS.get(namespace))
+        assert node == RigManifest.node_name(namespace)
+        expected[namespace] = rig_ctx.control_registry.get("fk", {}).get("pelvis")
+        rig_ctx.clear()
+
+    assert RigManifest.namespaces() == namespaces
+    assert all(expected.values())
+    assert expected[""] != expected["charA"]
+
+    for namespace in namespaces:
+        rig_ctx = RIG_CONTEXTS.get(namespace)
+        assert RigManifest.restore(rig_ctx, ANIM_CONTEXTS.get(namespace))
+        assert rig_ctx.control_registry.get("fk", {}).get("pelvis") == expected[namespace]
@@ -0,0 +1,144 @@
+
+
+import itertools
+
+import numpy as np
+import pytest
+
+from rig import rig_builders_matrix
+from rig.rig_builders_matrix import (
+    ROTATE_ORDERS, compose_matrices, decompose_matrices,
+    euler_to_matrices, matrices_to_euler)
+
+
+ROTATIONS = [(30.0, -45.0, 60.0), (-120.0, 10.0, 170.0), (0.0, 0.0, 0.0), (5.0, 80.0, -5.0)]
+
+
+def assert_same_transform(translate, rotate, scale, shear, rotate_order):
+
+    matrices = compose_matrices(translate, rotate, scale, shear, rotate_order)
+    result = decompose_matrices(matrices, rotate_order)
+
+    assert all(np.isfinite(channel).all() for channel in result)
+    np.testing.assert_allclose(compose_matrices(*result, rotate_order=rotate_order),
+                               matrices, atol=1.0e-9)
+    return result
+
+
+def test_translate_matrix():
+
+    expected = np.eye(4)
+    expected[3, :3] = (1.0, 2.0, 3.0)
+
+    np.testing.assert_allclose(compose_matrices(translate=(1.0, 2.0, 3.0))[0], expected)
+
+
+@pytest.mark.parametrize("axis, expected", [
+    (0, [[1, 0, 0], [0, 0, 1], [0, -1, 0]]),
+    (1, [[0, 0, -1], [0, 1, 0], [1, 0, 0]]),
+    (2, [[0, 1, 0], [-1, 0, 0], [0, 0, 1]]),
+])
+def test_rotate_90_matrices(axis, expected):
+
+    rotation = [0.0, 0.0, 0.0]
+    rotation[axis] = 90.0
+
+    np.testing.assert_allclose(euler_to_matrices(rotation)[0], expected, atol=1.0e-12)
+
+
+def test_rotate_order_applies_first_axis_first():
+
+    x = euler_to_matrices((90.0, 0.0, 0.0))[0]
+    y = euler_to_matrices((0.0, 90.0, 0.0))[0]
+
+    np.testing.assert_allclose(euler_to_matrices((90.0, 90.0, 0.0), "xyz")[0], x @ y,
+                               atol=1.0e-12)
+    np.testing.assert_allclose(euler_to_matrices((90.0, 90.0, 0.0), "yxz")[0], y @ x,
+                               atol=1.0e-12)
+
+
+def test_scale_and_shear_matrix():
+
+    matrix = compose_matrices(scale=(2.0, 3.0, 4.0), shear=(0.5, 0.25, 0.75))[0]
+
+    np.testing.assert_allclose(matrix[:3, :3], [[2.0, 0.0, 0.0],
+                                                [1.5, 3.0, 0.0],
+                                                [1.0, 3.0, 4.0]])
+
+
+def test_decompose_known_matrix():
+
+    matrix = np.array([[0.0, 2.0, 0.0, 0.0],
+                       [-3.0, 0.0, 0.0, 0.0],
+                       [0.0, 0.0, 4.0, 0.0],
+                       [5.0, 6.0, 7.0, 1.0]])
+
+    translate, rotate, scale, shear = decompose_matrices(matrix)
+
+    np.testing.assert_allclose(translate[0], (5.0, 6.0, 7.0))
+    np.testing.assert_allclose(rotate[0], (0.0, 0.0, 90.0), atol=1.0e-9)
+    np.testing.assert_allclose(scale[0], (2.0, 3.0, 4.0))
+    np.testing.assert_allclose(shear[0], (0.0, 0.0, 0.0), atol=1.0e-12)
+
+
+@pytest.mark.parametrize("rotate_order", ROTATE_ORDERS)
+def test_round_trip_every_rotate_order(rotate_order):
+
+    middle = rig_builders_matrix._AXIS_INDEX[rotate_order[1]]
+    for rotation in ROTATIONS:
+        translate, rotate, scale, shear = assert_same_transform(
+            (1.0, -2.0, 3.5), rotation, (1.5, 0.5, 2.0), (0.2, -0.1, 0.3), rotate_order)
+
+        np.testing.assert_allclose(translate[0], (1.0, -2.0, 3.5))
+        np.testing.assert_allclose(scale[0], (1.5, 0.5, 2.0))
+        np.testing.assert_allclose(shear[0], (0.2, -0.1, 0.3), atol=1.0e-12)
+        # Angles only come back unchanged inside the +-90 middle axis range.
+        if abs(rotation[middle]) < 90.0:
+            np.testing.assert_allclose(rotate[0], rotation, atol=1.0e-9)
+
+
+def test_round_trip_mixed_rotate_orders_in_one_batch():
+
+    rotations = [ROTATIONS[0]] * len(ROTATE_ORDERS)
+    orders = list(range(len(ROTATE_ORDERS)))
+
+    matrices = euler_to_matrices(rotations, orders)
+
+    np.testing.assert_allclose(matrices_to_euler(matrices, orders),
+                               rotations, atol=1.0e-9)
+
+
+@pytest.mark.parametrize("rotate_order, angle", list(itertools.product(ROTATE_ORDERS, (90.0, -90.0))))
+def test_gimbal_lock_on_middle_axis(rotate_order, angle):
+
+    rotation = [0.0, 0.0, 0.0]
+    first, middle, last = (rig_builders_matrix._AXIS_INDEX[a] for a in rotate_order)
+    rotation[first] = 25.0
+    rotation[middle] = angle
+    rotation[last] = 40.0
+
+    _, rotate, _, _ = assert_same_transform(None, rotation, None, None, rotate_order)
+
+    assert rotate[0, middle] == pytest.approx(angle)
+    assert rotate[0, last] == 0.0
+
+
+@pytest.mark.parametrize("scale", [(-1.0, 2.0, 3.0), (1.0, -2.0, 3.0), (-1.0, -1.0, -1.0)])
+def test_negative_scale(scale):
+
+    _, _, result, _ = assert_same_transform(
+        (0.0, 1.0, 0.0), (10.0, 20.0, 30.0), scale, None, "xyz")
+
+    np.testing.assert_allclose(np.abs(result[0]), np.abs(scale))
+    assert np.prod(result[0]) < 0.0
+    assert result[0, 2] < 0.0
+
+
+@pytest.mark.parametrize("scale", [(0.0, 1.0, 1.0), (1.0, 0.0, 2.0), (1.0, 1.0, 0.0),
+                                   (0.0, 0.0, 1.0), (0.0, 0.0, 0.0)])
+def test_zero_scale_stays_finite(scale):
+
+    _, _, result, _ = assert_same_transform(
+        (1.0, 2.0, 3.0), (30.0, 40.0, 50.0), scale, None, "zxy")
+
+    np.testing.assert_allclose(result[0], scale, atol=1.0e-12)
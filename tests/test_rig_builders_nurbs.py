@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+from rig import rig_builders_nurbs
+
+
+BSplineCurve = rig_builders_nurbs.BSplineCurve
+
+# Maya-style knot vectors for degree 3: len(cvs) + degree - 1 knots.
+KNOTS = {
+    "bezier": [0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+    "uniform": [0.0, 0.0, 0.0, 1.0, 2.0, 3.0, 3.0, 3.0],
+    "non_uniform": [0.0, 0.0, 0.0, 0.4, 1.5, 1.7, 3.2, 3.2, 3.2],
+}
+
+
+def make_curve(name):
+
+    knots = KNOTS[name]
+    cvs = np.random.default_rng(len(knots)).uniform(-10.0, 10.0, (len(knots) - 2, 3))
+    return BSplineCurve(cvs, knots, 3)
+
+
+def cox_de_boor(knots, i, degree, t):
+
+    if degree == 0:
+        if knots[i] <= t < knots[i + 1]:
+            return 1.0
+        # The domain end belongs to the last non-empty span.
+        last = max(j for j in range(len(knots) - 1) if knots[j] < knots[j + 1])
+        return 1.0 if t == knots[-1] and i == last else 0.0
+
+    value = 0.0
+    if knots[i + degree] > knots[i]:
+        value += ((t - knots[i]) / (knots[i + degree] - knots[i])
+                  * cox_de_boor(knots, i, degree - 1, t))
+    if knots[i + degree + 1] > knots[i + 1]:
+        value += ((knots[i + degree + 1] - t) / (knots[i + degree + 1] - knots[i + 1])
+                  * cox_de_boor(knots, i + 1, degree - 1, t))
+    return value
+
+
+def cox_de_boor_derivative(knots, i, degree, t):
+
+    value = 0.0
+    if knots[i + degree] > knots[i]:
+        value += degree / (knots[i + degree] - knots[i]) * cox_de_boor(
+            knots, i, degree - 1, t)
+    if knots[i + degree + 1] > knots[i + 1]:
+        value -= degree / (knots[i + degree + 1] - knots[i + 1]) * cox_de_boor(
+            knots, i + 1, degree - 1, t)
+    return value
+
+
+def reference_basis(curve, params, function=cox_de_boor):
+
+    return np.array([[function(curve.knots, i, curve.degree, t)
+                      for i in range(len(curve.cvs))] for t in params])
+
+
+def params_of(curve, count=41):
+
+    return curve.normalized_params(np.linspace(0.0, 1.0, count))
+
+
+@pytest.mark.parametrize("name", sorted(KNOTS))
+def test_points_match_cox_de_boor(name):
+
+    curve = make_curve(name)
+    params = params_of(curve)
+
+    np.testing.assert_allclose(
+        curve.points(params), reference_basis(curve, params) @ curve.cvs, atol=1.0e-9)
+
+
+@pytest.mark.parametrize("name", sorted(KNOTS))
+def test_tangents_match_cox_de_boor_derivative(name):
+
+    curve = make_curve(name)
+    params = params_of(curve)
+    expected = reference_basis(curve, params, cox_de_boor_derivative) @ curve.cvs
+
+    np.testing.assert_allclose(curve.tangents(params), expected, atol=1.0e-9)
+    np.testing.assert_allclose(curve.derivative().points(params), expected, atol=1.0e-9)
+
+
+@pytest.mark.parametrize("name", sorted(KNOTS))
+def test_basis_matches_cox_de_boor_and_sums_to_one(name):
+
+    curve = make_curve(name)
+    params = params_of(curve)
+    basis = curve.basis(params)
+
+    np.testing.assert_allclose(basis, reference_basis(curve, params), atol=1.0e-12)
+    np.testing.assert_allclose(basis.sum(axis=1), 1.0, atol=1.0e-12)
+    assert (basis >= 0.0).all()
+
+
+def test_bezier_basis_is_bernstein():
+
+    curve = make_curve("bezier")
+    t = np.linspace(0.0, 1.0, 11)
+
+    np.testing.assert_allclose(curve.basis(t), np.stack(
+        [(1 - t) ** 3, 3 * t * (1 - t) ** 2, 3 * t ** 2 * (1 - t), t ** 3], axis=1),
+        atol=1.0e-12)
+
+
+@pytest.mark.parametrize("name", sorted(KNOTS))
+def test_normalized_params_span_the_domain(name):
+
+    curve = make_curve(name)
+    start, end = KNOTS[name][0], KNOTS[name][-1]
+
+    assert curve.domain() == (start, end)
+    np.testing.assert_allclose(
+        curve.normalized_params([0.0, 0.25, 1.0]),
+        [start, start + 0.25 * (end - start), end])
+    np.testing.assert_allclose(curve.points(curve.normalized_params([0.0, 1.0])),
+                               curve.cvs[[0, -1]], atol=1.0e-12)
+
+
+@pytest.mark.parametrize("name", sorted(KNOTS))
+def test_closest_params_recovers_points_on_the_curve(name):
+
+    curve = make_curve(name)
+    params = params_of(curve, count=13)
+
+    np.testing.assert_allclose(
+        curve.closest_params(curve.points(params)), params, atol=1.0e-6)
+
+
+@pytest.mark.parametrize("name", sorted(KNOTS))
+def test_closest_params_beats_dense_sampling(name):
+
+    curve = make_curve(name)
+    positions = np.random.default_rng(7).uniform(-12.0, 12.0, (20, 3))
+
+    found = curve.points(curve.closest_params(positions))
+    dense = reference_basis(curve, params_of(curve, count=2001)) @ curve.cvs
+    nearest = np.min(np.linalg.norm(positions[:, None] - dense[None], axis=2), axis=1)
+
+    assert (np.linalg.norm(found - positions, axis=1) <= nearest + 1.0e-6).all()
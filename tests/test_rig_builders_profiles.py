@@ -0,0 +1,91 @@
+import io
+import contextlib
+
+import numpy as np
+import pytest
+
+from rig import rig_builders_pipeline
+from benchmarks import synthetic_scene
+
+
+runtime = rig_builders_pipeline.rig_builders_runtime
+RigBuilder = rig_builders_pipeline.RigBuilder
+RIG_CTX = runtime.RIG_CTX
+UE5_SCHEMA = runtime.UE5_SCHEMA
+SCHEMA = runtime.SCHEMA
+PROFILES = runtime.PROFILES
+SkeletonProfile = runtime.rig_builders_profiles.SkeletonProfile
+
+
+def source_joints(profile_name):
+
+    profile = PROFILES.get(profile_name)
+    layout = synthetic_scene.profile_joint_layout(UE5_SCHEMA, profile)
+    return [f"|char:{source_name}" for source_name, _, _, _ in layout]
+
+
+@pytest.mark.parametrize("profile_name", ["ue5", "ue4", "mixamo"])
+def test_detect_picks_the_profile_the_names_come_from(profile_name):
+
+    assert PROFILES.detect(source_joints(profile_name)).name == profile_name
+
+
+def test_detect_rejects_unknown_skeletons():
+
+    with pytest.raises(RuntimeError, match="No skeleton profile matches"):
+        PROFILES.detect(["Bip01", "Bip01_Pelvis", "Bip01_Spine"])
+
+
+def test_map_joints_uses_profile_aliases():
+
+    profile, mapped = PROFILES.map_joints(
+        ["|Hips", "|Hips|Spine|Spine1", "|Hips|Spine|Spine1|Spine2|LeftShoulder|LeftArm"],
+        PROFILES.get("mixamo"))
+
+    assert profile.name == "mixamo"
+    assert mapped == {
+        "pelvis": "|Hips",
+        "spine_03": "|Hips|Spine|Spine1",
+        "upperarm_l": "|Hips|Spine|Spine1|Spine2|LeftShoulder|LeftArm",
+    }
+
+    ue4 = PROFILES.get("ue4")
+    assert ue4.canonical("spine_02") == "spine_03"
+    assert ue4.canonical(SkeletonProfile.proxy_name("spine_02")) == "spine_02"
+    assert SkeletonProfile.proxy_name("spine_02") not in ue4.signature
+
+
+def test_proxy_between_unmapped_joints_is_rejected():
+
+    with pytest.raises(RuntimeError, match="unmapped joints"):
+        SkeletonProfile("broken", {"pelvis": "Hips"},
+                        {"spine_01": ("pelvis", "spine_03", 0.5)})
+
+
+@pytest.mark.parametrize("profile_name", ["ue4", "mixamo"])
+def test_profile_skeleton_builds_with_proxies(standin, profile_name):
+
+    RIG_CTX.clear()
+    profile = PROFILES.get(profile_name)
+    root = synthetic_scene.build_ue5_skeleton(UE5_SCHEMA, profile)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        RigBuilder.build_auto_rig(root, RIG_CTX)
+
+    deform_joints = dict(RIG_CTX.joint_registry["deform"])
+    assert RIG_CTX.skeleton_profile is profile
+    assert set(SCHEMA.all_joints()) <= set(deform_joints)
+
+    # A rescan finds proxies under the canonical names they were built for.
+    RIG_CTX.rescan_group("deform_joints")
+    assert RIG_CTX.joint_registry["deform"] == deform_joints
+
+    cmds = standin.cmds
+    for joint_name, (start, end, blend) in profile.proxies.items():
+        proxy = deform_joints[joint_name]
+        assert proxy.endswith(f"|deform_joints|{SkeletonProfile.proxy_name(joint_name)}")
+        start_position = np.array(cmds.xform(deform_joints[start], q=True, t=True, ws=True))
+        end_position = np.array(cmds.xform(deform_joints[end], q=True, t=True, ws=True))
+        np.testing.assert_allclose(
+            cmds.xform(proxy, q=True, t=True, ws=True),
+            start_position + (end_position - start_position) * blend, atol=1e-6)
@@ -0,0 +1,92 @@
+
+
+from rig import rig_builders_registry
+
+
+PATH_CACHE = rig_builders_registry.PATH_CACHE
+
+
+def build_hierarchy(cmds):
+
+    top = cmds.group(empty=True, name="top")
+    group = cmds.group(empty=True, name="grp", parent=top)
+    ctrl = cmds.group(empty=True, name="ctrl", parent=group)
+
+    cmds.namespace(add=":ns")
+    cmds.namespace(set=":ns")
+    other_group = cmds.group(empty=True, name="grp")
+    other_ctrl = cmds.group(empty=True, name="ctrl", parent=other_group)
+    cmds.namespace(set=":")
+
+    return (PATH_CACHE.register(cmds.ls(ctrl, long=True)[0]),
+            PATH_CACHE.register(cmds.ls(other_ctrl, long=True)[0]))
+
+
+def test_rename_invalidates_only_the_subtree(standin, watched):
+
+    ctrl, other_ctrl = build_hierarchy(standin.cmds)
+
+    standin.cmds.rename("|top|grp", "renamed")
+
+    assert ctrl not in PATH_CACHE.paths
+    assert PATH_CACHE.paths[other_ctrl] == "|ns:grp|ns:ctrl"
+    assert PATH_CACHE.resolve(ctrl) == "|top|renamed|ctrl"
+
+
+def test_reparent_invalidates_descendants(standin, watched):
+
+    ctrl, other_ctrl = build_hierarchy(standin.cmds)
+    target = standin.cmds.group(empty=True, name="target")
+
+    standin.cmds.parent("|top|grp", target)
+
+    assert ctrl not in PATH_CACHE.paths
+    assert other_ctrl in PATH_CACHE.paths
+    assert PATH_CACHE.resolve(ctrl) == "|target|grp|ctrl"
+
+
+def test_scene_reset_clears_paths(standin):
+
+    build_hierarchy(standin.cmds)
+
+    standin.new_scene()
+
+    assert PATH_CACHE.paths == {}
+
+
+def test_paths_are_cached_only_while_watched(standin):
+
+    watcher = rig_builders_registry.SCENE_WATCHER
+    ctrl, _ = build_hierarchy(standin.cmds)
+
+    assert not watcher.installed
+    assert ctrl not in PATH_CACHE.paths
+
+    holder = object()
+    watcher.acquire(holder)
+    assert PATH_CACHE.resolve(ctrl) == "|top|grp|ctrl"
+    assert ctrl in PATH_CACHE.paths
+
+    watcher.release(holder)
+    assert not watcher.installed
+    assert PATH_CACHE.paths == {}
+
+
+def test_duplicate_uuid_resolves_in_the_registered_namespace(standin):
+
+    cmds = standin.cmds
+    ctrl, other_ctrl = build_hierarchy(cmds)
+
+    # A second copy of the referenced file carries the same UUID.
+    cmds.namespace(add=":copy")
+    cmds.namespace(set=":copy")
+    duplicate = cmds.group(empty=True, name="ctrl")
+    cmds.namespace(set=":")
+    cmds.rename(duplicate, other_ctrl, uuid=True)
+
+    assert len(cmds.ls(other_ctrl)) == 2
+    assert PATH_CACHE.resolve(other_ctrl) == "|ns:grp|ns:ctrl"
+
+    # With no namespace to tell the copies apart, neither is picked.
+    PATH_CACHE.namespaces.pop(other_ctrl)
+    assert PATH_CACHE.resolve(other_ctrl) is None
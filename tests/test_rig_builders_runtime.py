@@ -0,0 +1,38 @@
+import numpy as np
+
+from rig import rig_builders_runtime
+
+
+RigHelpers = rig_builders_runtime.RigHelpers
+DG_BATCH = rig_builders_runtime.DG_BATCH
+RIG_CTX = rig_builders_runtime.RIG_CTX
+
+
+def world_matrix(cmds, node):
+
+    return np.array(cmds.xform(node, query=True, matrix=True, worldSpace=True))
+
+
+def test_blend_ikfk_matrix_moves_scale_into_offset_parent_matrix(standin):
+
+    cmds = standin.cmds
+    group = cmds.group(empty=True, name="grp")
+    cmds.setAttr(f"{group}.translate", 5, 0, 0)
+    joint = cmds.createNode("joint", name="calf_l", parent=group)
+    cmds.setAttr(f"{joint}.jointOrient", 0, 0, 30)
+    cmds.setAttr(f"{joint}.translate", 1, 2, 3)
+    cmds.setAttr(f"{joint}.rotate", 10, 20, 0)
+    cmds.setAttr(f"{joint}.scale", 2, 2, 2)
+    fk = cmds.group(empty=True, name="fk")
+    ik = cmds.group(empty=True, name="ik")
+    rev = cmds.createNode("reverse", name="rev")
+
+    joint = cmds.ls(joint, long=True)[0]
+    expected = world_matrix(cmds, joint)
+
+    with DG_BATCH.transaction("test"):
+        RigHelpers.blend_ikfk_matrix(RIG_CTX, fk, ik, joint, rev)
+
+        assert cmds.getAttr(f"{joint}.scale")[0] == (1.0, 1.0, 1.0)
+        assert cmds.getAttr(f"{joint}.translate")[0] == (0.0, 0.0, 0.0)
+        np.testing.assert_allclose(world_matrix(cmds, joint), expected, atol=1e-9)
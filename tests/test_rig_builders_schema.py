@@ -0,0 +1,104 @@
+import copy
+
+import pytest
+
+from rig import rig_builders_schema
+from rig import rig_builders_runtime
+
+
+CompiledSchema = rig_builders_schema.CompiledSchema
+UE5_SCHEMA = rig_builders_runtime.UE5_SCHEMA
+
+
+def test_compile_keeps_schema_order():
+
+    schema = CompiledSchema(UE5_SCHEMA)
+
+    assert schema.categories == tuple(UE5_SCHEMA)
+    for category, side_dict in UE5_SCHEMA.items():
+        assert [side for side, _ in schema.by_side(category)] == list(side_dict)
+        assert [(record.side, record.name) for record in schema.chains(category)] == [
+            (side, name) for side, chain_dict in side_dict.items() for name in chain_dict]
+        assert schema.joints[category] == tuple(
+            joint_name for chain_dict in side_dict.values()
+            for joints in chain_dict.values() for joint_name in joints)
+
+    assert schema.chains("missing") == ()
+    assert schema.by_side("missing") == ()
+
+
+def test_all_joints_are_unique_and_ordered():
+
+    joints = CompiledSchema(UE5_SCHEMA).all_joints()
+
+    assert len(joints) == len(set(joints))
+    assert joints[:3] == ("neck_01", "neck_02", "head")
+    assert {"clavicle_l", "foot_r", "pinky_03_r", "calf_twist_01_l"} <= set(joints)
+
+
+def test_limb_records_skip_the_clavicle():
+
+    arm, leg = CompiledSchema(UE5_SCHEMA).by_side("limb")[0][1]
+
+    assert arm.key == "upperarm_l"
+    assert arm.clavicle == "clavicle_l"
+    assert (arm.start, arm.mid, arm.end) == ("upperarm_l", "lowerarm_l", "hand_l")
+    assert arm.ik_targets == (arm.start, arm.mid, arm.end)
+    assert arm.ikfk == arm.start and arm.pole == arm.mid
+
+    assert leg.clavicle is None
+    assert (leg.start, leg.mid, leg.end) == ("thigh_l", "calf_l", "foot_l")
+    assert leg.drivers == leg.joints
+
+
+def test_spine_record_drives_all_but_the_last_joint():
+
+    spine, = CompiledSchema(UE5_SCHEMA).chains("spine")
+
+    assert spine.ik_targets == ("spine_01", "spine_02", "spine_03")
+    assert (spine.start, spine.mid, spine.end) == spine.ik_targets
+    assert spine.ikfk == "spine_03"
+    assert spine.drivers == spine.joints[:-1]
+
+
+def test_twist_record_drives_the_twist_joints():
+
+    twist = CompiledSchema(UE5_SCHEMA).chains("twist")[0]
+
+    assert (twist.start, twist.mid, twist.end) == twist.joints
+    assert twist.drivers == ("upperarm_twist_01_l", "upperarm_twist_02_l")
+
+
+def broken_schema(edit):
+
+    source = copy.deepcopy(UE5_SCHEMA)
+    edit(source)
+    return source
+
+
+@pytest.mark.parametrize("edit, message", [
+    (lambda s: s.update(head={}), "head has no sides"),
+    (lambda s: s["head"].update(x=s["head"].pop("c")), "unknown side: x"),
+    (lambda s: s["hand"].update(l={}), "hand side l has no chains"),
+    (lambda s: s["foot"]["l"].update(foot=("foot_l", "")), "foot.l.foot has invalid joints"),
+    (lambda s: s["foot"]["l"].update(foot=()), "foot.l.foot has invalid joints"),
+    (lambda s: s["limb"]["l"].update(upperarm=("clavicle_l", "upperarm_l", "lowerarm_l")),
+     "limb.l.upperarm needs at least 4 joints, got 3"),
+    (lambda s: s["spine"]["c"].update(spine=("pelvis", "spine_01", "spine_02", "spine_03")),
+     "spine.c.spine needs at least 5 joints, got 4"),
+    (lambda s: s["hand"]["r"].update(thumb=("thumb_01_r", "thumb_02_r")),
+     "hand.l.thumb does not mirror hand.r.thumb"),
+])
+def test_validate_rejects_broken_schemas(edit, message):
+
+    source = broken_schema(edit)
+
+    with pytest.raises(RuntimeError, match=message):
+        CompiledSchema.validate(source)
+    with pytest.raises(RuntimeError, match=message):
+        CompiledSchema(source)
+
+
+def test_validate_accepts_the_ue5_schema():
+
+    CompiledSchema.validate(UE5_SCHEMA)
@@ -0,0 +1,30 @@
+import pytest
+
+from rig import rig_builders_transaction
+
+
+DG_BATCH = rig_builders_transaction.DG_BATCH
+
+
+def test_duplicate_name_in_one_transaction_is_rejected(standin):
+
+    with pytest.raises(RuntimeError, match="hand_Index_Curl_MD"):
+        with DG_BATCH.transaction("curl"):
+            DG_BATCH.create_node("multiplyDivide", "hand_Index_Curl_MD")
+            DG_BATCH.create_node("multiplyDivide", "hand_Index_Curl_MD")
+
+    assert not standin.cmds.ls("hand_Index_Curl_MD*")
+
+
+def test_renamed_node_keeps_its_own_plugs(standin):
+
+    cmds = standin.cmds
+    cmds.createNode("multiplyDivide", name="curl_MD")
+    driver = cmds.group(empty=True, name="driver")
+
+    with DG_BATCH.transaction("curl"):
+        md = DG_BATCH.create_node("multiplyDivide", "curl_MD")
+        DG_BATCH.connect_attr(f"{driver}.translateX", f"{md}.input1X")
+
+    assert cmds.listConnections("curl_MD.input1X") is None
+    assert cmds.listConnections("curl_MD1.input1X") == ["driver"]